@@ -1,41 +1,191 @@
-import pandas as pd
-from fastapi import FastAPI, Request
+from fastapi import BackgroundTasks, FastAPI, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, validator
-from typing import List
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, ValidationError, validator
+from typing import AsyncIterator, Dict, List, Optional, Union
 from contextlib import asynccontextmanager
+import asyncio
+import json
+import os
+import numpy as np
 from challenge.model import DelayModel
+from challenge.artifacts import ModelArtifacts
+from challenge.batching import MicroBatcher
+from challenge.executor import InferenceExecutor, ServiceOverloaded
+from challenge.metrics import MetricsMiddleware, metrics
+from challenge.profiling import RequestProfiler
+from challenge.reload import ModelReloader
+from challenge.registry import IncompatibleModelVersion, ModelRegistry
+from challenge.shadow import ShadowScorer
+from challenge.payloads import (
+    ARROW_STREAM_CONTENT_TYPES,
+    MSGPACK_CONTENT_TYPES,
+    ColumnarValidationError,
+    UnsupportedMediaType,
+    decode_body,
+    is_columnar,
+    orjson,
+    validate_columns
+)
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as _BaseResponse
+else:
+    _BaseResponse = JSONResponse
+
+
+class DefaultResponse(_BaseResponse):
+    """Respuesta por defecto; mide la serializacion del body como etapa "serialize"."""
+
+    def render(self, content) -> bytes:
+        with metrics.stage("serialize"):
+            return super().render(content)
 
 
 # Instanciamos el modelo de manera global
 model = DelayModel()
 
+# Micro-batching opcional de /predict (PREDICT_BATCH_MAX_SIZE / PREDICT_BATCH_MAX_WAIT_US)
+batching_enabled = os.getenv("PREDICT_BATCHING", "false").lower() == "true"
+batcher = MicroBatcher(model.predict_flights)
+
+# Inferencia fuera del event loop con cola acotada (INFERENCE_EXECUTOR / INFERENCE_MAX_IN_FLIGHT)
+inference = InferenceExecutor()
+
+# Tamaño de chunk de /predict/stream (vuelos por inferencia)
+stream_chunk_size = int(os.getenv("PREDICT_STREAM_CHUNK_SIZE", 1000))
+
+# Archivo ONNX servido (MODEL_FILE) y token del endpoint de administracion
+model_file = os.getenv("MODEL_FILE", "./delay_model.onnx")
+admin_token = os.getenv("ADMIN_TOKEN")
+
+
+# Modelo desde un store de artefactos con cache local verificado
+# (MODEL_STORE_URI / MODEL_CACHE_DIR / MODEL_ARTIFACT_VERSION); sin store, model_file
+artifacts = ModelArtifacts()
+
+# Profiling opt-in de /predict (PROFILING_ENABLED / PROFILING_SAMPLE_RATE / PROFILING_SECRET)
+profiler = RequestProfiler()
+
+# True cuando challenge/serve.py cargo el modelo antes de forkear los workers
+preloaded = False
+
+
+def resolve_model_file() -> str:
+    """Con MODEL_STORE_URI, baja (o toma del cache) y verifica la version configurada."""
+    global model_file
+    if artifacts.enabled:
+        model_file = artifacts.fetch()
+    return model_file
+
+
+def preload(**session_kwargs) -> None:
+    """Carga el modelo en el proceso padre; el lifespan de cada worker no lo recarga."""
+    global preloaded
+    resolve_model_file()
+    model.load_model(model_file, **session_kwargs)
+    reloader.mark_loaded(model_file)
+    preloaded = True
+
+
+def swap_model(new_model: DelayModel) -> None:
+    """Reemplaza el modelo global; los requests en vuelo conservan su referencia al anterior."""
+    global model
+    model = new_model
+    inference.swap_model(new_model)
+    if not inference.running:
+        batcher.predict_fn = new_model.predict_flights
+
+
+# Hot reload del ONNX (POST /admin/reload o MODEL_WATCH_INTERVAL_SECONDS)
+reloader = ModelReloader(model_file, on_swap=swap_model, current=lambda: model)
+
+# Versiones adicionales para canary (MODEL_REGISTRY_DIR / MODEL_DEFAULT_VERSION / MODEL_TRAFFIC_SPLIT)
+registry = ModelRegistry(template=lambda: model)
+MODEL_VERSION_HEADER = "X-Model-Version"
+
+# Scoring en sombra de un ONNX candidato (SHADOW_MODEL_PATH / SHADOW_QUEUE_SIZE)
+shadow = ShadowScorer()
+
 # Logica de startup para carga del modelo ONNX
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    if not preloaded:
+        try:
+            # Usa la ruta absoluta o asegúrate de que el archivo exista
+            resolve_model_file()
+            model.load_model(model_file) 
+            reloader.mark_loaded(model_file)
+            print("Modelo ONNX cargado exitosamente")
+        except Exception as e:
+            print(f"ERROR CRÍTICO: No se pudo cargar el modelo: {e}")
+
+    inference.start(model)
+    if inference.running:
+        batcher.predict_fn = inference.run
+
+    if batching_enabled:
+        await batcher.start()
+    await reloader.start_watching()
+
     try:
-        # Usa la ruta absoluta o asegúrate de que el archivo exista
-        model.load_model("./delay_model.onnx") 
-        print("Modelo ONNX cargado exitosamente")
+        await shadow.start(model)
     except Exception as e:
-        print(f"ERROR CRÍTICO: No se pudo cargar el modelo: {e}")
+        print(f"ERROR: No se pudo cargar el modelo sombra: {e}")
     yield
     
     # Logica de shutdown
+    await shadow.stop()
+    await reloader.stop_watching()
+    await batcher.stop()
+    # El join del pool espera las inferencias en curso: fuera del event loop
+    await asyncio.to_thread(inference.shutdown, True)
+    batcher.predict_fn = model.predict_flights
     print("Apagando la API y liberando recursos")
 
-# Lifespan al instanciar FastAPI
-app = FastAPI(title="SCL Delay Prediction API", lifespan=lifespan)
+# Lifespan al instanciar FastAPI (respuestas con orjson si esta instalado)
+app = FastAPI(title="SCL Delay Prediction API", lifespan=lifespan, default_response_class=DefaultResponse)
+
+# Latencia y status por endpoint para /metrics (METRICS_ENABLED=false lo desactiva)
+app.add_middleware(
+    MetricsMiddleware,
+    metrics=metrics,
+    paths=["/health", "/predict", "/predict_proba", "/predict/stream", "/version", "/metrics"]
+)
+metrics.gauge("delay_api_inference_in_flight", "Requests admitidos por el executor", lambda: inference.in_flight)
+metrics.gauge("delay_api_batcher_queue_depth", "Requests esperando en el micro-batcher", lambda: batcher.snapshot()["queue_depth"])
+metrics.gauge("delay_api_shadow_queue_depth", "Requests esperando el scoring en sombra", lambda: shadow.snapshot()["queue_depth"])
+
+
+VALIDATION_ERROR_DETAIL = "Bad Request: Error en la validacion de datos"
 
 
 # Por defecto, Pydantic/FastAPI devuelven HTTP 422 cuando la validación falla.
 # Los tests del challenge exigen estrictamente un HTTP 400. Esto sobrescribe el comportamiento.
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    metrics.error("validation")
     return JSONResponse(
         status_code=400,
-        content={"detail": "Bad Request: Error en la validacion de datos", "errors": exc.errors()}
+        content={"detail": VALIDATION_ERROR_DETAIL, "errors": _encode_errors(exc.errors())}
+    )
+
+
+def _encode_errors(errors) -> list:
+    # ctx trae la excepcion del validator (ValueError), que no es serializable a JSON
+    return jsonable_encoder(errors, custom_encoder={Exception: str})
+
+
+# Load shedding: cuando la cola de inferencia esta llena respondemos 503 rapido
+@app.exception_handler(ServiceOverloaded)
+async def overloaded_exception_handler(request: Request, exc: ServiceOverloaded):
+    metrics.error("overloaded")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
     )
 
 
@@ -70,42 +220,366 @@ async def get_health() -> dict:
         "status": "OK"
     }
 
-@app.post("/predict", status_code=200)
-async def post_predict(payload: FlightList) -> dict:
-    # lista Pydantic a un DataFrame de Pandas
-    df = pd.DataFrame([flight.dict() for flight in payload.flights])
-    
-    # Preprocesamos las features
-    features = model.preprocess(df)
-    
-    # Prediccion con ONNX
-    predictions = model.predict(features)
+def _parse_predict_body(payload) -> Union[List[dict], Dict[str, np.ndarray]]:
+    """
+    Formato por fila ({"flights": [...]}): validacion Pydantic por vuelo, como siempre.
+    Formato columnar: validacion vectorizada por columna. Ambos fallan con 400.
+    """
+    if is_columnar(payload):
+        try:
+            return validate_columns(payload)
+        except ColumnarValidationError as e:
+            raise RequestValidationError(e.errors)
+
+    try:
+        flight_list = FlightList.model_validate(payload)
+    except ValidationError as e:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors()])
+    return [flight.dict() for flight in flight_list.flights]
+
+
+# Body documentado a mano: /predict lee el body crudo para elegir el formato por Content-Type
+PREDICT_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "application/json": {"schema": {"oneOf": [
+            {"type": "object", "required": ["flights"], "properties": {"flights": {"type": "array"}}},
+            {"type": "object", "required": ["OPERA", "TIPOVUELO", "MES"]},
+        ]}},
+        MSGPACK_CONTENT_TYPES[0]: {"schema": {"type": "string", "format": "binary"}},
+        ARROW_STREAM_CONTENT_TYPES[0]: {"schema": {"type": "string", "format": "binary"}},
+    },
+}
+
+
+async def _score_request(request: Request, response: Response, method: str, background: BackgroundTasks):
+    """
+    Decodifica, valida y rutea un request de scoring. Devuelve
+    (vuelos, resultados, version, modelo que respondio) o un JSONResponse de error.
+    """
+    profile = profiler.start(request.headers) if profiler.active else None
+    if profile is None:
+        return await _run_scoring(request, response, method)
+
+    try:
+        result = await _run_scoring(request, response, method, profile=profile)
+    finally:
+        prefix, stats = profiler.stop(profile)
+
+    # Archivos del perfil y sesion ONNX perfilada despues de enviar la respuesta
+    # (save es sincrona: Starlette la corre en el threadpool, fuera del event loop)
+    background.add_task(profiler.save, prefix, stats)
+    if not isinstance(result, JSONResponse):
+        flights, _, _, served = result
+        background.add_task(profiler.profile_onnx, served, flights)
+    return result
+
+
+def _decode_flights(body: bytes, content_type: Optional[str]):
+    # JSON por fila o columnar, msgpack o Arrow IPC segun Content-Type
+    payload = decode_body(body, content_type)
+    # Lookup en la tabla precalculada; los vuelos fuera de la tabla
+    # pasan por preprocess + ONNX dentro del modelo
+    return _parse_predict_body(payload)
+
+
+async def _run_scoring(request: Request, response: Response, method: str, profile=None):
+    """
+    Con `profile` (request perfilado), el decode y la inferencia corren en un
+    thread con cProfile activo solo ahi: los awaits del event loop y los demas
+    requests no entran en el perfil, y el loop no se bloquea.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type")
+
+    with metrics.stage("parse"):
+        try:
+            if profile is None:
+                flights = _decode_flights(body, content_type)
+            else:
+                flights = await asyncio.to_thread(profiler.call, profile, _decode_flights, body, content_type)
+        except UnsupportedMediaType as e:
+            metrics.error("unsupported_media_type")
+            return JSONResponse(status_code=415, content={"status": "error", "detail": str(e)})
+        except ValueError as e:
+            raise RequestValidationError([{"type": "json_invalid", "loc": ("body",), "msg": str(e), "input": None}])
+    columnar = isinstance(flights, dict)
+    metrics.observe_batch(len(flights["MES"]) if columnar else len(flights), source="request")
+
+    # Version pedida por header o query (?model_version=); si no, split/default del registro
+    served = model
+    version = registry.resolve(
+        request.headers.get(MODEL_VERSION_HEADER) or request.query_params.get("model_version")
+    )
+    if version is not None:
+        try:
+            served = await registry.get(version)
+        except LookupError as e:
+            metrics.error("model_version_not_found")
+            return JSONResponse(status_code=404, content={"status": "error", "detail": str(e)})
+        except IncompatibleModelVersion as e:
+            metrics.error("model_version_incompatible")
+            return JSONResponse(status_code=409, content={"status": "error", "detail": str(e)})
+        response.headers[MODEL_VERSION_HEADER] = version
+
+    # Con el batcher activo, los requests concurrentes comparten una sola inferencia;
+    # con el executor activo, la inferencia corre fuera del event loop
+    # "inference" incluye la espera en el batcher/executor; las etapas del modelo van aparte
+    async with inference.slot():
+        with metrics.stage("inference"):
+            if profile is not None:
+                # Request perfilado: inferencia directa (sin batcher/executor) para que cProfile la vea
+                scorer = getattr(served, method)
+                results = await asyncio.to_thread(profiler.call, profile, scorer, flights)
+            elif version is not None:
+                # Las versiones del registro no pasan por el batcher del modelo activo
+                if inference.running:
+                    results = await inference.run(flights, model=served, method=method)
+                else:
+                    results = getattr(served, method)(flights)
+            elif method == "predict_flights" and batcher.running and not columnar:
+                # Un payload columnar ya es un batch grande: no pasa por el micro-batcher
+                results = await batcher.submit(flights)
+            elif inference.running:
+                results = await inference.run(flights, method=method)
+            else:
+                results = getattr(model, method)(flights)
+
+    return flights, results, version, served
+
+
+@app.post("/predict", status_code=200, openapi_extra={"requestBody": PREDICT_REQUEST_BODY})
+async def post_predict(request: Request, response: Response, background: BackgroundTasks) -> dict:
+    result = await _score_request(request, response, "predict_flights", background)
+    if isinstance(result, JSONResponse):
+        return result
+    flights, predictions, version, _ = result
+
+    # Solo encola (o descarta si la cola esta llena); el candidato corre en segundo plano
+    if version is None:
+        shadow.submit(flights, predictions)
     
     return {"predict": predictions}
 
 
+@app.post("/predict_proba", status_code=200, openapi_extra={"requestBody": PREDICT_REQUEST_BODY})
+async def post_predict_proba(
+    request: Request,
+    response: Response,
+    background: BackgroundTasks,
+    threshold: Optional[float] = Query(None, ge=0.0, le=1.0)
+) -> dict:
+    """
+    P(delay) por vuelo y la etiqueta con el umbral del request (?threshold=),
+    o el DECISION_THRESHOLD del modelo (0.5 si no esta configurado).
+    """
+    result = await _score_request(request, response, "predict_flights_proba", background)
+    if isinstance(result, JSONResponse):
+        return result
+    _, probas, _, served = result
+
+    # Umbral del modelo que respondio (la version del registro, si se ruteo a una)
+    if threshold is None:
+        threshold = served.decision_threshold if served.decision_threshold is not None else 0.5
+    labels = (np.asarray(probas, dtype=np.float64) >= threshold).astype(np.int64).tolist()
+
+    return {"predict_proba": probas, "predict": labels, "threshold": threshold}
+
+
 @app.get("/version", status_code=200)
 async def get_version() -> dict:
     """
     Retorna la metadata embebida directamente en el archivo ONNX cargado.
     """
-    # Verificamos que la sesión ONNX esté activa en el modelo
-    if not hasattr(model, "_onnx_session") or model._onnx_session is None:
+    # Extraemos la metadata nativa de ONNX (sesion onnxruntime o backend NumPy)
+    meta = model.model_metadata()
+
+    # Verificamos que el modelo esté cargado
+    if meta is None:
         return JSONResponse(
             status_code=503,
             content={"status": "error", "detail": "El modelo ONNX no está cargado o disponible."}
         )
 
-    # Extraemos la metadata nativa de ONNX
-    meta = model._onnx_session.get_modelmeta()
-    
+    # custom_metadata trae los props personalizados (version, umbral, etc.)
     return {
         "status": "OK",
-        "onnx_metadata": {
-            "producer_name": meta.producer_name,
-            "graph_name": meta.graph_name,
-            "version": meta.version,
-            "description": meta.description,
-            "custom_metadata": meta.custom_metadata_map # Aquí vienen los props personalizados
-        }
-    }
\ No newline at end of file
+        "inference_backend": model.inference_backend,
+        "active_model": reloader.info,
+        "onnx_metadata": meta
+    }
+
+
+class ReloadRequest(BaseModel):
+    path: Optional[str] = None
+    # Commit sha publicado en MODEL_STORE_URI; se baja al cache antes de recargar
+    version: Optional[str] = None
+
+
+@app.post("/admin/reload", status_code=200)
+async def post_admin_reload(request: Request, payload: Optional[ReloadRequest] = None) -> dict:
+    """
+    Carga, valida y calienta un ONNX nuevo en segundo plano y lo activa de forma
+    atomica. Requiere ADMIN_TOKEN configurado y el header X-Admin-Token. Con
+    {"version": <commit sha>} el ONNX se resuelve desde MODEL_STORE_URI.
+    """
+    if not admin_token or request.headers.get("X-Admin-Token") != admin_token:
+        return JSONResponse(status_code=403, content={"status": "error", "detail": "No autorizado"})
+
+    path = payload.path if payload else None
+    try:
+        if payload and payload.version:
+            if not artifacts.enabled:
+                raise ValueError("MODEL_STORE_URI no esta configurado")
+            path = await asyncio.to_thread(artifacts.fetch, payload.version)
+        info = await reloader.reload(path)
+    except Exception as e:
+        # El modelo activo sigue sirviendo
+        return JSONResponse(status_code=409, content={"status": "error", "detail": str(e)})
+
+    return {"status": "OK", "active_model": info}
+
+
+@app.get("/admin/profile", status_code=200)
+async def get_admin_profile(request: Request, format: str = Query("json", pattern="^(json|collapsed|pstats)$")):
+    """
+    Perfil agregado de los requests perfilados: json (top por tiempo acumulado y
+    tiempo por nodo ONNX), collapsed (flamegraph.pl / speedscope) o pstats.
+    Requiere ADMIN_TOKEN configurado y el header X-Admin-Token.
+    """
+    if not admin_token or request.headers.get("X-Admin-Token") != admin_token:
+        return JSONResponse(status_code=403, content={"status": "error", "detail": "No autorizado"})
+
+    if format == "collapsed":
+        return PlainTextResponse(profiler.collapsed())
+    if format == "pstats":
+        return Response(profiler.pstats_bytes(), media_type="application/octet-stream")
+    return {"status": "OK", "profile": profiler.report()}
+
+
+@app.get("/models", status_code=200)
+async def get_models() -> dict:
+    """
+    Versiones publicadas, cargadas y configuracion de ruteo del registro.
+    """
+    return {"status": "OK", "registry": registry.snapshot()}
+
+
+@app.get("/stats/shadow", status_code=200)
+async def get_shadow_stats() -> dict:
+    """
+    Acuerdo y matriz de confusion (live vs candidato) del scoring en sombra.
+    """
+    return {"status": "OK", "shadow": shadow.snapshot()}
+
+
+@app.get("/stats/batching", status_code=200)
+async def get_batching_stats() -> dict:
+    """
+    Profundidad de cola y distribucion de tamaños de batch del micro-batcher.
+    """
+    return {"status": "OK", "batching": batcher.snapshot()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """
+    Histogramas de latencia por etapa y por endpoint, tamaños de batch,
+    errores y profundidad de colas en formato de texto de Prometheus.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# Streaming NDJSON
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse que no escucha http.disconnect en paralelo: el generador
+    lee el body del request mientras responde, y ambos consumirian receive().
+    El background corre siempre, aunque el envio falle o el generador no llegue
+    a arrancar (cliente desconectado).
+    """
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        finally:
+            await self.body_iterator.aclose()
+            if self.background is not None:
+                await self.background()
+
+
+def _parse_stream_line(line: bytes, line_number: int) -> dict:
+    """
+    Valida una linea NDJSON; si es invalida devuelve el error en vez de cortar el stream,
+    con el mismo detalle y lista de errores que el 400 de /predict.
+    """
+    loc = ("line", line_number)
+    try:
+        payload = json.loads(line)
+    except ValueError as e:
+        errors = [{"type": "json_invalid", "loc": loc, "msg": str(e), "input": None}]
+    else:
+        if not isinstance(payload, dict):
+            errors = [{"type": "dict_type", "loc": loc, "msg": "Input should be a valid dictionary", "input": payload}]
+        else:
+            try:
+                return Flight.model_validate(payload).dict()
+            except ValidationError as e:
+                errors = [{**error, "loc": (*loc, *error["loc"])} for error in e.errors()]
+    return {"error": f"Linea {line_number}: {VALIDATION_ERROR_DETAIL}", "errors": _encode_errors(errors)}
+
+
+async def _predict_stream_chunk(chunk: List[dict]) -> bytes:
+    flights = [entry for entry in chunk if "error" not in entry]
+    if not flights:
+        predictions = []
+    elif inference.running:
+        predictions = await inference.run(flights)
+    else:
+        predictions = model.predict_flights(flights)
+
+    # Una linea de salida por linea de entrada, en el mismo orden
+    preds = iter(predictions)
+    lines = [
+        json.dumps(entry) if "error" in entry else json.dumps({"predict": next(preds)})
+        for entry in chunk
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def _stream_predictions(request: Request) -> AsyncIterator[bytes]:
+    buffer = b""
+    chunk: List[dict] = []
+    line_number = 0
+
+    async for data in request.stream():
+        # Solo mantenemos en memoria la linea incompleta y el chunk actual
+        *lines, buffer = (buffer + data).split(b"\n")
+        for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            chunk.append(_parse_stream_line(line, line_number))
+            if len(chunk) >= stream_chunk_size:
+                yield await _predict_stream_chunk(chunk)
+                chunk = []
+
+    if buffer.strip():
+        chunk.append(_parse_stream_line(buffer, line_number + 1))
+    if chunk:
+        yield await _predict_stream_chunk(chunk)
+
+
+@app.post("/predict/stream", status_code=200)
+async def post_predict_stream(request: Request) -> NDJSONStreamingResponse:
+    """
+    Prediccion masiva en NDJSON: un vuelo por linea de entrada y una prediccion
+    ({"predict": 0}) o error ({"error": "..."}) por linea de salida. Se procesa
+    en chunks de PREDICT_STREAM_CHUNK_SIZE a medida que llega el body.
+    """
+    # El lugar en la cola se toma antes de empezar a responder (503 inmediato) y
+    # lo libera el background de la respuesta, que corre aunque el stream no arranque
+    inference.acquire()
+    return NDJSONStreamingResponse(_stream_predictions(request), background=BackgroundTask(inference.release))
@@ -0,0 +1,296 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Optional
+
+
+MODEL_FILENAME = "delay_model.onnx"
+CHUNK_BYTES = 8 * 1024 * 1024
+
+# Digest publicado en <model>.sha256: nombra el blob del cache, no puede ser una ruta
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def model_key(commit_sha: str) -> str:
+    """Mismo layout que publicaba model_train.py: models/<commit_sha>/delay_model.onnx."""
+    return f"models/{commit_sha}/{MODEL_FILENAME}"
+
+
+def checksum_key(commit_sha: str) -> str:
+    return model_key(commit_sha) + ".sha256"
+
+
+class HashingWriter:
+    """Envuelve un archivo de escritura y calcula el sha256 de lo que pasa por el."""
+
+    def __init__(self, fileobj: BinaryIO):
+        self.fileobj = fileobj
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        self.size += len(data)
+        return self.fileobj.write(data)
+
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
+
+
+def stream_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ==========================
+# Backends
+# ==========================
+class ArtifactStore(ABC):
+    """Interfaz minima de un store de artefactos; las keys usan '/' como separador."""
+
+    uri = ""
+
+    @abstractmethod
+    def upload(self, local_path: str, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def download(self, key: str, fileobj: BinaryIO) -> None:
+        ...
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def read_text(self, key: str) -> str:
+        ...
+
+    @abstractmethod
+    def write_text(self, key: str, text: str) -> None:
+        ...
+
+
+class FilesystemStore(ArtifactStore):
+    """Store sobre un directorio local o montado (desarrollo, tests, volumenes compartidos)."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.uri = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def upload(self, local_path: str, key: str) -> None:
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Escritura atomica: un lector nunca ve un ONNX a medio copiar
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+        try:
+            with open(local_path, "rb") as src, os.fdopen(fd, "wb") as dst:
+                shutil.copyfileobj(src, dst, CHUNK_BYTES)
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def download(self, key: str, fileobj: BinaryIO) -> None:
+        path = self._path(key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Artefacto no encontrado: {path}")
+        with open(path, "rb") as src:
+            shutil.copyfileobj(src, fileobj, CHUNK_BYTES)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def read_text(self, key: str) -> str:
+        path = self._path(key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Artefacto no encontrado: {path}")
+        with open(path) as f:
+            return f.read()
+
+    def write_text(self, key: str, text: str) -> None:
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w") as f:
+            f.write(text)
+
+
+class GCSStore(ArtifactStore):
+    """
+    Store en Google Cloud Storage (dependencia opcional: google-cloud-storage).
+    Subidas resumables y descargas por chunks de CHUNK_BYTES.
+    """
+
+    def __init__(self, bucket_name: str, prefix: str = "", client=None):
+        from google.cloud import storage
+
+        self.bucket = (client or storage.Client()).bucket(bucket_name)
+        self.prefix = prefix.strip("/")
+        self.uri = f"gs://{bucket_name}/{self.prefix}".rstrip("/")
+
+    def _blob(self, key: str):
+        name = f"{self.prefix}/{key}" if self.prefix else key
+        # chunk_size activa la subida resumable y la descarga por rangos
+        return self.bucket.blob(name, chunk_size=CHUNK_BYTES)
+
+    def upload(self, local_path: str, key: str) -> None:
+        with open(local_path, "rb") as f:
+            self._blob(key).upload_from_file(f)
+
+    def download(self, key: str, fileobj: BinaryIO) -> None:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            self._blob(key).download_to_file(fileobj)
+        except NotFound:
+            raise FileNotFoundError(f"Artefacto no encontrado: {self.uri}/{key}")
+
+    def exists(self, key: str) -> bool:
+        return self._blob(key).exists()
+
+    def read_text(self, key: str) -> str:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            return self._blob(key).download_as_text()
+        except NotFound:
+            raise FileNotFoundError(f"Artefacto no encontrado: {self.uri}/{key}")
+
+    def write_text(self, key: str, text: str) -> None:
+        self._blob(key).upload_from_string(text)
+
+
+def open_store(uri: str) -> ArtifactStore:
+    """'gs://bucket/prefix' -> GCSStore; 'file:///ruta' o una ruta -> FilesystemStore."""
+    if uri.startswith("gs://"):
+        bucket, _, prefix = uri[len("gs://"):].partition("/")
+        return GCSStore(bucket, prefix)
+    if uri.startswith("file://"):
+        uri = uri[len("file://"):]
+    return FilesystemStore(uri)
+
+
+# ==========================
+# Publicacion y cache local
+# ==========================
+def publish_model(store: ArtifactStore, local_path: str, commit_sha: str) -> str:
+    """Sube el ONNX y su sha256 bajo models/<commit_sha>/; devuelve el digest."""
+    digest = stream_sha256(local_path)
+    store.upload(local_path, model_key(commit_sha))
+    # El checksum se escribe al final: su presencia marca la version como completa
+    store.write_text(checksum_key(commit_sha), digest + "\n")
+    return digest
+
+
+class ModelArtifacts:
+    """
+    Resuelve la version del modelo a servir contra un ArtifactStore, con cache local
+    direccionado por contenido.
+
+    Cache: <cache_dir>/blobs/<sha256>.onnx y <cache_dir>/versions/<commit_sha> con
+    el digest. Una version ya resuelta no vuelve a consultar el store: se verifica
+    el sha256 del blob en disco y, si no coincide, se descarga de nuevo. Las
+    descargas se escriben por chunks a un temporal, se hashean al vuelo y solo se
+    mueven al cache si el digest coincide con el publicado.
+    """
+
+    def __init__(self, store_uri: str = None, cache_dir: str = None, version: str = None):
+        if store_uri is not None:
+            self.store_uri = store_uri
+        else:
+            self.store_uri = os.getenv("MODEL_STORE_URI", "")
+
+        if cache_dir is not None:
+            self.cache_dir = cache_dir
+        else:
+            self.cache_dir = os.getenv("MODEL_CACHE_DIR", ".model_cache")
+
+        if version is not None:
+            self.version = version
+        else:
+            # MODEL_VERSION es el commit sha que el CD ya le pasa a Cloud Run
+            self.version = os.getenv("MODEL_ARTIFACT_VERSION") or os.getenv("MODEL_VERSION") or None
+
+        self._store: Optional[ArtifactStore] = None
+        self.downloads = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.store_uri)
+
+    @property
+    def store(self) -> ArtifactStore:
+        if self._store is None:
+            self._store = open_store(self.store_uri)
+        return self._store
+
+    def _blob_path(self, digest: str) -> str:
+        if not SHA256_PATTERN.fullmatch(digest):
+            raise ValueError(f"sha256 invalido: {digest!r}")
+        return os.path.join(self.cache_dir, "blobs", f"{digest}.onnx")
+
+    def _version_path(self, version: str) -> str:
+        return os.path.join(self.cache_dir, "versions", version)
+
+    def cached_digest(self, version: str) -> Optional[str]:
+        path = self._version_path(version)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            digest = f.read().strip()
+        # Una entrada corrupta se ignora y la version se resuelve de nuevo contra el store
+        return digest if SHA256_PATTERN.fullmatch(digest) else None
+
+    def fetch(self, version: str = None) -> str:
+        """Devuelve la ruta local verificada del ONNX de `version` (por defecto self.version)."""
+        version = version or self.version
+        if not version:
+            raise ValueError("MODEL_STORE_URI requiere MODEL_ARTIFACT_VERSION o MODEL_VERSION")
+        # Mismo criterio que ModelRegistry.get: nada de rutas fuera del cache ni del prefijo del store
+        if os.path.basename(version) != version or version in (".", "..") or "\\" in version:
+            raise ValueError(f"Version invalida: {version}")
+
+        digest = self.cached_digest(version)
+        if digest is not None:
+            blob = self._blob_path(digest)
+            if os.path.exists(blob) and stream_sha256(blob) == digest:
+                return blob
+
+        expected = self.store.read_text(checksum_key(version)).strip()
+        if not SHA256_PATTERN.fullmatch(expected):
+            raise ValueError(f"Checksum publicado invalido para {version}: {expected[:80]!r}")
+        blob = self._blob_path(expected)
+        if not (os.path.exists(blob) and stream_sha256(blob) == expected):
+            self._download(model_key(version), blob, expected)
+
+        os.makedirs(os.path.dirname(self._version_path(version)), exist_ok=True)
+        with open(self._version_path(version), "w") as f:
+            f.write(expected)
+        return blob
+
+    def _download(self, key: str, blob: str, expected: str) -> None:
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(blob), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                writer = HashingWriter(f)
+                self.store.download(key, writer)
+            if writer.hexdigest() != expected:
+                raise ValueError(
+                    f"Checksum invalido para {key}: esperado {expected}, recibido {writer.hexdigest()}"
+                )
+            os.replace(tmp, blob)
+            self.downloads += 1
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
@@ -0,0 +1,95 @@
+import numpy as np
+from typing import Dict, List
+
+
+INFERENCE_BACKENDS = ("onnx", "numpy")
+
+
+class NumpyLinearBackend:
+    """
+    Backend de inferencia en NumPy puro para el clasificador lineal exportado.
+
+    El modelo es una LogisticRegression sobre features binarias, asi que la
+    inferencia es un producto punto + el argmax de los scores por clase (lo
+    mismo que hace el nodo LinearClassifier de ONNX), sin importar onnxruntime.
+    """
+
+    name = "numpy"
+
+    def __init__(
+        self,
+        coefficients: np.ndarray,
+        intercepts: np.ndarray,
+        classlabels: List[int],
+        metadata: Dict[str, object] = None
+    ):
+        # (n_features, n_scores) en float32, igual que el kernel de onnxruntime
+        self.coefficients = np.ascontiguousarray(np.atleast_2d(coefficients).T, dtype=np.float32)
+        self.intercepts = np.asarray(intercepts, dtype=np.float32).reshape(-1)
+        self.classlabels = np.asarray(classlabels, dtype=np.int64)
+        self.metadata = metadata or {}
+
+        if self.coefficients.shape[1] != self.intercepts.shape[0]:
+            raise ValueError("Coeficientes e interceptos del modelo lineal no coinciden")
+
+    @property
+    def n_features(self) -> int:
+        return self.coefficients.shape[0]
+
+    # ==========================
+    # Construccion
+    # ==========================
+    @classmethod
+    def from_onnx(cls, path: str) -> "NumpyLinearBackend":
+        """Lee coeficientes e interceptos del nodo LinearClassifier del grafo ONNX."""
+        import onnx
+        from onnx import helper
+
+        onnx_model = onnx.load(path)
+        nodes = [n for n in onnx_model.graph.node if n.op_type == "LinearClassifier"]
+        if len(nodes) != 1:
+            raise ValueError(f"El grafo {path} no tiene un unico nodo LinearClassifier")
+
+        attrs = {a.name: helper.get_attribute_value(a) for a in nodes[0].attribute}
+        if attrs.get("multi_class", 0) != 0:
+            raise ValueError("Solo se soporta LinearClassifier con multi_class=0")
+
+        classlabels = list(attrs["classlabels_ints"])
+        intercepts = np.asarray(attrs["intercepts"], dtype=np.float32)
+        coefficients = np.asarray(attrs["coefficients"], dtype=np.float32).reshape(len(intercepts), -1)
+
+        metadata = {
+            "producer_name": onnx_model.producer_name,
+            "graph_name": onnx_model.graph.name,
+            "version": onnx_model.model_version,
+            "description": onnx_model.doc_string,
+            "custom_metadata": {p.key: p.value for p in onnx_model.metadata_props},
+        }
+        return cls(coefficients, intercepts, classlabels, metadata)
+
+    @classmethod
+    def from_sklearn(cls, model) -> "NumpyLinearBackend":
+        """Construye el backend desde una LogisticRegression ya entrenada."""
+        return cls(model.coef_, model.intercept_, [int(c) for c in model.classes_])
+
+    # ==========================
+    # Inferencia
+    # ==========================
+    def run(self, matrix: np.ndarray) -> np.ndarray:
+        scores = matrix @ self.coefficients
+        scores += self.intercepts
+
+        # Un solo score (binario): clase positiva si score > 0
+        if scores.shape[1] == 1:
+            return np.where(scores[:, 0] > 0, self.classlabels[-1], self.classlabels[0])
+
+        return self.classlabels[np.argmax(scores, axis=1)]
+
+    def proba(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        P(clase positiva) para el caso binario: sigmoide del score de la ultima
+        clase, igual que post_transform=LOGISTIC en el LinearClassifier de ONNX.
+        """
+        scores = matrix @ self.coefficients[:, -1]
+        scores += self.intercepts[-1]
+        return (1.0 / (1.0 + np.exp(-scores))).astype(np.float32)
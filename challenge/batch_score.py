@@ -0,0 +1,196 @@
+import argparse
+import os
+import resource
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.getcwd())
+
+try:
+    from challenge.model import DelayModel
+except ModuleNotFoundError:
+    from model import DelayModel
+
+
+# Columnas que usa el modelo, con dtypes explicitos (nullable: un CSV real puede traer vacios).
+# El resto de las columnas pasa tal cual a la salida (o solo las de --keep_columns)
+INPUT_COLUMNS = ["OPERA", "TIPOVUELO", "MES"]
+INPUT_DTYPES = {"OPERA": "string", "TIPOVUELO": "string", "MES": "Int8"}
+
+
+def parse_args(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Scoring batch de atrasos (CSV/Parquet)")
+    parser.add_argument('--input_path', type=str, required=True)
+    parser.add_argument('--output_path', type=str, required=True)
+    parser.add_argument('--model_path', type=str, required=True)
+    parser.add_argument('--top_features', type=str, required=False, default="")
+    parser.add_argument('--keep_columns', type=str, required=False, default="")
+    parser.add_argument('--chunk_size', type=int, required=False, default=500_000)
+    parser.add_argument('--workers', type=int, required=False, default=os.cpu_count() or 1)
+    return parser.parse_args(argv)
+
+
+# ==========================
+# Worker de procesos
+# ==========================
+# Cada proceso carga su propio DelayModel desde el ONNX
+_worker_model: Optional[DelayModel] = None
+
+
+def _init_worker(top_features: Optional[List[str]], model_path: str) -> None:
+    global _worker_model
+    _worker_model = DelayModel(top_features=top_features, prediction_table=False)
+    _worker_model.load_model(model_path)
+
+
+def _score_chunk(chunk: pd.DataFrame, keep_columns: Optional[List[str]] = None) -> pd.DataFrame:
+    features = _worker_model.preprocess(chunk)
+    if keep_columns is not None:
+        chunk = chunk[keep_columns]
+    chunk = chunk.reset_index(drop=True)
+    chunk["predict"] = pd.array(_worker_model.predict(features), dtype="int8")
+    return chunk
+
+
+# ==========================
+# Lectura / escritura por chunks
+# ==========================
+def _file_format(path: str) -> str:
+    return "parquet" if path.lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def read_chunks(path: str, chunk_size: int, keep_columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Chunks con todas las columnas del archivo, o solo keep_columns + INPUT_COLUMNS."""
+    columns = None if keep_columns is None else list(dict.fromkeys(keep_columns + INPUT_COLUMNS))
+
+    if _file_format(path) == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Leer Parquet requiere pyarrow (pip install pyarrow)") from e
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas().astype(INPUT_DTYPES)
+        return
+
+    for chunk in pd.read_csv(path, usecols=columns, dtype=INPUT_DTYPES, chunksize=chunk_size, low_memory=False):
+        yield chunk if columns is None else chunk[columns]
+
+
+class ChunkWriter:
+    """Escribe los chunks puntuados en orden, sin acumular el resultado en memoria."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.format = _file_format(path)
+        self._parquet_writer = None
+        self._parquet_schema = None
+        self._wrote_header = False
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        if self.format == "parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ImportError("Escribir Parquet requiere pyarrow (pip install pyarrow)") from e
+
+            # Los chunks siguientes se convierten al schema del primero: pandas infiere los
+            # dtypes de las columnas de paso por chunk (p.ej. una columna vacia en un chunk)
+            table = pa.Table.from_pandas(chunk, schema=self._parquet_schema, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_schema = table.schema
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+            return
+
+        chunk.to_csv(self.path, mode="a" if self._wrote_header else "w", header=not self._wrote_header, index=False)
+        self._wrote_header = True
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS del proceso principal y del mayor worker (ru_maxrss viene en KB en Linux)."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) / 1024
+
+
+def score(
+    input_path: str,
+    output_path: str,
+    model_path: str,
+    top_features: Optional[List[str]],
+    chunk_size: int,
+    workers: int,
+    keep_columns: Optional[List[str]] = None
+) -> int:
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"No hay data en {input_path}")
+
+    writer = ChunkWriter(output_path)
+    rows = 0
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(top_features, model_path)
+    ) as pool:
+        # Ventana acotada de chunks en vuelo: memoria constante y salida en orden de entrada
+        pending = deque()
+        for chunk in read_chunks(input_path, chunk_size, keep_columns):
+            pending.append(pool.submit(_score_chunk, chunk, keep_columns))
+            if len(pending) >= workers * 2:
+                scored = pending.popleft().result()
+                writer.write(scored)
+                rows += len(scored)
+
+        while pending:
+            scored = pending.popleft().result()
+            writer.write(scored)
+            rows += len(scored)
+
+    writer.close()
+    return rows
+
+
+def main(argv: List[str] = None):
+    args = parse_args(argv)
+
+    # Procesar features (Separador '|'), igual que model_train.py. Sin --top_features
+    # cada worker usa las guardadas en el ONNX (o TOP_FEATURES si el modelo no las trae)
+    top_features_list = [f.strip() for f in args.top_features.split('|') if f.strip()] or None
+    # Columnas de entrada que se copian a la salida (mismo separador); sin --keep_columns, todas
+    keep_columns_list = [c.strip() for c in args.keep_columns.split('|') if c.strip()] or None
+
+    features_info = len(top_features_list) if top_features_list else "las del modelo"
+    print(f"Iniciando scoring. Features: {features_info}, workers: {args.workers}")
+
+    start = time.perf_counter()
+    rows = score(
+        input_path=args.input_path,
+        output_path=args.output_path,
+        model_path=args.model_path,
+        top_features=top_features_list,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        keep_columns=keep_columns_list
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"Éxito. {rows} filas en {elapsed:.2f}s ({rows / elapsed:,.0f} filas/s), peak RSS {peak_rss_mb():.1f} MB")
+    print(f"Predicciones en {args.output_path}")
+
+if __name__ == "__main__":
+    main()
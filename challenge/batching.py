@@ -0,0 +1,169 @@
+import asyncio
+import inspect
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from challenge.metrics import metrics
+
+
+class MicroBatcher:
+    """
+    Agrupa requests concurrentes de /predict en un solo batch.
+
+    Cada request encola su lista de vuelos junto a un Future; el worker junta
+    requests hasta max_batch_size vuelos o hasta max_wait_us microsegundos desde
+    el primero, llama una sola vez a predict_fn sobre el batch combinado y le
+    devuelve a cada caller su propio slice de resultados. predict_fn puede ser
+    async (p.ej. un executor), en cuyo caso los batches se procesan en paralelo.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[List[dict]], Union[List[int], Awaitable[List[int]]]],
+        max_batch_size: int = None,
+        max_wait_us: int = None
+    ):
+        self.predict_fn = predict_fn
+
+        if max_batch_size is not None:
+            self.max_batch_size = max_batch_size
+        else:
+            self.max_batch_size = int(os.getenv("PREDICT_BATCH_MAX_SIZE", 64))
+
+        if max_wait_us is not None:
+            self.max_wait_us = max_wait_us
+        else:
+            self.max_wait_us = int(os.getenv("PREDICT_BATCH_MAX_WAIT_US", 2000))
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+
+        # Estadisticas para ajustar la ventana contra la latencia p99
+        self.stats: Dict[str, object] = {}
+        self.reset_stats()
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def reset_stats(self) -> None:
+        self.stats = {
+            "requests": 0,
+            "batches": 0,
+            "flights": 0,
+            "max_queue_depth": 0,
+            "max_batch_size_seen": 0,
+            # Histograma de tamaño de batch (en vuelos) por potencias de 2
+            "batch_size_histogram": {},
+        }
+
+    def snapshot(self) -> dict:
+        batches = self.stats["batches"] or 1
+        return {
+            "enabled": self.running,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_us": self.max_wait_us,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "avg_batch_size": self.stats["flights"] / batches,
+            "avg_requests_per_batch": self.stats["requests"] / batches,
+            **self.stats,
+        }
+
+    # ==========================
+    # Ciclo de vida (lifespan)
+    # ==========================
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+        # Los requests que quedaron en cola no deben quedar colgados
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("El batcher se detuvo antes de procesar el request"))
+
+    async def submit(self, flights: List[dict]) -> List[int]:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((flights, future))
+        depth = self._queue.qsize()
+        if depth > self.stats["max_queue_depth"]:
+            self.stats["max_queue_depth"] = depth
+        return await future
+
+    # ==========================
+    # Worker
+    # ==========================
+    async def _collect(self) -> List[Tuple[List[dict], asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        size = len(batch[0][0])
+        deadline = loop.time() + self.max_wait_us / 1_000_000
+
+        while size < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            size += len(item[0])
+
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            # El worker sigue juntando el siguiente batch mientras este se ejecuta
+            task = asyncio.create_task(self._process(batch))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _process(self, batch: List[Tuple[List[dict], asyncio.Future]]) -> None:
+        combined = [flight for flights, _ in batch for flight in flights]
+        self._record(len(batch), len(combined))
+
+        try:
+            predictions = self.predict_fn(combined)
+            if inspect.isawaitable(predictions):
+                predictions = await predictions
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for flights, future in batch:
+            if not future.done():
+                future.set_result(predictions[offset:offset + len(flights)])
+            offset += len(flights)
+
+    def _record(self, n_requests: int, n_flights: int) -> None:
+        self.stats["requests"] += n_requests
+        self.stats["batches"] += 1
+        self.stats["flights"] += n_flights
+        if n_flights > self.stats["max_batch_size_seen"]:
+            self.stats["max_batch_size_seen"] = n_flights
+
+        bucket = str(1 << max(n_flights - 1, 0).bit_length())
+        histogram = self.stats["batch_size_histogram"]
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+        metrics.observe_batch(n_flights, source="microbatch")
@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+
+# Columnas categoricas que el modelo codifica en one-hot
+CATEGORICAL_COLUMNS = ("OPERA", "TIPOVUELO", "MES")
+
+# unique_rows empaqueta cada fila one-hot en un int64
+MAX_PACKED_FEATURES = 63
+
+
+def validate_features(features: Sequence[str]) -> None:
+    """
+    ValueError si alguna feature no es una dummy "<COLUMNA>_<valor>" de
+    CATEGORICAL_COLUMNS (p.ej. high_season o period_day_*): el encoder la
+    dejaria siempre en 0 y el modelo entrenaria y serviria sobre una constante.
+    """
+    invalid = [f for f in features if f.partition("_")[0] not in CATEGORICAL_COLUMNS or not f.partition("_")[1]]
+    if invalid:
+        raise ValueError(
+            f"top_features que el encoder no puede generar (solo {', '.join(CATEGORICAL_COLUMNS)}): {invalid}"
+        )
+
+
+class FeatureEncoder:
+    """
+    Codificador one-hot precompilado a partir de top_features.
+
+    Cada feature "<COLUMNA>_<valor>" se resuelve una sola vez a un indice de
+    salida, y transform escribe directo en una matriz float32 preasignada
+    (el dtype que espera la sesion ONNX), sin DataFrames intermedios.
+    El resultado es identico a pd.get_dummies + reindex sobre top_features.
+    """
+
+    def __init__(self, features: List[str]):
+        validate_features(features)
+        self.features = list(features)
+
+        # columna -> [(valor, indice de salida)]; un valor nunca visto queda en 0, como en get_dummies
+        self.columns: Dict[str, List[Tuple[str, int]]] = {}
+        for index, feature in enumerate(self.features):
+            column, _, value = feature.partition("_")
+            self.columns.setdefault(column, []).append((value, index))
+
+    @property
+    def n_features(self) -> int:
+        return len(self.features)
+
+    def transform(self, data: Union[pd.DataFrame, Mapping[str, Sequence]]) -> np.ndarray:
+        """Codifica un DataFrame (o un dict de columnas) a una matriz (n, n_features) float32."""
+        if isinstance(data, pd.DataFrame):
+            n_rows = len(data)
+        else:
+            n_rows = len(next(iter(data.values()))) if data else 0
+        matrix = np.zeros((n_rows, self.n_features), dtype=np.float32)
+
+        for column, entries in self.columns.items():
+            values = data[column]
+            missing = None
+            if pd.api.types.is_extension_array_dtype(values) and pd.api.types.is_integer_dtype(values):
+                # Enteros nullable (Int8, ...): comparamos como int y los nulos quedan en 0
+                missing = np.asarray(pd.isna(values))
+                values = values.to_numpy(dtype=np.int64, na_value=0)
+            values = np.asarray(values)
+            if values.dtype.kind == "O":
+                # pd.NA (dtype "string") no se puede comparar: igual que get_dummies, los nulos no activan nada
+                if pd.api.types.infer_dtype(values, skipna=True) != "string":
+                    values = np.where(pd.isna(values), None, values.astype(str))
+                else:
+                    nulls = pd.isna(values)
+                    if nulls.any():
+                        values = np.where(nulls, None, values)
+            for value, index in entries:
+                matrix[:, index] = self._matches(values, value)
+            if missing is not None and missing.any():
+                matrix[np.ix_(missing, [index for _, index in entries])] = 0.0
+
+        return matrix
+
+    def transform_records(self, records: List[dict]) -> np.ndarray:
+        """Camino de pocas filas (API): codifica dicts de vuelos sin construir un DataFrame."""
+        matrix = np.zeros((len(records), self.n_features), dtype=np.float32)
+
+        for column, entries in self.columns.items():
+            lookup = dict(entries)
+            for row, record in enumerate(records):
+                index = lookup.get(str(record[column]))
+                if index is not None:
+                    matrix[row, index] = 1.0
+
+        return matrix
+
+    @staticmethod
+    def _matches(values: np.ndarray, value: str) -> np.ndarray:
+        # pd.get_dummies nombra las columnas con str(valor): para enteros
+        # comparamos numericamente y evitamos convertir toda la columna a str
+        if values.dtype.kind in "iu":
+            try:
+                target = int(value)
+            except ValueError:
+                return np.zeros(len(values), dtype=bool)
+            if str(target) != value:
+                return np.zeros(len(values), dtype=bool)
+            return values == target
+
+        if values.dtype.kind == "O":
+            return values == value
+
+        return values.astype(str) == value
+
+
+def sparse_one_hot(data: pd.DataFrame, features: List[str] = None):
+    """
+    One-hot de OPERA/TIPOVUELO/MES como matriz scipy CSR float32.
+
+    Sin `features` genera el set completo con los mismos nombres y orden que
+    pd.get_dummies (p.ej. para entrenar con todas las dummies, no solo el top 10);
+    con `features` se restringe a esas columnas. Devuelve (matriz, nombres).
+    Las columnas categoricas se usan tal cual (codes), sin materializar dummies densas.
+    """
+    from scipy import sparse
+
+    encoded = []
+    all_names: List[str] = []
+    for column in CATEGORICAL_COLUMNS:
+        values = data[column]
+        if not isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype("category")
+        names = [f"{column}_{category}" for category in values.cat.categories]
+        encoded.append((values.cat.codes.to_numpy(), names))
+        all_names.extend(names)
+
+    if features:
+        validate_features(features)
+    features = list(features) if features else all_names
+    output_index = {name: i for i, name in enumerate(features)}
+
+    rows, cols = [], []
+    for codes, names in encoded:
+        # code de categoria -> columna de salida (-1 si no esta en features); el ultimo slot es para NaN (code -1)
+        mapping = np.array([output_index.get(name, -1) for name in names] + [-1], dtype=np.int64)
+        out = mapping[codes]
+        mask = out >= 0
+        rows.append(np.flatnonzero(mask))
+        cols.append(out[mask])
+
+    rows = np.concatenate(rows)
+    cols = np.concatenate(cols)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(data), len(features))
+    )
+    return matrix, features
+
+
+# ==========================
+# Deduplicacion de batches
+# ==========================
+def _first_occurrence(codes: np.ndarray, n_unique: int) -> np.ndarray:
+    """Indice de la primera fila de cada codigo (codes en [0, n_unique))."""
+    first = np.empty(n_unique, dtype=np.int64)
+    # Asignando en orden inverso, la ultima escritura de cada codigo es su primera fila
+    first[codes[::-1]] = np.arange(len(codes) - 1, -1, -1)
+    return first
+
+
+def unique_rows(matrix: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Filas unicas de una matriz one-hot (solo 0/1) y el inverso tal que
+    unicas[inverso] == matrix. Cada fila se empaqueta en un int64 (un bit por
+    feature) y se factoriza por hash, sin ordenar. Devuelve None si la matriz
+    no es binaria, tiene mas de MAX_PACKED_FEATURES columnas o no hay repetidas.
+    """
+    n_rows, n_features = matrix.shape
+    if n_rows < 2 or n_features == 0 or n_features > MAX_PACKED_FEATURES:
+        return None
+
+    bits = matrix != 0
+    if not np.array_equal(bits, matrix):
+        return None
+
+    # Producto entero con potencias de 2: exacto hasta 63 bits
+    keys = bits.astype(np.int64) @ (np.int64(1) << np.arange(n_features, dtype=np.int64))
+
+    codes, uniques = pd.factorize(keys)
+    if len(uniques) == n_rows:
+        return None
+    return matrix[_first_occurrence(codes, len(uniques))], codes
+
+
+def factorize_columns(
+    columns: Mapping[str, Sequence],
+    keys: Sequence[str] = CATEGORICAL_COLUMNS
+) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    Combinaciones unicas de `keys` en un batch columnar: devuelve las columnas
+    reducidas a una fila por combinacion (primera aparicion) y el inverso
+    para volver al orden original.
+    """
+    combined = None
+    for key in keys:
+        codes, uniques = pd.factorize(np.asarray(columns[key]), use_na_sentinel=False)
+        if combined is None:
+            combined = codes
+        else:
+            # Se vuelve a factorizar en cada paso para que el codigo no desborde
+            combined, _ = pd.factorize(combined * len(uniques) + codes)
+
+    n_unique = int(combined.max()) + 1 if len(combined) else 0
+    first = _first_occurrence(combined, n_unique)
+    return {column: np.asarray(values)[first] for column, values in columns.items()}, combined
@@ -0,0 +1,188 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from challenge.model import DelayModel
+
+
+class ServiceOverloaded(Exception):
+    """Se alcanzo el maximo de requests en vuelo; la API responde 503 + Retry-After."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Servicio sobrecargado, reintente mas tarde")
+        self.retry_after = retry_after
+
+
+# ==========================
+# Worker de procesos
+# ==========================
+# Cada proceso del pool carga su propio DelayModel (las sesiones ONNX no se serializan)
+_worker_model: Optional[DelayModel] = None
+
+
+def _init_worker(
+    top_features: List[str],
+    delay_threshold: int,
+    model_path: str,
+    prediction_table: bool,
+    inference_backend: str,
+    decision_threshold: Optional[float]
+) -> None:
+    global _worker_model
+    _worker_model = DelayModel(
+        top_features=top_features,
+        delay_threshold=delay_threshold,
+        prediction_table=prediction_table,
+        inference_backend=inference_backend,
+        decision_threshold=decision_threshold
+    )
+    _worker_model.load_model(model_path)
+
+
+def _predict_in_worker(flights: List[dict], method: str = "predict_flights") -> list:
+    return getattr(_worker_model, method)(flights)
+
+
+class InferenceExecutor:
+    """
+    Ejecuta la inferencia (pandas + onnxruntime) fuera del event loop.
+
+    - kind: "thread" (comparte el DelayModel global) o "process" (un DelayModel por proceso)
+    - max_in_flight: requests admitidos a la vez (en cola + ejecutando); al
+      superarlo se rechaza de inmediato con ServiceOverloaded
+    """
+
+    def __init__(
+        self,
+        kind: str = None,
+        max_workers: int = None,
+        max_in_flight: int = None,
+        retry_after: int = None
+    ):
+        if kind is not None:
+            self.kind = kind
+        else:
+            self.kind = os.getenv("INFERENCE_EXECUTOR", "thread").lower()
+
+        if self.kind not in ("thread", "process", "none"):
+            raise ValueError(f"INFERENCE_EXECUTOR invalido: {self.kind}")
+
+        if max_workers is not None:
+            self.max_workers = max_workers
+        else:
+            self.max_workers = int(os.getenv("INFERENCE_MAX_WORKERS", os.cpu_count() or 1))
+
+        if max_in_flight is not None:
+            self.max_in_flight = max_in_flight
+        else:
+            self.max_in_flight = int(os.getenv("INFERENCE_MAX_IN_FLIGHT", 64))
+
+        if retry_after is not None:
+            self.retry_after = retry_after
+        else:
+            self.retry_after = int(os.getenv("INFERENCE_RETRY_AFTER_SECONDS", 1))
+
+        self._executor: Optional[Executor] = None
+        self._model: Optional[DelayModel] = None
+        self.in_flight = 0
+        self.rejected = 0
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    # ==========================
+    # Ciclo de vida (lifespan)
+    # ==========================
+    def start(self, model: DelayModel) -> None:
+        if self.running or self.kind == "none":
+            return
+
+        self._model = model
+        if self.kind == "process":
+            self._executor = self._process_pool(model)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="inference"
+            )
+
+    def _process_pool(self, model: DelayModel) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                model.top_features,
+                model.delay_threshold,
+                model.model_path,
+                model.prediction_table,
+                model.inference_backend,
+                model.decision_threshold
+            )
+        )
+
+    def swap_model(self, model: DelayModel) -> None:
+        """
+        Cambia el modelo que usan los requests nuevos. En modo proceso levanta un
+        pool nuevo; el anterior termina el trabajo ya encolado y se apaga.
+        """
+        self._model = model
+        if self.kind == "process" and self._executor is not None:
+            old_executor = self._executor
+            self._executor = self._process_pool(model)
+            old_executor.shutdown(wait=False)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Cancela lo encolado y apaga el pool. Con wait=True bloquea hasta que terminen
+        las inferencias en curso: desde el event loop llamarlo con asyncio.to_thread.
+        """
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+    # ==========================
+    # Admision y ejecucion
+    # ==========================
+    def acquire(self) -> None:
+        """Reserva un lugar en la cola acotada o falla rapido con ServiceOverloaded."""
+        if self.in_flight >= self.max_in_flight:
+            self.rejected += 1
+            raise ServiceOverloaded(self.retry_after)
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def run(
+        self,
+        flights: List[dict],
+        model: Optional[DelayModel] = None,
+        method: str = "predict_flights"
+    ) -> list:
+        """
+        model: version distinta a la activa (registro de modelos). Los procesos del
+        pool solo tienen cargado el modelo activo, asi que en modo proceso esas
+        versiones corren en el thread pool por defecto del loop.
+        method: metodo de DelayModel a ejecutar (predict_flights / predict_flights_proba).
+        """
+        loop = asyncio.get_running_loop()
+        if model is not None and model is not self._model:
+            executor = None if self.kind == "process" else self._executor
+            return await loop.run_in_executor(executor, getattr(model, method), flights)
+        if self.kind == "process":
+            return await loop.run_in_executor(self._executor, _predict_in_worker, flights, method)
+        return await loop.run_in_executor(self._executor, getattr(self._model, method), flights)
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Subir cuando cambie la logica de preprocess para invalidar caches viejos
+CACHE_VERSION = 1
+HASH_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def file_digest(path: str) -> str:
+    """sha256 del contenido del archivo, leido por bloques."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """
+    Cache en disco de la matriz de features y el target de entrenamiento.
+
+    Cada entrada vive en <cache_dir>/<key>/ como features.npy + target.npy
+    (float32 / int8) y se recarga memory-mapped. La key combina el hash del
+    CSV de entrada, top_features y delay_threshold. Se conservan las
+    max_entries entradas usadas mas recientemente.
+    """
+
+    def __init__(self, cache_dir: str = None, max_entries: int = None):
+        if cache_dir is not None:
+            self.cache_dir = cache_dir
+        else:
+            self.cache_dir = os.getenv("FEATURE_CACHE_DIR", ".feature_cache")
+
+        if max_entries is not None:
+            self.max_entries = max_entries
+        else:
+            self.max_entries = int(os.getenv("FEATURE_CACHE_MAX_ENTRIES", 5))
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(data_path: str, top_features: List[str], delay_threshold: int, data_digest: str = None) -> str:
+        """`data_digest` evita volver a hashear el CSV al pedir varias keys del mismo archivo."""
+        payload = json.dumps({
+            "version": CACHE_VERSION,
+            "data": data_digest or file_digest(data_path),
+            "top_features": list(top_features),
+            "delay_threshold": delay_threshold,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    # ==========================
+    # Lectura / escritura
+    # ==========================
+    def load(self, key: str) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+        entry = self._entry(key)
+        meta_path = os.path.join(entry, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        features = np.load(os.path.join(entry, "features.npy"), mmap_mode="r")
+        target = np.load(os.path.join(entry, "target.npy"), mmap_mode="r")
+
+        # Marca de uso para el LRU
+        os.utime(meta_path)
+
+        return (
+            pd.DataFrame(features, columns=meta["columns"], copy=False),
+            pd.DataFrame(target, columns=[meta["target_column"]], copy=False),
+        )
+
+    def store(self, key: str, features: pd.DataFrame, target: pd.DataFrame) -> None:
+        # Escribimos en un directorio temporal y lo movemos: nunca queda una entrada a medias
+        tmp = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-")
+        try:
+            np.save(os.path.join(tmp, "features.npy"), np.asarray(features, dtype=np.float32))
+            np.save(os.path.join(tmp, "target.npy"), np.asarray(target, dtype=np.int8))
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump({
+                    "columns": [str(c) for c in features.columns],
+                    "target_column": str(target.columns[0]),
+                    "rows": len(features),
+                    "created_at": time.time(),
+                }, f)
+
+            entry = self._entry(key)
+            if os.path.exists(entry):
+                shutil.rmtree(entry)
+            os.replace(tmp, entry)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Elimina las entradas menos usadas recientemente sobre max_entries."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            meta_path = os.path.join(self.cache_dir, name, "meta.json")
+            if not name.startswith(".") and os.path.exists(meta_path):
+                entries.append((os.path.getmtime(meta_path), name))
+
+        entries.sort(reverse=True)
+        for _, name in entries[self.max_entries:]:
+            shutil.rmtree(self._entry(name), ignore_errors=True)
+
+    def get_or_build(
+        self,
+        data_path: str,
+        top_features: List[str],
+        delay_threshold: int,
+        build: Callable[[], Tuple[pd.DataFrame, pd.DataFrame]]
+    ) -> Tuple[pd.DataFrame, pd.DataFrame, bool]:
+        """Devuelve (features, target, hit). En un miss llama a build() y guarda el resultado."""
+        key = self.key(data_path, top_features, delay_threshold)
+        cached = self.load(key)
+        if cached is not None:
+            return cached[0], cached[1], True
+
+        features, target = build()
+        self.store(key, features, target)
+        return features, target, False
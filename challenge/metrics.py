@@ -0,0 +1,224 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+
+# Buckets de latencia en segundos (25us .. 2.5s) y de tamaño de batch (potencias de 2)
+LATENCY_BUCKETS = (
+    25e-6, 50e-6, 100e-6, 250e-6, 500e-6,
+    1e-3, 2.5e-3, 5e-3, 10e-3, 25e-3, 50e-3, 100e-3, 250e-3, 500e-3,
+    1.0, 2.5,
+)
+BATCH_SIZE_BUCKETS = tuple(float(2 ** i) for i in range(0, 17))
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    items = key + extra
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _format_value(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Histogram:
+    """Histograma con buckets fijos y labels, en el formato de Prometheus."""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series: Dict[LabelKey, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [conteos por bucket (+Inf al final), suma, total]
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(key, list(s[0]), s[1], s[2]) for key, s in self._series.items()]
+        for key, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(key, (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(_label_key(labels))
+        return series[2] if series else 0
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        lines += [f"{self.name}{_format_labels(key)} {value!r}" for key, value in snapshot]
+        return lines
+
+
+class _StageTimer:
+    """Context manager de bajo costo (sin generador) para medir una etapa."""
+
+    __slots__ = ("histogram", "stage", "start")
+
+    def __init__(self, histogram: Histogram, stage: str):
+        self.histogram = histogram
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, stage=self.stage)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+class Metrics:
+    """
+    Metricas del serving expuestas en /metrics (formato de texto de Prometheus).
+
+    Histogramas de latencia por etapa (parse, encode, table_lookup, preprocess,
+    onnx_run, numpy_run, serialize, ...), de latencia por endpoint y de tamaño
+    de batch, y contadores de requests y errores. Cada observacion es un bisect
+    y un lock; con METRICS_ENABLED=false stage() no mide nada. Los gauges
+    (profundidad de colas, requests en vuelo) se leen al renderizar.
+    """
+
+    def __init__(self, enabled: bool = None):
+        if enabled is not None:
+            self.enabled = enabled
+        else:
+            self.enabled = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+        self.stage_seconds = Histogram(
+            "delay_api_stage_seconds", "Latencia por etapa del serving", LATENCY_BUCKETS
+        )
+        self.request_seconds = Histogram(
+            "delay_api_request_seconds", "Latencia total por endpoint", LATENCY_BUCKETS
+        )
+        self.batch_size = Histogram(
+            "delay_api_batch_size", "Vuelos por request o batch de inferencia", BATCH_SIZE_BUCKETS
+        )
+        self.requests = Counter("delay_api_requests_total", "Requests por endpoint y status")
+        self.errors = Counter("delay_api_errors_total", "Errores por tipo")
+        self._gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NOOP
+        return _StageTimer(self.stage_seconds, name)
+
+    def observe_batch(self, size: int, source: str) -> None:
+        if self.enabled:
+            self.batch_size.observe(size, source=source)
+
+    def error(self, kind: str) -> None:
+        if self.enabled:
+            self.errors.inc(type=kind)
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        """Registra un gauge que se evalua en cada scrape."""
+        self._gauges[name] = (help_text, read)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in (self.stage_seconds, self.request_seconds, self.batch_size, self.requests, self.errors):
+            lines += metric.render()
+        for name, (help_text, read) in sorted(self._gauges.items()):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {float(read())!r}"]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro (sin BaseHTTPMiddleware): latencia total y status por
+    endpoint. Las rutas desconocidas se agrupan en "other" para acotar labels.
+    """
+
+    def __init__(self, app, metrics: Metrics, paths: Sequence[str]):
+        self.app = app
+        self.metrics = metrics
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"] if scope["path"] in self.paths else "other"
+        status = {"code": 500}
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.request_seconds.observe(time.perf_counter() - start, path=path)
+            self.metrics.requests.inc(path=path, status=str(status["code"]))
+            if status["code"] == 500:
+                self.metrics.error("internal")
+
+
+# Instancia del proceso: la comparten la API y DelayModel
+metrics = Metrics()
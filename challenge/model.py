@@ -1,12 +1,47 @@
 import pandas as pd
 import numpy as np
 import os
-from dotenv import load_dotenv
-from typing import Tuple, Union, List
+import sys
+from itertools import product
+from typing import Tuple, Union, List, Dict, Optional
 
-from sklearn.linear_model import LogisticRegression
-from skl2onnx import convert_sklearn
-from skl2onnx.common.data_types import FloatTensorType
+# scikit-learn, skl2onnx y python-dotenv se importan de forma diferida:
+# el serving (API) solo necesita onnxruntime/NumPy y asi arranca mas rapido
+
+try:
+    from challenge.backends import INFERENCE_BACKENDS, NumpyLinearBackend
+    from challenge.encoder import FeatureEncoder, factorize_columns, sparse_one_hot, unique_rows
+    from challenge.metrics import metrics
+    from challenge.session import SessionConfig, SessionPool
+    from challenge.time_features import compute_time_features
+except ModuleNotFoundError:
+    from backends import INFERENCE_BACKENDS, NumpyLinearBackend
+    from encoder import FeatureEncoder, factorize_columns, sparse_one_hot, unique_rows
+    from metrics import metrics
+    from session import SessionConfig, SessionPool
+    from time_features import compute_time_features
+
+
+_env_loaded = False
+
+
+def _load_env_file() -> None:
+    """Carga el .env una sola vez por proceso (pruebas locales); python-dotenv es opcional."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def _is_sgd(model) -> bool:
+    # Sin importar sklearn: si hay un SGDClassifier en memoria, el modulo ya esta cargado
+    linear_model = sys.modules.get("sklearn.linear_model")
+    return linear_model is not None and isinstance(model, linear_model.SGDClassifier)
 
 
 class DelayModel:
@@ -16,13 +51,28 @@ class DelayModel:
         top_features: List[str] = None, 
         delay_threshold: int = None, 
         random_state: int = None, 
-        model_version: str = None
+        model_version: str = None,
+        prediction_table: bool = None,
+        inference_backend: str = None,
+        decision_threshold: float = None,
+        deduplicate: bool = None
     ):
         # Cargamos el .env para las pruebas locales 
-        load_dotenv()
+        _load_env_file()
         
         self._model = None
         self._onnx_session = None
+        self._session_pool: Optional[SessionPool] = None
+        self.session_config: Optional[SessionConfig] = None
+        self._linear_backend: Optional[NumpyLinearBackend] = None
+        self._encoder: Optional[FeatureEncoder] = None
+
+        # Tabla precalculada OPERA x TIPOVUELO x MES (se construye en load_model)
+        self._prediction_table: Optional[np.ndarray] = None
+        self._proba_table: Optional[np.ndarray] = None
+        self._table_opera_index: Dict[str, int] = {}
+        self._table_tipovuelo_index: Dict[str, int] = {}
+        self._table_other_opera = -1
 
         # ==========================================
         # Args y env vars
@@ -33,6 +83,9 @@ class DelayModel:
             env_tf = os.getenv("TOP_FEATURES", "")
             self.top_features = [f.strip() for f in env_tf.split(",") if f.strip()]
 
+        # Sin top_features por argumento, load_model usa las guardadas en el ONNX (si las tiene)
+        self._top_features_from_env = top_features is None
+
         if delay_threshold is not None:
             self.delay_threshold = delay_threshold
         else:
@@ -48,9 +101,51 @@ class DelayModel:
         else:
             self.model_version = os.getenv("MODEL_VERSION", "1.0")
 
+        if prediction_table is not None:
+            self.prediction_table = prediction_table
+        else:
+            self.prediction_table = os.getenv("PREDICTION_TABLE", "true").lower() == "true"
+
+        if inference_backend is not None:
+            self.inference_backend = inference_backend
+        else:
+            self.inference_backend = os.getenv("INFERENCE_BACKEND", "onnx").lower()
+
+        if self.inference_backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"INFERENCE_BACKEND invalido: {self.inference_backend}")
+
+        # Umbral sobre P(delay) para las etiquetas; None = etiqueta del modelo (equivale a 0.5)
+        if decision_threshold is not None:
+            self.decision_threshold = decision_threshold
+        else:
+            env_dt = os.getenv("DECISION_THRESHOLD", "")
+            self.decision_threshold = float(env_dt) if env_dt else None
+
+        if self.decision_threshold is not None and not 0.0 <= self.decision_threshold <= 1.0:
+            raise ValueError(f"DECISION_THRESHOLD debe estar entre 0 y 1: {self.decision_threshold}")
+
+        # Sin umbral configurado, load_model usa el que eligio la busqueda (metadata del ONNX)
+        self._configured_decision_threshold = self.decision_threshold
+
+        # Batches grandes: se puntua una fila por combinacion unica y se reparte al orden original
+        if deduplicate is not None:
+            self.deduplicate = deduplicate
+        else:
+            self.deduplicate = os.getenv("PREDICT_DEDUP", "true").lower() == "true"
+
         # El path se define al guardar o cargar el modelo
         self.model_path = os.getenv("MODEL_PATH")
 
+        # Pares clave/valor extra que save_model agrega a metadata_props (p.ej. resultado de la busqueda)
+        self.training_metadata: Dict[str, str] = {}
+
+
+    @property
+    def encoder(self) -> FeatureEncoder:
+        # Se reconstruye solo si top_features cambio desde la ultima vez
+        if self._encoder is None or self._encoder.features != self.top_features:
+            self._encoder = FeatureEncoder(self.top_features)
+        return self._encoder
 
     # ==========================
     # Preprocesamiento
@@ -61,32 +156,48 @@ class DelayModel:
         target_column: str = None
     ) -> Union[Tuple[pd.DataFrame, pd.DataFrame], pd.DataFrame]:
 
-        features = pd.concat([
-            pd.get_dummies(data["OPERA"], prefix="OPERA"),
-            pd.get_dummies(data["TIPOVUELO"], prefix="TIPOVUELO"),
-            pd.get_dummies(data["MES"], prefix="MES"),
-        ], axis=1)
-
-        # asegurar todas las top_features
-        if self.top_features:
-            for col in self.top_features:
-                if col not in features.columns:
-                    features[col] = 0
-            features = features[self.top_features]
+        with metrics.stage("preprocess"):
+            if self.top_features:
+                # Encoder precompilado: escribe directo en una matriz float32
+                features = pd.DataFrame(
+                    self.encoder.transform(data),
+                    columns=self.top_features,
+                    index=data.index,
+                    copy=False
+                )
+            else:
+                # Sin top_features usamos todas las dummies presentes en la data
+                features = pd.concat([
+                    pd.get_dummies(data["OPERA"], prefix="OPERA"),
+                    pd.get_dummies(data["TIPOVUELO"], prefix="TIPOVUELO"),
+                    pd.get_dummies(data["MES"], prefix="MES"),
+                ], axis=1)
 
         if target_column == "delay":
-            data["Fecha-O"] = pd.to_datetime(data["Fecha-O"])
-            data["Fecha-I"] = pd.to_datetime(data["Fecha-I"])
+            # Etapa de tiempo vectorizada con formato fijo; no modifica `data`
+            time_features = compute_time_features(data, self.delay_threshold)
+            target = pd.DataFrame({target_column: time_features["delay"]}, index=data.index)
+            return features, target
 
-            data["min_diff"] = (
-                (data["Fecha-O"] - data["Fecha-I"]).dt.total_seconds() / 60
-            )
+        return features
 
-            data["delay"] = np.where(
-                data["min_diff"] > self.delay_threshold, 1, 0
-            )
+    def preprocess_sparse(
+        self,
+        data: pd.DataFrame,
+        target_column: str = None
+    ):
+        """
+        Variante de preprocess para entrenamiento con poca memoria: devuelve una
+        matriz scipy CSR. Sin top_features usa el set completo de dummies y lo
+        fija en self.top_features para que el export ONNX y el serving lo usen.
+        """
+        features, names = sparse_one_hot(data, self.top_features or None)
+        if not self.top_features:
+            self.top_features = names
 
-            target = data[[target_column]]
+        if target_column == "delay":
+            time_features = compute_time_features(data, self.delay_threshold)
+            target = pd.DataFrame({target_column: time_features["delay"]}, index=data.index)
             return features, target
 
         return features
@@ -94,9 +205,18 @@ class DelayModel:
     # ==========================
     # Entrenamiento
     # ==========================
-    def fit(self, features: pd.DataFrame, target: pd.DataFrame) -> None:
+    def fit(
+        self,
+        features: pd.DataFrame,
+        target: pd.DataFrame,
+        C: float = 1.0,
+        class_weight: Optional[str] = "balanced"
+    ) -> None:
+        from sklearn.linear_model import LogisticRegression
+
         self._model = LogisticRegression(
-            class_weight="balanced",
+            C=C,
+            class_weight=class_weight,
             random_state=self.random_state,
             max_iter=1000,
             solver="lbfgs"
@@ -105,25 +225,174 @@ class DelayModel:
         self._model.fit(features, target.values.ravel())
 
     # ==========================
-    # Predicción
+    # Entrenamiento incremental
     # ==========================
-    def predict(self, features: pd.DataFrame) -> List[int]:
-        # 1. Prioridad: ONNX
-        if self._onnx_session is not None:
-            input_name = self._onnx_session.get_inputs()[0].name
-            output_name = self._onnx_session.get_outputs()[0].name
-            preds = self._onnx_session.run(
-                [output_name],
-                {input_name: features.astype(np.float32).values}
+    def partial_fit(
+        self,
+        features: Union[pd.DataFrame, np.ndarray],
+        target: pd.DataFrame,
+        sample_weight: np.ndarray = None,
+        learning_rate: float = 0.01
+    ) -> None:
+        """
+        Actualiza un clasificador lineal (regresion logistica por SGD) con un
+        chunk de datos. learning_rate solo se usa al crear el clasificador.
+        """
+        if not _is_sgd(self._model):
+            self._model = self._new_sgd(learning_rate)
+
+        # float64 fijo: el dtype de los coeficientes debe coincidir entre chunks (y con el warm start)
+        self._model.partial_fit(
+            np.asarray(features, dtype=np.float64),
+            np.asarray(target).ravel(),
+            classes=np.array([0, 1]),
+            sample_weight=sample_weight
+        )
+
+    def warm_start(self, filepath: str, learning_rate: float = 0.01) -> None:
+        """
+        Inicializa el clasificador incremental con los coeficientes de un ONNX
+        exportado previamente, para entrenar solo sobre la data nueva.
+        """
+        backend = NumpyLinearBackend.from_onnx(filepath)
+        if self.top_features and backend.n_features != len(self.top_features):
+            raise ValueError(
+                f"El modelo {filepath} tiene {backend.n_features} features y se esperaban {len(self.top_features)}"
             )
-            return preds[0].tolist()
 
-        # 2. Secundario: Sklearn
+        # skl2onnx exporta el binario como scores [-w, w]: la ultima fila es la clase positiva
+        self._model = self._new_sgd(learning_rate)
+        self._model.coef_ = backend.coefficients[:, -1].astype(np.float64).reshape(1, -1)
+        self._model.intercept_ = backend.intercepts[-1:].astype(np.float64)
+
+    def _new_sgd(self, learning_rate: float):
+        from sklearn.linear_model import SGDClassifier
+
+        return SGDClassifier(
+            loss="log_loss",
+            learning_rate="constant",
+            eta0=learning_rate,
+            random_state=self.random_state
+        )
+
+    def _exportable_model(self):
+        """El SGD se exporta como LogisticRegression para mantener el mismo artefacto ONNX."""
+        if not _is_sgd(self._model):
+            return self._model
+
+        from sklearn.linear_model import LogisticRegression
+
+        exported = LogisticRegression()
+        exported.classes_ = self._model.classes_
+        exported.coef_ = self._model.coef_
+        exported.intercept_ = self._model.intercept_
+        exported.n_features_in_ = self._model.n_features_in_
+        exported.n_iter_ = np.array([self._model.n_iter_])
+        return exported
+
+    # ==========================
+    # Predicción
+    # ==========================
+    def predict(self, features: Union[pd.DataFrame, np.ndarray]) -> List[int]:
+        # Con umbral configurado la etiqueta sale de la probabilidad
+        if self.decision_threshold is not None:
+            return (self._proba(features) >= self.decision_threshold).astype(np.int64).tolist()
+
+        # 1. Backend lineal NumPy (INFERENCE_BACKEND=numpy) o 2. ONNX Runtime
+        if self._linear_backend is not None or self._onnx_session is not None:
+            # Sin copia cuando las features ya vienen en float32 (salida del encoder)
+            matrix = np.ascontiguousarray(features, dtype=np.float32)
+            return self._run_unique(matrix, self._run_labels).tolist()
+
+        # 3. Secundario: Sklearn
         if self._model is not None:
-            return self._model.predict(features).tolist()
+            with metrics.stage("sklearn_predict"):
+                return self._model.predict(features).tolist()
 
         raise RuntimeError("Error: El modelo no ha sido cargado. Verifique la inicialización de la API")
 
+    def _run_labels(self, matrix: np.ndarray) -> np.ndarray:
+        if self._linear_backend is not None:
+            with metrics.stage("numpy_run"):
+                return self._linear_backend.run(matrix)
+
+        with metrics.stage("onnx_run"):
+            if self._session_pool is not None:
+                with self._session_pool.acquire() as session:
+                    return self._run_session(session, matrix)
+            return self._run_session(self._onnx_session, matrix)
+
+    # Debajo de este tamaño el factorize cuesta mas de lo que ahorra
+    DEDUP_MIN_ROWS = 1024
+
+    def _run_unique(self, matrix: np.ndarray, run) -> np.ndarray:
+        """Corre `run` solo sobre las filas unicas y reparte el resultado al orden original."""
+        unique = unique_rows(matrix) if self.deduplicate and len(matrix) >= self.DEDUP_MIN_ROWS else None
+        if unique is None:
+            return run(matrix)
+        rows, inverse = unique
+        return run(rows)[inverse]
+
+    @staticmethod
+    def _run_session(session, matrix: np.ndarray) -> np.ndarray:
+        input_name = session.get_inputs()[0].name
+        output_name = session.get_outputs()[0].name
+        return session.run([output_name], {input_name: matrix})[0]
+
+    def predict_proba(self, features: Union[pd.DataFrame, np.ndarray]) -> List[float]:
+        """Probabilidad de atraso (clase 1) por fila."""
+        return self._proba(features).tolist()
+
+    def _proba(self, features: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        if self._linear_backend is not None or self._onnx_session is not None:
+            matrix = np.ascontiguousarray(features, dtype=np.float32)
+            return self._run_unique(matrix, self._run_proba)
+
+        if self._model is not None:
+            with metrics.stage("sklearn_predict"):
+                return self._model.predict_proba(features)[:, 1]
+
+        raise RuntimeError("Error: El modelo no ha sido cargado. Verifique la inicialización de la API")
+
+    def _run_proba(self, matrix: np.ndarray) -> np.ndarray:
+        if self._linear_backend is not None:
+            with metrics.stage("numpy_run"):
+                return self._linear_backend.proba(matrix)
+
+        with metrics.stage("onnx_run"):
+            if self._session_pool is not None:
+                with self._session_pool.acquire() as session:
+                    return self._run_session_proba(session, matrix)
+            return self._run_session_proba(self._onnx_session, matrix)
+
+    @staticmethod
+    def _run_session_proba(session, matrix: np.ndarray) -> np.ndarray:
+        input_name = session.get_inputs()[0].name
+        output_name = session.get_outputs()[1].name
+        probabilities = session.run([output_name], {input_name: matrix})[0]
+
+        # Artefactos exportados con ZipMap devuelven una lista de dicts {clase: prob}
+        if isinstance(probabilities, list):
+            return np.fromiter((row[1] for row in probabilities), dtype=np.float32, count=len(probabilities))
+        return np.asarray(probabilities[:, -1], dtype=np.float32)
+
+    def model_metadata(self) -> Optional[dict]:
+        """Metadata embebida en el ONNX cargado, sea cual sea el backend."""
+        if self._linear_backend is not None:
+            return self._linear_backend.metadata
+
+        if self._onnx_session is not None:
+            meta = self._onnx_session.get_modelmeta()
+            return {
+                "producer_name": meta.producer_name,
+                "graph_name": meta.graph_name,
+                "version": meta.version,
+                "description": meta.description,
+                "custom_metadata": meta.custom_metadata_map,
+            }
+
+        return None
+
     # ==========================
     # Guardar modelo ONNX
     # ==========================
@@ -131,6 +400,9 @@ class DelayModel:
         if self._model is None:
             return
 
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+
         path = filepath or self.model_path
 
         num_features = len(self.top_features) if self.top_features else self._model.n_features_in_
@@ -139,9 +411,12 @@ class DelayModel:
             ("float_input", FloatTensorType([None, num_features]))
         ]
 
+        # Sin ZipMap: las probabilidades salen como tensor (N, 2) y no como una lista de dicts
+        exported = self._exportable_model()
         onnx_model = convert_sklearn(
-            self._model,
-            initial_types=initial_type
+            exported,
+            initial_types=initial_type,
+            options={id(exported): {"zipmap": False}}
         )
 
         onnx_model.doc_string = "Delay Prediction Model - LATAM Airlines"
@@ -154,18 +429,275 @@ class DelayModel:
         meta_thr.key = "delay_threshold_minutes"
         meta_thr.value = str(self.delay_threshold)
 
+        if self.top_features:
+            meta_tf = onnx_model.metadata_props.add()
+            meta_tf.key = "top_features"
+            meta_tf.value = ",".join(self.top_features)
+
+        for key, value in self.training_metadata.items():
+            meta = onnx_model.metadata_props.add()
+            meta.key = key
+            meta.value = str(value)
+
         with open(path, "wb") as f:
             f.write(onnx_model.SerializeToString())
 
     # ==========================
     # Cargar modelo ONNX
     # ==========================
-    def load_model(self, filepath: str = None) -> None:
-        import onnxruntime as onnx_rt
-
+    def load_model(
+        self,
+        filepath: str = None,
+        session_config: SessionConfig = None,
+        **session_kwargs
+    ) -> None:
+        """
+        Carga el modelo ONNX. La configuracion de onnxruntime (threads, modo de
+        ejecucion, optimizacion del grafo, cache del modelo optimizado, tamaño
+        del pool) se pasa como SessionConfig, como kwargs o por env vars.
+        """
         path = filepath or self.model_path
 
-        if not os.path.exists(path):
+        if not path or not os.path.exists(path):
             raise FileNotFoundError(f"Modelo no encontrado: {path}")
 
-        self._onnx_session = onnx_rt.InferenceSession(path)
\ No newline at end of file
+        if self.inference_backend == "numpy":
+            # Lee coeficientes del grafo y evita importar onnxruntime
+            backend = NumpyLinearBackend.from_onnx(path)
+            self._apply_saved_metadata(path, backend.metadata["custom_metadata"], backend.n_features)
+            self._linear_backend = backend
+            self._onnx_session = None
+            self._session_pool = None
+        else:
+            config = session_config or SessionConfig(**session_kwargs)
+            sessions = config.create_sessions(path)
+            session = sessions[0]
+            self._apply_saved_metadata(
+                path, session.get_modelmeta().custom_metadata_map, session.get_inputs()[0].shape[1]
+            )
+            self._use_sessions(sessions, config)
+            self._linear_backend = None
+        self.model_path = path
+
+        if self.prediction_table and self.top_features:
+            self._build_prediction_table()
+
+    def _apply_saved_metadata(self, path: str, metadata: Dict[str, str], n_inputs) -> None:
+        """
+        Valida el artefacto contra la configuracion antes de usarlo. Las
+        top_features que escribe save_model reemplazan a las de TOP_FEATURES;
+        si se pasaron por argumento deben coincidir. ValueError si el modelo
+        no puede puntuar las features configuradas. Sin decision_threshold
+        configurado se aplica search_decision_threshold (model_train --search).
+        """
+        saved = [f for f in metadata.get("top_features", "").split(",") if f]
+        if saved and self._top_features_from_env:
+            self.top_features = saved
+        elif saved and saved != self.top_features:
+            raise ValueError(f"El modelo {path} fue entrenado con otras top_features: {','.join(saved)}")
+
+        # Dimension dinamica (None o simbolica) no se puede validar
+        if self.top_features and isinstance(n_inputs, int) and n_inputs != len(self.top_features):
+            raise ValueError(
+                f"El modelo {path} espera {n_inputs} features y top_features tiene {len(self.top_features)}"
+            )
+
+        if self._configured_decision_threshold is None:
+            saved_threshold = metadata.get("search_decision_threshold")
+            self.decision_threshold = float(saved_threshold) if saved_threshold else None
+
+    def _open_sessions(self, path: str, config: SessionConfig) -> None:
+        self._use_sessions(config.create_sessions(path), config)
+
+    def _use_sessions(self, sessions: list, config: SessionConfig) -> None:
+        self.session_config = config
+        self._onnx_session = sessions[0]
+        self._session_pool = SessionPool(sessions) if len(sessions) > 1 else None
+
+    def reopen_sessions(self, session_config: SessionConfig = None) -> None:
+        """
+        Abre sesiones onnxruntime nuevas sobre el mismo archivo, sin reconstruir
+        encoder ni tablas. Lo usa cada worker despues del fork (challenge/serve.py):
+        los thread pools de onnxruntime no sobreviven al fork y los arrays de la
+        tabla siguen compartidos copy-on-write con el padre.
+        """
+        if self._onnx_session is None:
+            return
+        self._open_sessions(self.model_path, session_config or SessionConfig())
+
+    # ==========================
+    # Tabla de predicciones precalculada
+    # ==========================
+    TABLE_MONTHS = 12
+
+    def _table_domain(self) -> Tuple[List[str], List[str]]:
+        """
+        Dominio de OPERA y TIPOVUELO que cubre la tabla. Solo los operadores
+        presentes en top_features cambian el vector de features; el resto
+        comparte la fila "otro operador" (todas las OPERA_* en 0).
+        """
+        operators = [f[len("OPERA_"):] for f in self.top_features if f.startswith("OPERA_")]
+        tipos = ["I", "N"] + [
+            f[len("TIPOVUELO_"):] for f in self.top_features
+            if f.startswith("TIPOVUELO_") and f[len("TIPOVUELO_"):] not in ("I", "N")
+        ]
+        return operators, tipos
+
+    def _build_prediction_table(self) -> None:
+        operators, tipos = self._table_domain()
+        months = list(range(1, self.TABLE_MONTHS + 1))
+        # None representa a cualquier operador fuera de top_features: no activa ninguna OPERA_*
+        grid = list(product(operators + [None], tipos, months))
+
+        # Codificamos la grilla directamente sobre top_features y la puntuamos en un solo batch
+        matrix = np.zeros((len(grid), len(self.top_features)), dtype=np.float32)
+        for j, feature in enumerate(self.top_features):
+            column, _, value = feature.partition("_")
+            for i, (opera, tipo, mes) in enumerate(grid):
+                row = {"OPERA": opera, "TIPOVUELO": tipo, "MES": str(mes)}
+                if row.get(column) == value:
+                    matrix[i, j] = 1.0
+
+        labels = np.asarray(self.predict(matrix))
+        probas = self._proba(matrix)
+
+        # Verificacion: la tabla debe coincidir exactamente con el pipeline completo
+        grid_df = pd.DataFrame(grid, columns=["OPERA", "TIPOVUELO", "MES"])
+        grid_features = self.preprocess(grid_df)
+        if list(labels.tolist()) != self.predict(grid_features):
+            raise RuntimeError("La tabla de predicciones no coincide con el modelo ONNX")
+        if not np.array_equal(probas, self._proba(grid_features)):
+            raise RuntimeError("La tabla de probabilidades no coincide con el modelo ONNX")
+
+        shape = (len(operators) + 1, len(tipos), len(months))
+        self._prediction_table = np.asarray(labels, dtype=np.int8).reshape(shape)
+        self._proba_table = np.asarray(probas, dtype=np.float32).reshape(shape)
+        self._table_opera_index = {opera: i for i, opera in enumerate(operators)}
+        self._table_tipovuelo_index = {tipo: i for i, tipo in enumerate(tipos)}
+        self._table_other_opera = len(operators)
+
+    def predict_flights(self, flights: Union[List[dict], Dict[str, np.ndarray]]) -> List[int]:
+        """
+        Predice directamente desde dicts de vuelos. Con la tabla cargada responde
+        por lookup; los vuelos fuera de la tabla (p.ej. operadores no vistos)
+        pasan por el pipeline completo preprocess + predict. Un dict de columnas
+        (payload columnar) se delega a predict_columns.
+        """
+        if isinstance(flights, dict):
+            return self.predict_columns(flights)
+        return self._score_records(flights, self._prediction_table, self.predict)
+
+    def predict_flights_proba(self, flights: Union[List[dict], Dict[str, np.ndarray]]) -> List[float]:
+        """Igual que predict_flights, pero devuelve P(delay) por vuelo."""
+        if isinstance(flights, dict):
+            return self._score_columns(flights, self._proba_table, self.predict_proba)
+        return self._score_records(flights, self._proba_table, self.predict_proba)
+
+    def predict_columns(self, columns: Dict[str, np.ndarray]) -> List[int]:
+        """
+        Version vectorizada de predict_flights para payloads columnares
+        (OPERA, TIPOVUELO, MES como arrays): lookup en la tabla con indexado
+        NumPy y fallback por el encoder solo para las filas fuera de la tabla.
+        """
+        return self._score_columns(columns, self._prediction_table, self.predict)
+
+    def _score_records(self, flights: List[dict], table: Optional[np.ndarray], score) -> list:
+        if table is None:
+            if self.top_features:
+                return self._score_unique_records(flights, score)
+            with metrics.stage("dataframe"):
+                data = pd.DataFrame(flights)
+            return score(self.preprocess(data))
+
+        predictions: list = []
+        missing: List[int] = []
+        with metrics.stage("table_lookup"):
+            for i, flight in enumerate(flights):
+                opera = self._table_opera_index.get(flight["OPERA"], self._table_other_opera)
+                tipo = self._table_tipovuelo_index.get(flight["TIPOVUELO"])
+                mes = flight["MES"]
+                if tipo is None or not 1 <= mes <= self.TABLE_MONTHS:
+                    missing.append(i)
+                    predictions.append(None)
+                else:
+                    predictions.append(table[opera, tipo, mes - 1].item())
+
+        if missing:
+            fallback = self._score_unique_records([flights[i] for i in missing], score)
+            for i, pred in zip(missing, fallback):
+                predictions[i] = pred
+
+        return predictions
+
+    def _score_columns(self, columns: Dict[str, np.ndarray], table: Optional[np.ndarray], score) -> list:
+        n_rows = len(columns["MES"])
+        if n_rows == 0:
+            return []
+
+        if table is None:
+            if self.top_features:
+                return self._score_unique_columns(columns, score).tolist()
+            with metrics.stage("dataframe"):
+                data = pd.DataFrame(columns)
+            return score(self.preprocess(data))
+
+        with metrics.stage("table_lookup"):
+            opera = self._lookup_index(self._table_opera_index, columns["OPERA"], self._table_other_opera)
+            tipo = self._lookup_index(self._table_tipovuelo_index, columns["TIPOVUELO"])
+            mes = np.asarray(columns["MES"], dtype=np.int64)
+
+            valid = (tipo >= 0) & (mes >= 1) & (mes <= self.TABLE_MONTHS)
+            predictions = np.zeros(n_rows, dtype=np.int64 if table.dtype.kind == "i" else np.float64)
+            predictions[valid] = table[opera[valid], tipo[valid], mes[valid] - 1]
+
+        if not valid.all():
+            missing = ~valid
+            subset = {column: np.asarray(values)[missing] for column, values in columns.items()}
+            predictions[missing] = self._score_unique_columns(subset, score)
+
+        return predictions.tolist()
+
+    def _score_unique_records(self, flights: List[dict], score) -> list:
+        """Codifica y puntua una vez cada combinacion (OPERA, TIPOVUELO, MES) del batch."""
+        if not self.deduplicate or len(flights) < self.DEDUP_MIN_ROWS:
+            with metrics.stage("encode"):
+                matrix = self.encoder.transform_records(flights)
+            return score(matrix)
+
+        with metrics.stage("encode"):
+            # Clave con str(): el encoder compara los valores como str, asi 1 y True no se mezclan
+            positions: Dict[tuple, int] = {}
+            unique: List[dict] = []
+            inverse = np.empty(len(flights), dtype=np.int64)
+            for i, flight in enumerate(flights):
+                key = (str(flight["OPERA"]), str(flight["TIPOVUELO"]), str(flight["MES"]))
+                position = positions.get(key)
+                if position is None:
+                    position = positions[key] = len(unique)
+                    unique.append(flight)
+                inverse[i] = position
+            matrix = self.encoder.transform_records(unique)
+        return np.asarray(score(matrix))[inverse].tolist()
+
+    def _score_unique_columns(self, columns: Dict[str, np.ndarray], score) -> np.ndarray:
+        """Version columnar de _score_unique_records, factorizando con pandas."""
+        if not self.deduplicate or len(columns["MES"]) < self.DEDUP_MIN_ROWS:
+            with metrics.stage("encode"):
+                matrix = self.encoder.transform(columns)
+            return np.asarray(score(matrix))
+
+        with metrics.stage("encode"):
+            unique, inverse = factorize_columns(columns)
+            matrix = self.encoder.transform(unique)
+        return np.asarray(score(matrix))[inverse]
+
+    @staticmethod
+    def _lookup_index(index: Dict[str, int], values: np.ndarray, default: int = -1) -> np.ndarray:
+        """Posicion de cada valor en la tabla (`default` si no esta), sin recorrer en Python."""
+        if not index:
+            # Dominio vacio (p.ej. top_features sin OPERA_*): positions[found] fallaria sobre un array vacio
+            return np.full(len(values), default, dtype=np.int64)
+        keys = pd.Index(list(index))
+        positions = np.fromiter(index.values(), dtype=np.int64, count=len(index))
+        found = keys.get_indexer(np.asarray(values, dtype=object))
+        return np.where(found >= 0, positions[found], default)
@@ -1,22 +1,29 @@
 import argparse
+import numpy as np
 import pandas as pd
 import os
 import sys
-from google.cloud import storage
 
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(os.getcwd())
 
 try:
+    from challenge.artifacts import open_store, publish_model
     from challenge.model import DelayModel
+    from challenge.feature_cache import FeatureCache
+    from challenge.search import format_results, load_search, parse_grid
 except ModuleNotFoundError:
+    from artifacts import open_store, publish_model
     from model import DelayModel
+    from feature_cache import FeatureCache
+    from search import format_results, load_search, parse_grid
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Pipeline de Entrenamiento de Atrasos")
     parser.add_argument('--data_path', type=str, required=True)
-    parser.add_argument('--bucket_name', type=str, required=True)
+    parser.add_argument('--bucket_name', type=str, required=False)
+    parser.add_argument('--artifact_store', type=str, required=False, default=os.getenv("MODEL_STORE_URI"))
     parser.add_argument('--commit_sha', type=str, required=True)
     parser.add_argument('--model_path', type=str, required=True)
     parser.add_argument('--project_id', type=str, required=False)
@@ -24,10 +31,71 @@ def parse_args():
     parser.add_argument('--learning_rate', type=float, required=False, default=0.01)
     parser.add_argument('--random_state', type=int, required=False, default=1)
     parser.add_argument('--top_features', type=str, required=False, default="")
+    parser.add_argument('--incremental', action='store_true')
+    parser.add_argument('--chunk_size', type=int, required=False, default=100_000)
+    parser.add_argument('--warm_start_model', type=str, required=False)
+    parser.add_argument('--epochs', type=int, required=False, default=1)
+    parser.add_argument('--feature_cache_dir', type=str, required=False, default=os.getenv("FEATURE_CACHE_DIR"))
+    parser.add_argument('--lean', action='store_true')
+    parser.add_argument('--search', action='store_true')
+    parser.add_argument('--search_C', type=str, required=False, default="0.01,0.1,1,10")
+    parser.add_argument('--search_class_weight', type=str, required=False, default="balanced,none")
+    parser.add_argument('--search_delay_thresholds', type=str, required=False, default="")
+    parser.add_argument('--search_folds', type=int, required=False, default=5)
+    parser.add_argument('--search_workers', type=int, required=False, default=os.cpu_count() or 1)
+    parser.add_argument('--search_metric', type=str, required=False, default="f1")
     return parser.parse_args()
 
+
+# Ingesta lean: solo las columnas que usa el modelo, con categoricas
+LEAN_COLUMNS = ["Fecha-I", "Fecha-O", "OPERA", "TIPOVUELO", "MES"]
+LEAN_DTYPES = {"OPERA": "category", "TIPOVUELO": "category", "MES": "int8", "Fecha-I": str, "Fecha-O": str}
+
+
+def read_training_data(data_path: str, lean: bool = False, chunk_size: int = None):
+    """Lee el CSV de entrenamiento; en modo lean carga solo LEAN_COLUMNS con dtypes compactos."""
+    if lean:
+        return pd.read_csv(data_path, usecols=LEAN_COLUMNS, dtype=LEAN_DTYPES, chunksize=chunk_size)
+    if chunk_size:
+        return pd.read_csv(data_path, chunksize=chunk_size, low_memory=False)
+    return pd.read_csv(data_path)
+
+
+def train_incremental(model: DelayModel, args) -> None:
+    """
+    Entrena por chunks con partial_fit sin cargar el CSV completo en memoria.
+    Con --warm_start_model parte de los coeficientes de un ONNX previo, asi
+    agregar un mes nuevo solo requiere pasar por la data nueva.
+    """
+    if not model.top_features:
+        raise ValueError("El modo incremental requiere --top_features (columnas fijas entre chunks)")
+
+    if args.warm_start_model:
+        model.warm_start(args.warm_start_model, learning_rate=args.learning_rate)
+        print(f"Warm start desde {args.warm_start_model}")
+
+    # Conteo acumulado de clases para aproximar class_weight="balanced" por chunk
+    class_counts = np.zeros(2)
+    rows = 0
+
+    for epoch in range(args.epochs):
+        for chunk in read_training_data(args.data_path, args.lean, args.chunk_size):
+            features, target = model.preprocess(chunk, target_column="delay")
+            y = target.values.ravel()
+
+            if epoch == 0:
+                class_counts += np.bincount(y, minlength=2)
+                rows += len(y)
+            weights = class_counts.sum() / (2 * np.maximum(class_counts, 1))
+
+            model.partial_fit(features, target, sample_weight=weights[y], learning_rate=args.learning_rate)
+
+    print(f"Dataset incremental: {rows} filas, {len(model.top_features)} features, {args.epochs} epoch(s)")
+
 def main():
     args = parse_args()
+    if not args.artifact_store and not args.bucket_name:
+        raise ValueError("Se requiere --bucket_name o --artifact_store (MODEL_STORE_URI)")
     
     # Procesar features (Separador '|')
     top_features_list = [f.strip() for f in args.top_features.split('|') if f.strip()]
@@ -37,31 +105,68 @@ def main():
     if not os.path.exists(args.data_path):
         raise FileNotFoundError(f"No hay data en {args.data_path}")
 
-    data = pd.read_csv(args.data_path)
-
     # Instanciar con las top_features para que el ONNX sea de tamaño 10
     model = DelayModel(
         top_features=top_features_list,
         delay_threshold=args.delay_threshold_minutes,
         random_state=args.random_state
     )
-    
-    # Preprocess + Fit
-    features, target = model.preprocess(data, target_column="delay")
-    print(f"Dataset final: {features.shape}")
-    model.fit(features, target)
+
+    if args.incremental:
+        train_incremental(model, args)
+    elif args.search:
+        # Preprocess una sola vez (o desde el feature cache) y grilla en paralelo;
+        # el ganador se reentrena con toda la data
+        delay_thresholds = parse_grid(args.search_delay_thresholds, int) or [args.delay_threshold_minutes]
+        cache = FeatureCache(args.feature_cache_dir) if args.feature_cache_dir else None
+        search = load_search(model, args.data_path, delay_thresholds, cache, read_training_data)
+        results = search.run(
+            C=parse_grid(args.search_C, float),
+            class_weight=parse_grid(args.search_class_weight, str),
+            delay_threshold=delay_thresholds,
+            folds=args.search_folds,
+            workers=args.search_workers,
+            metric=args.search_metric
+        )
+        print(format_results(results))
+
+        best = results[0]
+        print(f"Mejor configuracion ({args.search_metric}={best['score']:.4f}): "
+              f"C={best['C']}, class_weight={best['class_weight']}, delay_threshold={best['delay_threshold']}")
+        search.fit_best(best)
+    elif args.lean:
+        # Matriz sparse: sin --top_features entrena con el set completo de dummies
+        data = read_training_data(args.data_path, lean=True)
+        features, target = model.preprocess_sparse(data, target_column="delay")
+        del data
+        print(f"Dataset final (sparse): {features.shape}, nnz={features.nnz}")
+        model.fit(features, target)
+    else:
+        def build_features():
+            data = read_training_data(args.data_path)
+            return model.preprocess(data, target_column="delay")
+
+        # Preprocess (o cache memory-mapped si el CSV y la config no cambiaron) + Fit
+        if args.feature_cache_dir:
+            cache = FeatureCache(args.feature_cache_dir)
+            features, target, hit = cache.get_or_build(
+                args.data_path, model.top_features, model.delay_threshold, build_features
+            )
+            print(f"Feature cache {'HIT' if hit else 'MISS'} en {args.feature_cache_dir}")
+        else:
+            features, target = build_features()
+
+        print(f"Dataset final: {features.shape}")
+        model.fit(features, target)
     
     # Guardar local
     model.save_model(args.model_path)
 
-    # Subida a GCS
-    client = storage.Client()
-    bucket = client.bucket(args.bucket_name)
-    gcs_blob_path = f"models/{args.commit_sha}/delay_model.onnx"
-    blob = bucket.blob(gcs_blob_path)
-    blob.upload_from_filename(args.model_path)
+    # Publicacion en el store de artefactos (gs://<bucket_name> o --artifact_store)
+    store = open_store(args.artifact_store or f"gs://{args.bucket_name}")
+    digest = publish_model(store, args.model_path, args.commit_sha)
     
-    print(f"Éxito. Modelo en GCS: gs://{args.bucket_name}/{gcs_blob_path}")
+    print(f"Éxito. Modelo en {store.uri}/models/{args.commit_sha}/ (sha256 {digest})")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
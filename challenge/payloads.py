@@ -0,0 +1,174 @@
+import json
+from typing import Any, Dict, List, Mapping, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Formatos de /predict seleccionados por Content-Type
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+ARROW_STREAM_CONTENT_TYPES = ("application/vnd.apache.arrow.stream",)
+ARROW_FILE_CONTENT_TYPES = ("application/vnd.apache.arrow.file",)
+
+FLIGHT_COLUMNS = ("OPERA", "TIPOVUELO", "MES")
+TIPOVUELO_VALUES = ("I", "N")
+
+# Errores reportados por columna (un batch de 1M filas invalidas no genera 1M errores)
+MAX_ERRORS_PER_COLUMN = 20
+
+
+class UnsupportedMediaType(Exception):
+    """Content-Type desconocido o sin la dependencia opcional instalada (415)."""
+
+
+class ColumnarValidationError(ValueError):
+    """Errores de validacion con el mismo formato que los de Pydantic (400)."""
+
+    def __init__(self, errors: List[dict]):
+        super().__init__("Payload columnar invalido")
+        self.errors = errors
+
+
+# ==========================
+# Decodificacion del body
+# ==========================
+def _media_type(content_type: str) -> str:
+    return (content_type or "application/json").split(";")[0].strip().lower()
+
+
+def loads_json(body: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def _read_arrow(body: bytes, stream: bool) -> Dict[str, np.ndarray]:
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+    except ImportError as e:
+        raise UnsupportedMediaType("Payloads Arrow requieren pyarrow (pip install pyarrow)") from e
+
+    buffer = pa.py_buffer(body)
+    reader = ipc.open_stream(buffer) if stream else ipc.open_file(buffer)
+    table = reader.read_all()
+    return {name: table.column(name).to_numpy(zero_copy_only=False) for name in table.column_names}
+
+
+def decode_body(body: bytes, content_type: str) -> Any:
+    """
+    JSON (por fila {"flights": [...]} o columnar {"OPERA": [...], ...}),
+    msgpack con las mismas dos formas, o una tabla Arrow IPC (siempre columnar).
+    """
+    media_type = _media_type(content_type)
+
+    if media_type in MSGPACK_CONTENT_TYPES:
+        try:
+            import msgpack
+        except ImportError as e:
+            raise UnsupportedMediaType("Payloads msgpack requieren msgpack (pip install msgpack)") from e
+        return msgpack.unpackb(body, raw=False)
+
+    if media_type in ARROW_STREAM_CONTENT_TYPES:
+        return _read_arrow(body, stream=True)
+    if media_type in ARROW_FILE_CONTENT_TYPES:
+        return _read_arrow(body, stream=False)
+
+    if media_type.endswith("json"):
+        return loads_json(body)
+
+    raise UnsupportedMediaType(f"Content-Type no soportado: {media_type}")
+
+
+def is_columnar(payload: Any) -> bool:
+    return isinstance(payload, Mapping) and "flights" not in payload
+
+
+# ==========================
+# Validacion vectorizada
+# ==========================
+def _python_value(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _column_errors(column: str, values: np.ndarray, invalid: np.ndarray, error_type: str, msg: str) -> List[dict]:
+    return [
+        {"type": error_type, "loc": ["body", column, int(i)], "msg": msg, "input": _python_value(values[i])}
+        for i in np.flatnonzero(invalid)[:MAX_ERRORS_PER_COLUMN]
+    ]
+
+
+def _is_str(values: np.ndarray) -> np.ndarray:
+    # infer_dtype recorre el array en C; el recorrido por elemento solo ocurre si hay errores
+    if values.dtype.kind in "US" or pd.api.types.infer_dtype(values, skipna=False) == "string":
+        return np.ones(len(values), dtype=bool)
+    return np.fromiter((isinstance(v, str) for v in values), dtype=bool, count=len(values))
+
+
+def validate_columns(payload: Mapping[str, Union[list, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """
+    Valida columnas completas con operaciones NumPy (mismas reglas que Flight)
+    y devuelve OPERA/TIPOVUELO como arrays de str y MES como int64.
+    """
+    errors: List[dict] = []
+
+    missing = [c for c in FLIGHT_COLUMNS if c not in payload]
+    for column in missing:
+        errors.append({"type": "missing", "loc": ["body", column], "msg": "Field required", "input": None})
+    if errors:
+        raise ColumnarValidationError(errors)
+
+    not_list = [c for c in FLIGHT_COLUMNS if not isinstance(payload[c], (list, tuple, np.ndarray))]
+    if not_list:
+        raise ColumnarValidationError([
+            {"type": "list_type", "loc": ["body", column], "msg": "Input should be a valid list", "input": None}
+            for column in not_list
+        ])
+
+    lengths = {column: len(payload[column]) for column in FLIGHT_COLUMNS}
+    if len(set(lengths.values())) > 1:
+        raise ColumnarValidationError([{
+            "type": "value_error",
+            "loc": ["body"],
+            "msg": f"Las columnas deben tener el mismo largo: {lengths}",
+            "input": None,
+        }])
+
+    columns: Dict[str, np.ndarray] = {}
+    is_str: Dict[str, np.ndarray] = {}
+    for column in ("OPERA", "TIPOVUELO"):
+        values = np.asarray(payload[column], dtype=object)
+        is_str[column] = _is_str(values)
+        errors += _column_errors(column, values, ~is_str[column], "string_type", "Input should be a valid string")
+        columns[column] = values
+
+    invalid_tipo = is_str["TIPOVUELO"] & ~np.isin(columns["TIPOVUELO"], TIPOVUELO_VALUES)
+    errors += _column_errors(
+        "TIPOVUELO", columns["TIPOVUELO"], invalid_tipo,
+        "value_error", "Value error, TIPOVUELO debe ser 'I' (Internacional) o 'N' (Nacional)"
+    )
+
+    raw_mes = np.asarray(payload["MES"])
+    if raw_mes.dtype.kind in "iu":
+        mes = raw_mes.astype(np.int64)
+        not_int = np.zeros(len(mes), dtype=bool)
+    else:
+        # Igual que Pydantic en modo lax: acepta "7" y 7.0, rechaza 7.5 / "siete" / null
+        numeric = pd.to_numeric(pd.Series(raw_mes, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+        not_int = np.isnan(numeric) | (numeric != np.round(numeric))
+        mes = np.where(not_int, 0, numeric).astype(np.int64)
+    errors += _column_errors("MES", raw_mes, not_int, "int_parsing", "Input should be a valid integer")
+    errors += _column_errors(
+        "MES", raw_mes, ~not_int & ((mes < 1) | (mes > 12)),
+        "value_error", "Value error, MES debe estar entre 1 y 12"
+    )
+    columns["MES"] = mes
+
+    if errors:
+        raise ColumnarValidationError(errors)
+    return columns
@@ -0,0 +1,321 @@
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+PROFILE_SIGNATURE_HEADER = "X-Profile-Signature"
+# Ventana de validez de una firma (segundos) para acotar replays
+SIGNATURE_MAX_AGE_SECONDS = 300
+MAX_STACK_DEPTH = 64
+
+
+def sign_profile_request(secret: str, timestamp: int = None) -> str:
+    """Valor del header X-Profile-Signature: '<unix ts>.<hmac-sha256(secret, ts)>'."""
+    timestamp = int(time.time()) if timestamp is None else int(timestamp)
+    mac = hmac.new(secret.encode(), str(timestamp).encode(), hashlib.sha256).hexdigest()
+    return f"{timestamp}.{mac}"
+
+
+def verify_signature(secret: str, value: str, now: float = None) -> bool:
+    timestamp, _, mac = value.partition(".")
+    if not timestamp.isdigit() or not mac:
+        return False
+    now = time.time() if now is None else now
+    if abs(now - int(timestamp)) > SIGNATURE_MAX_AGE_SECONDS:
+        return False
+    return hmac.compare_digest(sign_profile_request(secret, int(timestamp)), value)
+
+
+def _frame_name(func: tuple) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def to_collapsed(stats: pstats.Stats) -> str:
+    """
+    Convierte un pstats en el formato "collapsed" de flamegraph.pl / speedscope
+    ('a;b;c <microsegundos>'). cProfile solo guarda aristas caller -> callee, asi
+    que el tiempo de cada callee se reparte segun lo que aporto cada caller.
+    """
+    raw = stats.stats
+    callees: Dict[tuple, Dict[tuple, tuple]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, info in callers.items():
+            callees.setdefault(caller, {})[func] = info
+
+    lines: Dict[str, float] = {}
+
+    def walk(func: tuple, stack: List[str], budget: float) -> None:
+        total = raw[func][3]
+        scale = budget / total if total else 0.0
+        stack = stack + [_frame_name(func)]
+        self_time = raw[func][2] * scale
+        if self_time > 0:
+            key = ";".join(stack)
+            lines[key] = lines.get(key, 0.0) + self_time
+        if len(stack) >= MAX_STACK_DEPTH:
+            return
+        for callee, info in callees.get(func, {}).items():
+            if callee in raw and _frame_name(callee) not in stack:
+                walk(callee, stack, info[3] * scale)
+
+    for func, (_, _, _, cumulative, callers) in raw.items():
+        if not callers:
+            walk(func, [], cumulative)
+
+    return "".join(f"{stack} {int(seconds * 1e6)}\n" for stack, seconds in sorted(lines.items()) if seconds >= 1e-6)
+
+
+def summarize_onnx_trace(path: str) -> Dict[str, dict]:
+    """Tiempo por nodo (us) de un trace de profiling de onnxruntime (formato chrome trace)."""
+    with open(path) as f:
+        events = json.load(f)
+    nodes: Dict[str, dict] = {}
+    for event in events:
+        if event.get("cat") != "Node" or not event.get("name", "").endswith("_kernel_time"):
+            continue
+        name = event["name"][:-len("_kernel_time")]
+        node = nodes.setdefault(name, {"op_type": event.get("args", {}).get("op_name"), "calls": 0, "us": 0})
+        node["calls"] += 1
+        node["us"] += event.get("dur", 0)
+    return nodes
+
+
+class RequestProfiler:
+    """
+    Profiling opt-in del camino de /predict.
+
+    Un request se perfila si PROFILING_ENABLED=true y sale sorteado con
+    PROFILING_SAMPLE_RATE, o si trae un X-Profile-Signature valido firmado con
+    PROFILING_SECRET (ver sign_profile_request). Los requests perfilados corren
+    el decode y la inferencia en un thread aparte (ver `call`): cProfile solo
+    mira el thread donde esta activo, asi que el resto del trafico del event
+    loop no se mezcla en el perfil. Ademas el batch pasa por una sesion
+    onnxruntime con enable_profiling para obtener el tiempo por nodo.
+
+    En PROFILING_DIR quedan <n>.pstats, <n>.collapsed (flamegraph) y el trace
+    JSON de onnxruntime; los archivos mas viejos se borran al superar
+    PROFILING_MAX_MB. La escritura (`save`) y la sesion ONNX perfilada
+    (`profile_onnx`) corren despues de enviar la respuesta, como background
+    tasks. Con todo apagado, el costo por request es leer `active`.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = None,
+        sample_rate: float = None,
+        secret: str = None,
+        output_dir: str = None,
+        max_mb: float = None,
+        onnx_profiling: bool = None
+    ):
+        if enabled is not None:
+            self.enabled = enabled
+        else:
+            self.enabled = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        else:
+            self.sample_rate = float(os.getenv("PROFILING_SAMPLE_RATE", 0.01))
+
+        if secret is not None:
+            self.secret = secret or None
+        else:
+            self.secret = os.getenv("PROFILING_SECRET") or None
+
+        if output_dir is not None:
+            self.output_dir = output_dir
+        else:
+            self.output_dir = os.getenv("PROFILING_DIR", ".profiles")
+
+        if max_mb is not None:
+            self.max_mb = max_mb
+        else:
+            self.max_mb = float(os.getenv("PROFILING_MAX_MB", 50))
+
+        if onnx_profiling is not None:
+            self.onnx_profiling = onnx_profiling
+        else:
+            self.onnx_profiling = os.getenv("PROFILING_ONNX", "true").lower() == "true"
+
+        if not 0.0 <= self.sample_rate <= 1.0:
+            raise ValueError("PROFILING_SAMPLE_RATE debe estar entre 0 y 1")
+
+        self._lock = threading.Lock()
+        self._profiling = False
+        self.reset()
+
+    @property
+    def active(self) -> bool:
+        return self.enabled or self.secret is not None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._aggregate: Optional[pstats.Stats] = None
+            self.onnx_nodes: Dict[str, dict] = {}
+            self.profiled = 0
+            self.skipped_busy = 0
+            self.onnx_errors = 0
+            self.last_files: List[str] = []
+
+    # ==========================
+    # Captura
+    # ==========================
+    def start(self, headers) -> Optional[cProfile.Profile]:
+        """Devuelve un cProfile (sin activar) si este request se perfila; si no, None."""
+        signature = headers.get(PROFILE_SIGNATURE_HEADER) if self.secret else None
+        forced = signature is not None and verify_signature(self.secret, signature)
+        if not forced and not (self.enabled and random.random() < self.sample_rate):
+            return None
+
+        # Un solo cProfile a la vez: todos los requests comparten el thread del event loop
+        with self._lock:
+            if self._profiling:
+                self.skipped_busy += 1
+                return None
+            self._profiling = True
+
+        return cProfile.Profile()
+
+    @staticmethod
+    def call(profile: cProfile.Profile, fn, *args):
+        """Corre fn(*args) con el profile activo; pensado para asyncio.to_thread."""
+        profile.enable()
+        try:
+            return fn(*args)
+        finally:
+            profile.disable()
+
+    def stop(self, profile: cProfile.Profile) -> Tuple[str, pstats.Stats]:
+        """
+        Cierra el perfil del request y lo suma al agregado, sin tocar disco.
+        Devuelve (prefijo de archivos, stats) para `save`.
+        """
+        stats = pstats.Stats(profile) if profile.getstats() else pstats.Stats()
+        with self._lock:
+            self._profiling = False
+            self.profiled += 1
+            index = self.profiled
+            if self._aggregate is None:
+                self._aggregate = pstats.Stats()
+            self._aggregate.add(stats)
+
+        prefix = os.path.join(self.output_dir, f"{int(time.time())}-{os.getpid()}-{index}")
+        return prefix, stats
+
+    def save(self, prefix: str, stats: pstats.Stats) -> None:
+        """Escribe <prefix>.pstats y <prefix>.collapsed y rota PROFILING_DIR (I/O bloqueante)."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        stats.dump_stats(prefix + ".pstats")
+        with open(prefix + ".collapsed", "w") as f:
+            f.write(to_collapsed(stats))
+        self.last_files = [prefix + ".pstats", prefix + ".collapsed"]
+        self._rotate()
+
+    async def profile_onnx(self, model, flights: Union[List[dict], Dict[str, np.ndarray]]) -> None:
+        """
+        Corre el batch del request en una sesion onnxruntime con profiling por nodo.
+        Es best-effort: un error (p.ej. el archivo del modelo cambio por un reload)
+        se registra y no afecta la respuesta ya calculada.
+        """
+        if not self.onnx_profiling or model._onnx_session is None or not model.top_features:
+            return
+        try:
+            await asyncio.to_thread(self._profile_onnx, model, flights)
+        except Exception as e:
+            with self._lock:
+                self.onnx_errors += 1
+            print(f"ERROR: No se pudo perfilar la sesion ONNX: {e}")
+
+    def _profile_onnx(self, model, flights) -> None:
+        import onnxruntime as onnx_rt
+
+        if isinstance(flights, dict):
+            matrix = model.encoder.transform(flights)
+        else:
+            matrix = model.encoder.transform_records(flights)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        options = model.session_config.session_options()
+        options.enable_profiling = True
+        options.profile_file_prefix = os.path.join(self.output_dir, f"onnx-{os.getpid()}")
+        # Sesion descartable: enable_profiling no se puede apagar en una sesion viva
+        session = onnx_rt.InferenceSession(model.model_path, options, providers=["CPUExecutionProvider"])
+        model._run_session(session, np.ascontiguousarray(matrix, dtype=np.float32))
+        trace = session.end_profiling()
+
+        nodes = summarize_onnx_trace(trace)
+        with self._lock:
+            for name, node in nodes.items():
+                total = self.onnx_nodes.setdefault(name, {"op_type": node["op_type"], "calls": 0, "us": 0})
+                total["calls"] += node["calls"]
+                total["us"] += node["us"]
+        self.last_files = self.last_files + [trace]
+        self._rotate()
+
+    def _rotate(self) -> None:
+        """Borra los archivos mas viejos de output_dir hasta quedar bajo max_mb."""
+        entries = []
+        for name in os.listdir(self.output_dir):
+            path = os.path.join(self.output_dir, name)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        limit = self.max_mb * 1024 * 1024
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            os.remove(path)
+            total -= size
+
+    # ==========================
+    # Lectura del agregado
+    # ==========================
+    def report(self, limit: int = 30) -> dict:
+        with self._lock:
+            aggregate = self._aggregate
+            text = ""
+            if aggregate is not None:
+                stream = io.StringIO()
+                view = pstats.Stats(stream=stream)
+                view.add(aggregate)
+                view.sort_stats("cumulative").print_stats(limit)
+                text = stream.getvalue()
+            return {
+                "enabled": self.enabled,
+                "sample_rate": self.sample_rate,
+                "signed_requests": self.secret is not None,
+                "profiled_requests": self.profiled,
+                "skipped_busy": self.skipped_busy,
+                "onnx_errors": self.onnx_errors,
+                "top_cumulative": text,
+                "onnx_nodes": dict(self.onnx_nodes),
+                "last_files": list(self.last_files),
+            }
+
+    def collapsed(self) -> str:
+        with self._lock:
+            return to_collapsed(self._aggregate) if self._aggregate is not None else ""
+
+    def pstats_bytes(self) -> bytes:
+        import marshal
+
+        with self._lock:
+            if self._aggregate is None:
+                return b""
+            return marshal.dumps(self._aggregate.stats)
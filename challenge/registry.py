@@ -0,0 +1,209 @@
+import asyncio
+import os
+import random
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from challenge.model import DelayModel
+from challenge.reload import build_model
+
+
+MODEL_FILENAME = "delay_model.onnx"
+
+
+class IncompatibleModelVersion(Exception):
+    """La version existe pero no se puede servir con las top_features del modelo activo (409)."""
+
+
+def parse_traffic_split(value: str) -> Dict[str, float]:
+    """'v1:90,v2:10' -> {'v1': 90.0, 'v2': 10.0}. Pesos relativos, no necesitan sumar 100."""
+    split = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        version, _, weight = item.partition(":")
+        if not weight:
+            raise ValueError(f"MODEL_TRAFFIC_SPLIT invalido: {item}")
+        split[version.strip()] = float(weight)
+    if any(weight < 0 for weight in split.values()):
+        raise ValueError("MODEL_TRAFFIC_SPLIT no admite pesos negativos")
+    return split
+
+
+def current_rss_bytes() -> Optional[int]:
+    """RSS actual del proceso (Linux, /proc/self/statm); None si no se puede leer."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _load_measured(path: str, template: DelayModel) -> Tuple[DelayModel, int]:
+    """
+    Carga una version y estima su memoria como el crecimiento del RSS durante
+    la carga (sesiones onnxruntime, encoder, tablas). Es aproximado: otros
+    threads pueden asignar memoria a la vez. Como piso se usa el tamaño del
+    ONNX, que es lo unico disponible sin /proc.
+    """
+    before = current_rss_bytes()
+    loaded = build_model(path, template)
+    after = current_rss_bytes()
+
+    size = os.path.getsize(path)
+    if before is not None and after is not None:
+        size = max(size, after - before)
+    return loaded, size
+
+
+class ModelRegistry:
+    """
+    Registro de versiones del modelo con el mismo layout que publica model_train.py:
+    <root_dir>/<version>/delay_model.onnx (version = commit sha).
+
+    Los DelayModel se cargan al primer uso con la configuracion del modelo activo
+    y se expulsan por LRU al superar max_loaded versiones o memory_budget_mb
+    (estimado con el crecimiento del RSS al cargar cada version). La version de cada request
+    se elige por header/query, luego por traffic_split y por ultimo default_version;
+    None significa "el modelo global de la API".
+    """
+
+    def __init__(
+        self,
+        root_dir: str = None,
+        max_loaded: int = None,
+        memory_budget_mb: float = None,
+        default_version: str = None,
+        traffic_split: Dict[str, float] = None,
+        template: Callable[[], DelayModel] = None
+    ):
+        if root_dir is not None:
+            self.root_dir = root_dir
+        else:
+            self.root_dir = os.getenv("MODEL_REGISTRY_DIR", "")
+
+        if max_loaded is not None:
+            self.max_loaded = max_loaded
+        else:
+            self.max_loaded = int(os.getenv("MODEL_REGISTRY_MAX_LOADED", 4))
+
+        if memory_budget_mb is not None:
+            self.memory_budget_mb = memory_budget_mb
+        else:
+            self.memory_budget_mb = float(os.getenv("MODEL_REGISTRY_MEMORY_MB", 256))
+
+        if default_version is not None:
+            self.default_version = default_version
+        else:
+            self.default_version = os.getenv("MODEL_DEFAULT_VERSION") or None
+
+        if traffic_split is not None:
+            self.traffic_split = traffic_split
+        else:
+            self.traffic_split = parse_traffic_split(os.getenv("MODEL_TRAFFIC_SPLIT", ""))
+
+        self.template = template or DelayModel
+        self._models: "OrderedDict[str, DelayModel]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.loads = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.root_dir)
+
+    def path(self, version: str) -> str:
+        return os.path.join(self.root_dir, version, MODEL_FILENAME)
+
+    def versions(self) -> List[str]:
+        """Versiones publicadas en disco (subdirectorios con delay_model.onnx)."""
+        if not self.enabled or not os.path.isdir(self.root_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root_dir)
+            if os.path.isfile(self.path(name))
+        )
+
+    # ==========================
+    # Ruteo
+    # ==========================
+    def resolve(self, requested: Optional[str] = None) -> Optional[str]:
+        """Version que atiende el request; None = modelo global."""
+        if requested:
+            return requested
+        if self.traffic_split:
+            versions = list(self.traffic_split)
+            weights = list(self.traffic_split.values())
+            if sum(weights) > 0:
+                return random.choices(versions, weights=weights)[0]
+        return self.default_version
+
+    # ==========================
+    # Carga y LRU
+    # ==========================
+    async def get(self, version: str) -> DelayModel:
+        """DelayModel de la version pedida, cargandolo fuera del event loop si hace falta."""
+        if not self.enabled:
+            raise LookupError("El registro de modelos no esta habilitado (MODEL_REGISTRY_DIR)")
+        # Evita rutas fuera de root_dir ("../", separadores)
+        if os.path.basename(version) != version or version in ("", ".", ".."):
+            raise LookupError(f"Version invalida: {version}")
+
+        if version in self._models:
+            self._models.move_to_end(version)
+            return self._models[version]
+
+        # Antes de crear el lock: un header con versiones inventadas no debe dejar entradas en _locks
+        path = self.path(version)
+        if not os.path.isfile(path):
+            raise LookupError(f"Version no encontrada: {version}")
+
+        lock = self._locks.setdefault(version, asyncio.Lock())
+        try:
+            async with lock:
+                # Otro request pudo cargarla mientras esperabamos el lock
+                if version in self._models:
+                    self._models.move_to_end(version)
+                    return self._models[version]
+
+                try:
+                    loaded, size = await asyncio.to_thread(_load_measured, path, self.template())
+                except ValueError as e:
+                    # top_features (metadata del ONNX) o ancho de entrada distintos a los del activo
+                    raise IncompatibleModelVersion(f"Version incompatible: {version}: {e}") from e
+                self._models[version] = loaded
+                self._sizes[version] = size
+                self.loads += 1
+                self._evict(keep=version)
+                return loaded
+        finally:
+            # El lock solo coordina cargas en curso; ya cargada (o fallida) no hace falta
+            if self._locks.get(version) is lock:
+                del self._locks[version]
+
+    def _evict(self, keep: str) -> None:
+        budget = self.memory_budget_mb * 1024 * 1024
+        while len(self._models) > 1 and (
+            len(self._models) > self.max_loaded or sum(self._sizes.values()) > budget
+        ):
+            version = next(iter(self._models))
+            if version == keep:
+                break
+            # Los requests en vuelo conservan su referencia; solo deja de estar en cache
+            del self._models[version]
+            del self._sizes[version]
+            self.evictions += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "root_dir": self.root_dir,
+            "default_version": self.default_version,
+            "traffic_split": self.traffic_split,
+            "loaded": list(self._models),
+            "memory_mb": round(sum(self._sizes.values()) / (1024 * 1024), 3),
+            "available": self.versions(),
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import os
+import time
+from itertools import product
+from typing import Callable, Optional
+
+import pandas as pd
+
+from challenge.model import DelayModel
+
+
+# Operador que ninguna tabla conoce: fuerza el camino de fallback en el warmup
+UNSEEN_OPERATOR = "__warmup_unseen__"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_model(path: str, template: DelayModel) -> DelayModel:
+    """
+    Crea y carga un DelayModel nuevo con la misma configuracion que el activo,
+    y lo valida sobre todo el espacio de entrada antes de exponerlo. Si el ONNX
+    trae top_features en su metadata deben ser las del activo (ValueError si no).
+    """
+    new_model = DelayModel(
+        top_features=template.top_features,
+        delay_threshold=template.delay_threshold,
+        random_state=template.random_state,
+        model_version=template.model_version,
+        prediction_table=template.prediction_table,
+        inference_backend=template.inference_backend,
+        # El umbral de la busqueda es propio de cada artefacto: solo se hereda el configurado
+        decision_threshold=template._configured_decision_threshold,
+        deduplicate=template.deduplicate
+    )
+    new_model.load_model(path, session_config=template.session_config)
+    warm_up(new_model)
+    return new_model
+
+
+def warm_up(model: DelayModel) -> None:
+    """
+    Corre el modelo sobre OPERA x TIPOVUELO x MES (operadores de top_features mas
+    uno no visto) por el camino de serving y por el pipeline completo; ambos
+    deben coincidir y devolver etiquetas 0/1.
+    """
+    operators = [f[len("OPERA_"):] for f in model.top_features if f.startswith("OPERA_")]
+    grid = [
+        {"OPERA": opera, "TIPOVUELO": tipo, "MES": mes}
+        for opera, tipo, mes in product(operators + [UNSEEN_OPERATOR], ["I", "N"], range(1, 13))
+    ]
+
+    served = model.predict_flights(grid)
+    expected = model.predict(model.preprocess(pd.DataFrame(grid)))
+
+    if served != expected:
+        raise RuntimeError("Warmup: el camino de serving no coincide con el pipeline completo")
+    if any(label not in (0, 1) for label in served):
+        raise RuntimeError("Warmup: el modelo devolvio etiquetas fuera de {0, 1}")
+
+
+class ModelReloader:
+    """
+    Hot reload del ONNX sin downtime.
+
+    reload() construye y calienta el modelo nuevo en un thread aparte y recien
+    ahi llama a on_swap, que reemplaza la referencia global de forma atomica.
+    Los requests en vuelo terminan con el modelo que ya tenian. Opcionalmente
+    vigila el mtime del archivo (MODEL_WATCH_INTERVAL_SECONDS, 0 = desactivado).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        on_swap: Callable[[DelayModel], None],
+        current: Callable[[], DelayModel],
+        watch_interval: float = None
+    ):
+        self.path = path
+        self.on_swap = on_swap
+        self.current = current
+
+        if watch_interval is not None:
+            self.watch_interval = watch_interval
+        else:
+            self.watch_interval = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", 0))
+
+        self._lock = asyncio.Lock()
+        self._watcher: Optional[asyncio.Task] = None
+        self._mtime: Optional[float] = None
+
+        self.info = {
+            "path": None,
+            "sha256": None,
+            "loaded_at": None,
+            "reloads": 0,
+            "last_error": None,
+        }
+
+    def mark_loaded(self, path: str) -> None:
+        """Registra el modelo cargado en el startup como el activo."""
+        self.path = path
+        self._mtime = os.path.getmtime(path)
+        self.info.update({"path": path, "sha256": file_sha256(path), "loaded_at": time.time()})
+
+    async def reload(self, path: str = None) -> dict:
+        path = path or self.path
+        async with self._lock:
+            try:
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"Modelo no encontrado: {path}")
+                mtime = os.path.getmtime(path)
+                new_model = await asyncio.to_thread(build_model, path, self.current())
+                sha256 = await asyncio.to_thread(file_sha256, path)
+            except Exception as e:
+                self.info["last_error"] = str(e)
+                raise
+
+            # Swap atomico: desde aqui los requests nuevos usan el modelo nuevo
+            self.on_swap(new_model)
+            self.path = path
+            self._mtime = mtime
+            self.info.update({
+                "path": path,
+                "sha256": sha256,
+                "loaded_at": time.time(),
+                "reloads": self.info["reloads"] + 1,
+                "last_error": None,
+            })
+            return dict(self.info)
+
+    # ==========================
+    # Watcher del archivo
+    # ==========================
+    async def start_watching(self) -> None:
+        if self.watch_interval > 0 and self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def stop_watching(self) -> None:
+        if self._watcher is None:
+            return
+        self._watcher.cancel()
+        try:
+            await self._watcher
+        except asyncio.CancelledError:
+            pass
+        self._watcher = None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                continue
+            if self._mtime is None or mtime > self._mtime:
+                try:
+                    await self.reload()
+                    print(f"Modelo recargado desde {self.path}")
+                except Exception as e:
+                    # El modelo activo sigue sirviendo; no reintentamos el mismo archivo
+                    self._mtime = mtime
+                    print(f"ERROR: No se pudo recargar el modelo: {e}")
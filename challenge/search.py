@@ -0,0 +1,230 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    from challenge.feature_cache import FeatureCache, file_digest
+    from challenge.model import DelayModel
+    from challenge.time_features import compute_time_features
+except ModuleNotFoundError:
+    from feature_cache import FeatureCache, file_digest
+    from model import DelayModel
+    from time_features import compute_time_features
+
+
+SEARCH_METRICS = ("f1", "roc_auc")
+
+# Umbrales de decision evaluados sobre las probabilidades out-of-fold
+DECISION_THRESHOLDS = np.round(np.arange(0.05, 0.96, 0.05), 2)
+
+
+def parse_grid(value: str, cast=float) -> list:
+    """'0.01,0.1,1' -> [0.01, 0.1, 1.0]; 'none' se convierte en None (p.ej. class_weight)."""
+    items = [v.strip() for v in value.split(",") if v.strip()]
+    return [None if v.lower() == "none" else cast(v) for v in items]
+
+
+def best_f1(target: np.ndarray, proba: np.ndarray) -> tuple:
+    """F1 de la clase 1 para cada umbral de DECISION_THRESHOLDS; devuelve (f1, umbral) del mejor."""
+    predicted = proba[None, :] >= DECISION_THRESHOLDS[:, None]
+    positives = target.astype(bool)[None, :]
+    tp = (predicted & positives).sum(axis=1)
+    fp = (predicted & ~positives).sum(axis=1)
+    fn = (~predicted & positives).sum(axis=1)
+    f1 = np.where(tp > 0, 2 * tp / np.maximum(2 * tp + fp + fn, 1), 0.0)
+    best = int(np.argmax(f1))
+    return float(f1[best]), float(DECISION_THRESHOLDS[best])
+
+
+# ==========================
+# Worker de procesos
+# ==========================
+# La matriz de features se abre memory-mapped desde el .npy del padre:
+# todos los workers leen las mismas paginas, sin copiarla por pickle
+_features: Optional[np.ndarray] = None
+_targets: Dict[int, np.ndarray] = {}
+
+
+def _init_worker(features_path: str, targets: Dict[int, np.ndarray]) -> None:
+    global _features, _targets
+    _features = np.load(features_path, mmap_mode="r")
+    _targets = targets
+
+
+def _evaluate(candidate: dict, folds: int, random_state: int, metric: str) -> dict:
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import roc_auc_score
+    from sklearn.model_selection import StratifiedKFold
+
+    start = time.perf_counter()
+    target = _targets[candidate["delay_threshold"]]
+    oof = np.zeros(len(target), dtype=np.float64)
+
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=random_state)
+    for train_idx, test_idx in splitter.split(np.zeros(len(target)), target):
+        classifier = LogisticRegression(
+            C=candidate["C"],
+            class_weight=candidate["class_weight"],
+            random_state=random_state,
+            max_iter=1000,
+            solver="lbfgs"
+        )
+        classifier.fit(_features[train_idx], target[train_idx])
+        oof[test_idx] = classifier.predict_proba(_features[test_idx])[:, 1]
+
+    f1, decision_threshold = best_f1(target, oof)
+    scores = {"f1": f1, "roc_auc": float(roc_auc_score(target, oof))}
+
+    return {
+        **candidate,
+        "score": scores[metric],
+        "f1": f1,
+        "roc_auc": scores["roc_auc"],
+        "decision_threshold": decision_threshold,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+class HyperparameterSearch:
+    """
+    Busqueda en grilla de C, class_weight y delay_threshold con validacion cruzada.
+
+    La data se preprocesa una sola vez: la matriz de features no depende de
+    delay_threshold y el target de cada umbral sale de min_diff sin volver a
+    parsear fechas. Los candidatos se evaluan en un ProcessPoolExecutor que
+    comparte la matriz memory-mapped; para cada uno se elige ademas el umbral
+    de decision con mejor F1 sobre las probabilidades out-of-fold.
+    """
+
+    def __init__(self, model: DelayModel, data: pd.DataFrame):
+        self.model = model
+        features = model.preprocess(data)
+        self.columns = [str(c) for c in features.columns]
+        self.features = np.ascontiguousarray(features, dtype=np.float32)
+        self.min_diff = compute_time_features(data, model.delay_threshold)["min_diff"]
+        self._targets: Dict[int, np.ndarray] = {}
+
+    @classmethod
+    def from_features(
+        cls,
+        model: DelayModel,
+        features: pd.DataFrame,
+        targets: Dict[int, np.ndarray]
+    ) -> "HyperparameterSearch":
+        """Busqueda sobre una matriz ya preprocesada (p.ej. del FeatureCache) y un target por delay_threshold."""
+        search = cls.__new__(cls)
+        search.model = model
+        search.columns = [str(c) for c in features.columns]
+        search.features = np.ascontiguousarray(features, dtype=np.float32)
+        search.min_diff = None
+        search._targets = {dt: np.asarray(target, dtype=np.int8) for dt, target in targets.items()}
+        return search
+
+    def target(self, delay_threshold: int) -> np.ndarray:
+        if delay_threshold in self._targets:
+            return self._targets[delay_threshold]
+        if self.min_diff is None:
+            raise KeyError(f"Sin target para delay_threshold={delay_threshold}")
+        return (self.min_diff > delay_threshold).astype(np.int8)
+
+    def run(
+        self,
+        C: Sequence[float],
+        class_weight: Sequence[Optional[str]],
+        delay_threshold: Sequence[int],
+        folds: int = 5,
+        workers: int = None,
+        metric: str = "f1"
+    ) -> List[dict]:
+        """Evalua la grilla y devuelve los resultados ordenados del mejor al peor."""
+        if metric not in SEARCH_METRICS:
+            raise ValueError(f"Metrica invalida: {metric} (opciones: {SEARCH_METRICS})")
+
+        candidates = [
+            {"C": c, "class_weight": cw, "delay_threshold": dt}
+            for c, cw, dt in product(C, class_weight, delay_threshold)
+        ]
+        targets = {dt: self.target(dt) for dt in delay_threshold}
+
+        with tempfile.TemporaryDirectory(prefix="search-") as tmp:
+            features_path = os.path.join(tmp, "features.npy")
+            np.save(features_path, self.features)
+
+            with ProcessPoolExecutor(
+                max_workers=workers or os.cpu_count() or 1,
+                initializer=_init_worker,
+                initargs=(features_path, targets)
+            ) as pool:
+                futures = [
+                    pool.submit(_evaluate, candidate, folds, self.model.random_state, metric)
+                    for candidate in candidates
+                ]
+                results = [future.result() for future in as_completed(futures)]
+
+        return sorted(results, key=lambda r: r["score"], reverse=True)
+
+    def fit_best(self, result: dict) -> None:
+        """Entrena el modelo final con la configuracion ganadora y la deja en la metadata del ONNX."""
+        self.model.delay_threshold = result["delay_threshold"]
+        target = pd.DataFrame({"delay": self.target(result["delay_threshold"])})
+        self.model.fit(self.features, target, C=result["C"], class_weight=result["class_weight"])
+
+        self.model.training_metadata.update({
+            "search_C": str(result["C"]),
+            "search_class_weight": str(result["class_weight"]),
+            "search_delay_threshold": str(result["delay_threshold"]),
+            "search_decision_threshold": str(result["decision_threshold"]),
+            "search_f1": f"{result['f1']:.6f}",
+            "search_roc_auc": f"{result['roc_auc']:.6f}",
+        })
+
+
+def load_search(
+    model: DelayModel,
+    data_path: str,
+    delay_thresholds: Sequence[int],
+    cache: Optional[FeatureCache] = None,
+    read_data: Callable[[str], pd.DataFrame] = pd.read_csv
+) -> HyperparameterSearch:
+    """
+    Arma la busqueda para `data_path`. Con `cache`, cada delay_threshold es una
+    entrada del FeatureCache (features + target): si estan todas, la busqueda
+    arranca desde los .npy sin leer el CSV ni preprocesar; si falta alguna, se
+    preprocesa una vez y se guardan las que faltaban.
+    """
+    if cache is None:
+        return HyperparameterSearch(model, read_data(data_path))
+
+    digest = file_digest(data_path)
+    keys = {dt: FeatureCache.key(data_path, model.top_features, dt, data_digest=digest) for dt in delay_thresholds}
+    cached = {dt: cache.load(key) for dt, key in keys.items()}
+
+    missing = [dt for dt, entry in cached.items() if entry is None]
+    if missing:
+        search = HyperparameterSearch(model, read_data(data_path))
+        features = pd.DataFrame(search.features, columns=search.columns, copy=False)
+        for dt in missing:
+            cache.store(keys[dt], features, pd.DataFrame({"delay": search.target(dt)}))
+        print(f"Feature cache MISS ({len(missing)}/{len(keys)}) en {cache.cache_dir}")
+        return search
+
+    print(f"Feature cache HIT en {cache.cache_dir}")
+    features = cached[delay_thresholds[0]][0]
+    targets = {dt: entry[1].iloc[:, 0].to_numpy() for dt, entry in cached.items()}
+    return HyperparameterSearch.from_features(model, features, targets)
+
+
+def format_results(results: List[dict]) -> str:
+    lines = [f"{'C':>8} {'class_weight':>12} {'delay_thr':>9} {'f1':>7} {'roc_auc':>7} {'dec_thr':>7} {'seg':>7}"]
+    for r in results:
+        lines.append(
+            f"{r['C']:>8g} {str(r['class_weight']):>12} {r['delay_threshold']:>9} "
+            f"{r['f1']:>7.4f} {r['roc_auc']:>7.4f} {r['decision_threshold']:>7.2f} {r['seconds']:>7.2f}"
+        )
+    return "\n".join(lines)
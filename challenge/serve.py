@@ -0,0 +1,182 @@
+"""
+Serving multi-proceso con pre-fork.
+
+El proceso padre importa la API y carga el modelo (encoder, tabla de
+predicciones, metadata) una sola vez, congela el heap con gc.freeze() y
+forkea N workers uvicorn que aceptan conexiones del mismo socket. Los
+modulos importados y los arrays del modelo quedan compartidos copy-on-write;
+cada worker solo abre sus propias sesiones onnxruntime (baratas: el grafo
+pesa unos KB).
+
+Threads: OMP/OpenBLAS/MKL y onnxruntime se fijan en cores // workers por
+worker (minimo 1), y con --pin_cpus cada worker queda atado a un core.
+
+Limitaciones: /metrics, /stats/*, POST /admin/reload, el scoring en sombra y
+el registro de modelos actuan sobre el worker que atiende el request. Para
+recargar todos los workers usar MODEL_WATCH_INTERVAL_SECONDS (cada worker
+vigila el archivo) o reiniciar. Por eso la imagen lo usa solo con PREFORK=true.
+
+Uso:
+    python -m challenge.serve --port 8080 --workers 4
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List
+
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "ONNX_INTRA_OP_THREADS")
+
+# Backoff entre respawns de un worker que murio (evita un loop de forks)
+RESPAWN_DELAY_SECONDS = 1.0
+
+# Seniales que apagan el supervisor (y, reenviadas como SIGTERM, a los workers)
+STOP_SIGNALS = {signal.SIGTERM, signal.SIGINT}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serving pre-fork de la API de delay")
+    parser.add_argument('--host', type=str, default="0.0.0.0")
+    parser.add_argument('--port', type=int, default=int(os.getenv("PORT", 8080)))
+    parser.add_argument('--workers', type=int, required=False, default=None)
+    parser.add_argument('--pin_cpus', action='store_true')
+    parser.add_argument('--log_level', type=str, default="info")
+    return parser.parse_args()
+
+
+def available_cpus() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def configure_threads(workers: int, cores: int) -> int:
+    """Fija los threads por worker antes de importar numpy/onnxruntime (respeta env explicitas)."""
+    threads = max(1, cores // workers)
+    for var in THREAD_ENV_VARS:
+        os.environ.setdefault(var, str(threads))
+    return threads
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """Supervisa los workers: respawn si uno muere, SIGTERM/SIGINT los apaga a todos."""
+
+    def __init__(self, sock: socket.socket, workers: int, cpus: List[int], pin_cpus: bool, log_level: str):
+        self.sock = sock
+        self.workers = workers
+        self.cpus = cpus
+        self.pin_cpus = pin_cpus
+        self.log_level = log_level
+        self.children: Dict[int, int] = {}
+        self.stopping = False
+
+    def spawn(self, index: int) -> None:
+        # SIGTERM/SIGINT bloqueadas durante el fork: un hijo recien creado no debe
+        # correr el handler heredado del supervisor (stop) antes de resetearlo
+        signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+        pid = os.fork()
+        if pid == 0:
+            for signum in STOP_SIGNALS:
+                signal.signal(signum, signal.SIG_DFL)
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+            code = 0
+            try:
+                self._run_worker(index)
+            except BaseException as e:
+                print(f"ERROR: worker {index} termino con error: {e}", file=sys.stderr)
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = index
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+
+    def _run_worker(self, index: int) -> None:
+        import uvicorn
+        from challenge import api
+
+        if self.pin_cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, {self.cpus[index % len(self.cpus)]})
+
+        api.model.reopen_sessions()
+        config = uvicorn.Config(api.app, log_level=self.log_level, lifespan="on")
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def stop(self, signum=None, frame=None) -> None:
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        # Handlers antes del primer fork: un SIGTERM durante el arranque no deja workers huerfanos
+        for signum in STOP_SIGNALS:
+            signal.signal(signum, self.stop)
+        for index in range(self.workers):
+            if self.stopping:
+                break
+            self.spawn(index)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            index = self.children.pop(pid, None)
+            if index is None or self.stopping:
+                continue
+            print(f"worker {index} (pid {pid}) termino con status {status}; relanzando", file=sys.stderr)
+            time.sleep(RESPAWN_DELAY_SECONDS)
+            # Un SIGTERM durante el backoff no debe dejar un worker que nadie apaga
+            if self.stopping:
+                continue
+            self.spawn(index)
+
+
+def main():
+    args = parse_args()
+    cpus = available_cpus()
+    workers = args.workers or int(os.getenv("WEB_CONCURRENCY", len(cpus)))
+    threads = configure_threads(workers, len(cpus))
+
+    # Importa pandas/numpy/onnxruntime y carga el modelo una sola vez en el padre.
+    # Las sesiones del padre usan 1 thread: un thread pool creado antes del fork
+    # no existiria en los hijos; cada worker abre las suyas con reopen_sessions()
+    from challenge import api
+    try:
+        api.preload(intra_op_threads=1, inter_op_threads=1, pool_size=1)
+        print(f"Modelo cargado en el padre; {workers} workers con {threads} thread(s) cada uno")
+    except Exception as e:
+        # Igual que el lifespan: se sirve igual y cada worker reintenta la carga al arrancar
+        print(f"ERROR CRÍTICO: No se pudo cargar el modelo: {e}")
+
+    sock = bind_socket(args.host, args.port)
+
+    # Los objetos del padre pasan a la generacion permanente: el GC de los workers
+    # no los recorre ni les escribe el header, y sus paginas siguen compartidas
+    gc.collect()
+    gc.freeze()
+
+    server = PreforkServer(sock, workers, cpus, args.pin_cpus, args.log_level)
+    server.run()
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import queue
+from contextlib import contextmanager
+from typing import List
+
+
+EXECUTION_MODES = ("sequential", "parallel")
+GRAPH_OPTIMIZATION_LEVELS = ("disable", "basic", "extended", "all")
+
+
+class SessionConfig:
+    """
+    Configuracion de las sesiones onnxruntime de DelayModel.
+
+    Para una regresion logistica de 10 features el pool de threads intra-op por
+    defecto cuesta mas en sincronizacion que el modelo mismo, por eso el default
+    es un solo thread por sesion. Cada parametro se puede fijar por env var.
+    """
+
+    def __init__(
+        self,
+        intra_op_threads: int = None,
+        inter_op_threads: int = None,
+        execution_mode: str = None,
+        graph_optimization_level: str = None,
+        optimized_model_path: str = None,
+        pool_size: int = None
+    ):
+        if intra_op_threads is not None:
+            self.intra_op_threads = intra_op_threads
+        else:
+            self.intra_op_threads = int(os.getenv("ONNX_INTRA_OP_THREADS", 1))
+
+        if inter_op_threads is not None:
+            self.inter_op_threads = inter_op_threads
+        else:
+            self.inter_op_threads = int(os.getenv("ONNX_INTER_OP_THREADS", 1))
+
+        if execution_mode is not None:
+            self.execution_mode = execution_mode
+        else:
+            self.execution_mode = os.getenv("ONNX_EXECUTION_MODE", "sequential").lower()
+
+        if graph_optimization_level is not None:
+            self.graph_optimization_level = graph_optimization_level
+        else:
+            self.graph_optimization_level = os.getenv("ONNX_GRAPH_OPTIMIZATION", "all").lower()
+
+        if optimized_model_path is not None:
+            self.optimized_model_path = optimized_model_path
+        else:
+            self.optimized_model_path = os.getenv("ONNX_OPTIMIZED_MODEL_PATH") or None
+
+        if pool_size is not None:
+            self.pool_size = pool_size
+        else:
+            self.pool_size = int(os.getenv("ONNX_SESSION_POOL_SIZE", 1))
+
+        if self.execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"ONNX_EXECUTION_MODE invalido: {self.execution_mode}")
+        if self.graph_optimization_level not in GRAPH_OPTIMIZATION_LEVELS:
+            raise ValueError(f"ONNX_GRAPH_OPTIMIZATION invalido: {self.graph_optimization_level}")
+        if self.pool_size < 1:
+            raise ValueError("ONNX_SESSION_POOL_SIZE debe ser >= 1")
+
+    def session_options(self, optimize: bool = True):
+        import onnxruntime as onnx_rt
+
+        options = onnx_rt.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = self.inter_op_threads
+        options.execution_mode = {
+            "sequential": onnx_rt.ExecutionMode.ORT_SEQUENTIAL,
+            "parallel": onnx_rt.ExecutionMode.ORT_PARALLEL,
+        }[self.execution_mode]
+
+        level = self.graph_optimization_level if optimize else "disable"
+        options.graph_optimization_level = {
+            "disable": onnx_rt.GraphOptimizationLevel.ORT_DISABLE_ALL,
+            "basic": onnx_rt.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+            "extended": onnx_rt.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+            "all": onnx_rt.GraphOptimizationLevel.ORT_ENABLE_ALL,
+        }[level]
+        return options
+
+    def cache_path(self, path: str) -> str:
+        """
+        Ruta del grafo optimizado de `path`: lleva el sha256 del modelo fuente en
+        el nombre, asi dos modelos distintos (reload, canary, shadow) nunca
+        comparten el mismo cache.
+        """
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        root, ext = os.path.splitext(self.optimized_model_path)
+        return f"{root}.{digest.hexdigest()[:16]}{ext or '.onnx'}"
+
+    def create_session(self, path: str, cache: str = None):
+        import onnxruntime as onnx_rt
+
+        if self.optimized_model_path is None:
+            return onnx_rt.InferenceSession(path, self.session_options())
+
+        # Cache del grafo optimizado: si existe para este contenido lo cargamos sin volver a optimizar
+        cache = cache or self.cache_path(path)
+        if os.path.exists(cache):
+            return onnx_rt.InferenceSession(cache, self.session_options(optimize=False))
+
+        options = self.session_options()
+        options.optimized_model_filepath = cache
+        return onnx_rt.InferenceSession(path, options)
+
+    def create_sessions(self, path: str) -> list:
+        cache = self.cache_path(path) if self.optimized_model_path is not None else None
+        sessions = [self.create_session(path, cache)]
+        # El primer load escribe el cache; el resto del pool lo reutiliza
+        sessions += [self.create_session(path, cache) for _ in range(self.pool_size - 1)]
+        return sessions
+
+    def as_dict(self) -> dict:
+        return {
+            "intra_op_threads": self.intra_op_threads,
+            "inter_op_threads": self.inter_op_threads,
+            "execution_mode": self.execution_mode,
+            "graph_optimization_level": self.graph_optimization_level,
+            "optimized_model_path": self.optimized_model_path,
+            "pool_size": self.pool_size,
+        }
+
+
+class SessionPool:
+    """Pool de sesiones ONNX para servir desde varios threads sin compartir una sola sesion."""
+
+    def __init__(self, sessions: List):
+        self.sessions = list(sessions)
+        self._available: queue.Queue = queue.Queue()
+        for session in self.sessions:
+            self._available.put(session)
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    @contextmanager
+    def acquire(self):
+        session = self._available.get()
+        try:
+            yield session
+        finally:
+            self._available.put(session)
@@ -0,0 +1,158 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from challenge.model import DelayModel
+from challenge.reload import build_model
+
+
+class ShadowScorer:
+    """
+    Scoring en sombra de un ONNX candidato sobre el trafico real.
+
+    /predict responde con el modelo activo y luego encola (vuelos, predicciones)
+    con put_nowait: si la cola esta llena el item se descarta y se cuenta en
+    "dropped", nunca se espera. Un worker en segundo plano codifica los vuelos
+    con el mismo FeatureEncoder, puntua con el candidato en su propio thread y
+    acumula acuerdo/desacuerdo y la matriz de confusion (live vs candidato).
+    """
+
+    def __init__(self, model_path: str = None, queue_size: int = None):
+        if model_path is not None:
+            self.model_path = model_path
+        else:
+            self.model_path = os.getenv("SHADOW_MODEL_PATH", "")
+
+        if queue_size is not None:
+            self.queue_size = queue_size
+        else:
+            self.queue_size = int(os.getenv("SHADOW_QUEUE_SIZE", 256))
+
+        self.candidate: Optional[DelayModel] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Un solo thread: el candidato no compite con el pool de inferencia principal
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.stats = {}
+        self.reset_stats()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.model_path)
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def reset_stats(self) -> None:
+        self.stats = {
+            "requests": 0,
+            "flights": 0,
+            "agree": 0,
+            "disagree": 0,
+            "dropped": 0,
+            "errors": 0,
+            # confusion[live][candidate]
+            "confusion": {"0": {"0": 0, "1": 0}, "1": {"0": 0, "1": 0}},
+        }
+
+    def snapshot(self) -> dict:
+        scored = self.stats["agree"] + self.stats["disagree"]
+        return {
+            "enabled": self.running,
+            "candidate_path": self.model_path or None,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "agreement_rate": self.stats["agree"] / scored if scored else None,
+            **self.stats,
+        }
+
+    # ==========================
+    # Ciclo de vida (lifespan)
+    # ==========================
+    async def start(self, template: DelayModel) -> None:
+        """Carga y calienta el candidato con la configuracion del modelo activo."""
+        if self.running or not self.enabled:
+            return
+        self.candidate = await asyncio.to_thread(build_model, self.model_path, template)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        self._queue = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    # ==========================
+    # Encolado y worker
+    # ==========================
+    def submit(self, flights: Union[List[dict], Dict[str, np.ndarray]], live: List[int]) -> bool:
+        """No bloquea: devuelve False si el item se descarto por cola llena."""
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait((flights, live))
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            return False
+        return True
+
+    def _score(self, flights: Union[List[dict], Dict[str, np.ndarray]]) -> List[int]:
+        candidate = self.candidate
+        if not candidate.top_features:
+            matrix = candidate.preprocess(pd.DataFrame(flights))
+        elif isinstance(flights, dict):
+            # Payload columnar: dict de arrays
+            matrix = candidate.encoder.transform(flights)
+        else:
+            matrix = candidate.encoder.transform_records(flights)
+        return candidate.predict(matrix)
+
+    def _record(self, live: List[int], shadow: List[int]) -> None:
+        live_array = np.asarray(live)
+        shadow_array = np.asarray(shadow)
+        agree = int((live_array == shadow_array).sum())
+
+        self.stats["requests"] += 1
+        self.stats["flights"] += len(live)
+        self.stats["agree"] += agree
+        self.stats["disagree"] += len(live) - agree
+        for live_label in (0, 1):
+            for shadow_label in (0, 1):
+                count = int(((live_array == live_label) & (shadow_array == shadow_label)).sum())
+                self.stats["confusion"][str(live_label)][str(shadow_label)] += count
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            flights, live = await self._queue.get()
+            try:
+                shadow = await loop.run_in_executor(self._executor, self._score, flights)
+                self._record(live, shadow)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Un error del candidato nunca afecta al trafico principal
+                self.stats["errors"] += 1
+                self.stats["last_error"] = str(e)
+            finally:
+                self._queue.task_done()
+
+    async def drain(self) -> None:
+        """Espera a que el worker procese lo encolado (tests / shutdown ordenado)."""
+        if self._queue is not None:
+            await self._queue.join()
@@ -0,0 +1,101 @@
+import os
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+ISO_FORMAT = "%Y-%m-%d %H:%M:%S"
+SECONDS_PER_DAY = 86_400
+NAT = np.iinfo(np.int64).min
+
+# Codigos de period_day (ver README): mañana 5:00-11:59, tarde 12:00-18:59, noche 19:00-4:59
+PERIOD_DAY_LABELS = ("morning", "afternoon", "night")
+
+# Temporada alta como rangos (MMDD inicio, MMDD fin) inclusivos
+HIGH_SEASON_RANGES = ((1215, 1231), (101, 303), (715, 731), (911, 930))
+
+
+def parse_epoch_seconds(values: Sequence, fmt: str = None) -> np.ndarray:
+    """
+    Parsea fechas con formato fijo a segundos epoch (int64), sin inferir formato.
+    Con el formato ISO por defecto usa el parser nativo de datetime64 de NumPy.
+    """
+    fmt = fmt or os.getenv("DATETIME_FORMAT", ISO_FORMAT)
+    array = np.asarray(values)
+
+    if fmt == ISO_FORMAT and array.dtype.kind in "OUS":
+        try:
+            return array.astype("datetime64[s]").astype(np.int64)
+        except (ValueError, TypeError):
+            # Valores nulos o mal formados: caemos al parser de pandas (NaT)
+            pass
+
+    parsed = pd.to_datetime(pd.Series(array), format=fmt, cache=False)
+    return parsed.to_numpy(dtype="datetime64[s]").astype(np.int64)
+
+
+def _month_day(epoch: np.ndarray) -> np.ndarray:
+    """MMDD como entero (p.ej. 1215 para 15 de diciembre)."""
+    days = (epoch // SECONDS_PER_DAY).astype("datetime64[D]")
+    months = days.astype("datetime64[M]")
+    month = months.astype(np.int64) % 12 + 1
+    day = (days - months.astype("datetime64[D]")).astype(np.int64) + 1
+    return month * 100 + day
+
+
+def compute_time_features(
+    data: pd.DataFrame,
+    delay_threshold: int,
+    fmt: str = None
+) -> Dict[str, np.ndarray]:
+    """
+    Etapa vectorizada de features de tiempo. No modifica `data`.
+
+    Devuelve arrays NumPy con:
+      - min_diff: minutos entre Fecha-O y Fecha-I
+      - delay: 1 si min_diff > delay_threshold
+      - high_season, period_day (codigo en PERIOD_DAY_LABELS), day_of_week (lunes=0)
+    """
+    fecha_i = parse_epoch_seconds(data["Fecha-I"].to_numpy(), fmt)
+    fecha_o = parse_epoch_seconds(data["Fecha-O"].to_numpy(), fmt)
+
+    # Fechas nulas (NaT) quedan con min_diff NaN y delay 0, como en pandas
+    missing = (fecha_i == NAT) | (fecha_o == NAT)
+    min_diff = np.where(missing, np.nan, (fecha_o - fecha_i) / 60)
+    delay = (min_diff > delay_threshold).astype(np.int8)
+
+    month_day = _month_day(fecha_i)
+    high_season = np.zeros(len(fecha_i), dtype=bool)
+    for start, end in HIGH_SEASON_RANGES:
+        high_season |= (month_day >= start) & (month_day <= end)
+
+    hour = (fecha_i % SECONDS_PER_DAY) // 3600
+    period_day = np.full(len(fecha_i), 2, dtype=np.int8)
+    period_day[(hour >= 5) & (hour < 12)] = 0
+    period_day[(hour >= 12) & (hour < 19)] = 1
+
+    # 1970-01-01 fue jueves (3 con lunes=0)
+    day_of_week = ((fecha_i // SECONDS_PER_DAY + 3) % 7).astype(np.int8)
+
+    return {
+        "min_diff": min_diff,
+        "delay": delay,
+        "high_season": high_season.astype(np.int8),
+        "period_day": period_day,
+        "day_of_week": day_of_week,
+    }
+
+
+def time_feature_candidates(time_features: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """
+    One-hot de las features de tiempo derivadas (high_season, period_day_*,
+    day_of_week_*) para analisis de importancia. No se pueden usar como
+    top_features: el payload de serving no trae Fecha-I y el encoder las rechaza.
+    """
+    columns = {"high_season": time_features["high_season"]}
+    for code, label in enumerate(PERIOD_DAY_LABELS):
+        columns[f"period_day_{label}"] = (time_features["period_day"] == code).astype(np.int8)
+    for day in range(7):
+        columns[f"day_of_week_{day}"] = (time_features["day_of_week"] == day).astype(np.int8)
+    return pd.DataFrame(columns)
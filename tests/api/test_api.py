@@ -1,7 +1,9 @@
 import unittest
+import json
 
 from fastapi.testclient import TestClient
 from challenge import app
+from tests.conftest import load_test_model
 
 
 class TestBatchPipeline(unittest.TestCase):
@@ -64,4 +66,85 @@ class TestBatchPipeline(unittest.TestCase):
         }
         # when("xgboost.XGBClassifier").predict(ANY).thenReturn(np.array([0]))
         response = self.client.post("/predict", json=data)
-        self.assertEqual(response.status_code, 400)
\ No newline at end of file
+        self.assertEqual(response.status_code, 400)
+
+class TestStreamPipeline(unittest.TestCase):
+
+    def setUp(self):
+        from challenge import api
+
+        self.api = api
+        self.original_model = api.model
+        self.original_chunk_size = api.stream_chunk_size
+        api.model = load_test_model()
+        api.stream_chunk_size = 2
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.api.model = self.original_model
+        self.api.stream_chunk_size = self.original_chunk_size
+
+    def test_should_stream_predictions(self):
+        flights = [
+            {"OPERA": "Grupo LATAM", "TIPOVUELO": "I", "MES": 7},
+            {"OPERA": "Aerolineas Argentinas", "TIPOVUELO": "N", "MES": 3},
+            {"OPERA": "Copa Air", "TIPOVUELO": "I", "MES": 12},
+        ]
+        body = "\n".join(json.dumps(f) for f in flights)
+        response = self.client.post("/predict/stream", content=body)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([line["predict"] for line in lines], self.api.model.predict_flights(flights))
+
+    def test_should_stream_line_errors(self):
+        body = "\n".join([
+            json.dumps({"OPERA": "Aerolineas Argentinas", "TIPOVUELO": "N", "MES": 3}),
+            json.dumps({"OPERA": "Aerolineas Argentinas", "TIPOVUELO": "O", "MES": 13}),
+            "no es json",
+        ]) + "\n"
+        response = self.client.post("/predict/stream", content=body)
+
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(lines[0], {"predict": 0})
+        self.assertIn("error", lines[1])
+        self.assertIn("error", lines[2])
+        self.assertEqual(self.api.inference.in_flight, 0)
+
+    def test_should_stream_non_object_line_as_validation_error(self):
+        body = "\n".join([
+            "[1]",
+            json.dumps({"OPERA": "Aerolineas Argentinas", "TIPOVUELO": "O", "MES": 3}),
+        ])
+        response = self.client.post("/predict/stream", content=body)
+        predict_error = self.client.post("/predict", json={"flights": [[1]]}).json()
+
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(lines[0]["error"], f"Linea 1: {predict_error['detail']}")
+        self.assertEqual(lines[0]["errors"][0]["type"], "dict_type")
+        self.assertEqual(lines[0]["errors"][0]["loc"], ["line", 1])
+        self.assertEqual(lines[1]["error"], f"Linea 2: {predict_error['detail']}")
+        self.assertEqual(lines[1]["errors"][0]["loc"], ["line", 2, "TIPOVUELO"])
+
+    def test_stream_slot_released_when_send_fails(self):
+        """Si el cliente se fue antes de leer el body, el lugar en el executor igual se libera"""
+        import asyncio
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            raise OSError("cliente desconectado")
+
+        async def scenario():
+            scope = {"type": "http", "method": "POST", "path": "/predict/stream", "headers": []}
+            response = await self.api.post_predict_stream(self.api.Request(scope, receive))
+            self.assertEqual(self.api.inference.in_flight, 1)
+            with self.assertRaises(OSError):
+                await response(scope, receive, send)
+
+        asyncio.run(scenario())
+        self.assertEqual(self.api.inference.in_flight, 0)
@@ -0,0 +1,173 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+
+from challenge import api
+from challenge.artifacts import (
+    CHUNK_BYTES,
+    FilesystemStore,
+    HashingWriter,
+    ModelArtifacts,
+    checksum_key,
+    model_key,
+    open_store,
+    publish_model,
+    stream_sha256
+)
+from challenge.model import DelayModel
+from tests.conftest import FEATURES_COLS, MODEL_PATH
+
+
+COMMIT_SHA = "5e7333b7ac03d95a6a448cf41f2d3c6f7a575d71"
+
+
+class TestArtifactStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store_dir = os.path.join(self.tmp_dir, "store")
+        self.cache_dir = os.path.join(self.tmp_dir, "cache")
+        self.store = FilesystemStore(self.store_dir)
+        self.digest = publish_model(self.store, MODEL_PATH, COMMIT_SHA)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_publish_layout(self):
+        self.assertEqual(self.digest, stream_sha256(MODEL_PATH))
+        self.assertTrue(self.store.exists(model_key(COMMIT_SHA)))
+        self.assertEqual(self.store.read_text(checksum_key(COMMIT_SHA)).strip(), self.digest)
+        self.assertTrue(os.path.exists(os.path.join(self.store_dir, "models", COMMIT_SHA, "delay_model.onnx")))
+
+    def test_open_store(self):
+        self.assertIsInstance(open_store(self.store_dir), FilesystemStore)
+        self.assertEqual(open_store(f"file://{self.store_dir}").root, self.store_dir)
+
+    def test_hashing_writer_streams(self):
+        data = os.urandom(CHUNK_BYTES + 123)
+        sink = io.BytesIO()
+        writer = HashingWriter(sink)
+        source = os.path.join(self.tmp_dir, "blob.bin")
+        with open(source, "wb") as f:
+            f.write(data)
+        FilesystemStore(self.tmp_dir).download("blob.bin", writer)
+        self.assertEqual(sink.getvalue(), data)
+        self.assertEqual(writer.size, len(data))
+        self.assertEqual(writer.hexdigest(), stream_sha256(source))
+
+    def test_fetch_uses_cache(self):
+        artifacts = ModelArtifacts(store_uri=self.store_dir, cache_dir=self.cache_dir, version=COMMIT_SHA)
+
+        path = artifacts.fetch()
+        self.assertEqual(os.path.basename(path), f"{self.digest}.onnx")
+        self.assertEqual(stream_sha256(path), self.digest)
+        self.assertEqual(artifacts.downloads, 1)
+
+        # Segunda resolucion: ni siquiera consulta el store
+        shutil.rmtree(self.store_dir)
+        self.assertEqual(artifacts.fetch(), path)
+        self.assertEqual(artifacts.downloads, 1)
+
+    def test_corrupt_cache_is_downloaded_again(self):
+        artifacts = ModelArtifacts(store_uri=self.store_dir, cache_dir=self.cache_dir, version=COMMIT_SHA)
+        path = artifacts.fetch()
+        with open(path, "ab") as f:
+            f.write(b"x")
+
+        self.assertEqual(artifacts.fetch(), path)
+        self.assertEqual(stream_sha256(path), self.digest)
+        self.assertEqual(artifacts.downloads, 2)
+
+    def test_checksum_mismatch_is_rejected(self):
+        self.store.write_text(checksum_key(COMMIT_SHA), "0" * 64)
+        artifacts = ModelArtifacts(store_uri=self.store_dir, cache_dir=self.cache_dir, version=COMMIT_SHA)
+
+        with self.assertRaises(ValueError):
+            artifacts.fetch()
+        self.assertEqual(os.listdir(os.path.join(self.cache_dir, "blobs")), [])
+
+        with self.assertRaises(FileNotFoundError):
+            artifacts.fetch("version-inexistente")
+
+    def test_invalid_version_is_rejected(self):
+        artifacts = ModelArtifacts(store_uri=self.store_dir, cache_dir=self.cache_dir, version=COMMIT_SHA)
+        for version in ("../..", "..", f"{COMMIT_SHA}/../{COMMIT_SHA}", "/etc"):
+            with self.assertRaises(ValueError):
+                artifacts.fetch(version)
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, "versions")))
+
+    def test_invalid_published_checksum_is_rejected(self):
+        """El .sha256 del store nombra el blob del cache: no puede escapar de cache_dir"""
+        artifacts = ModelArtifacts(store_uri=self.store_dir, cache_dir=self.cache_dir, version=COMMIT_SHA)
+        for published in ("../../../tmp/evil", self.digest.upper(), self.digest[:63], ""):
+            self.store.write_text(checksum_key(COMMIT_SHA), published + "\n")
+            with self.assertRaises(ValueError):
+                artifacts.fetch()
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, "blobs")))
+        self.assertEqual(artifacts.downloads, 0)
+
+    def test_corrupt_version_entry_is_resolved_again(self):
+        artifacts = ModelArtifacts(store_uri=self.store_dir, cache_dir=self.cache_dir, version=COMMIT_SHA)
+        path = artifacts.fetch()
+        with open(os.path.join(self.cache_dir, "versions", COMMIT_SHA), "w") as f:
+            f.write("../../fuera")
+
+        self.assertEqual(artifacts.fetch(), path)
+        self.assertEqual(artifacts.cached_digest(COMMIT_SHA), self.digest)
+
+    def test_store_interface_is_abstract(self):
+        from challenge.artifacts import ArtifactStore
+
+        with self.assertRaises(TypeError):
+            ArtifactStore()
+
+    def test_disabled_without_store(self):
+        self.assertFalse(ModelArtifacts(store_uri="").enabled)
+        with self.assertRaises(ValueError):
+            ModelArtifacts(store_uri=self.store_dir, cache_dir=self.cache_dir, version="").fetch()
+
+
+class TestApiArtifacts(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        store_dir = os.path.join(self.tmp_dir, "store")
+        publish_model(FilesystemStore(store_dir), MODEL_PATH, COMMIT_SHA)
+
+        self.original = (api.model, api.artifacts, api.model_file, api.admin_token, api.batcher.predict_fn)
+        self.original_reloader = (api.reloader.path, dict(api.reloader.info))
+        api.model = DelayModel(top_features=FEATURES_COLS)
+        api.artifacts = ModelArtifacts(
+            store_uri=store_dir, cache_dir=os.path.join(self.tmp_dir, "cache"), version=COMMIT_SHA
+        )
+
+    def tearDown(self):
+        api.model, api.artifacts, api.model_file, api.admin_token, api.batcher.predict_fn = self.original
+        api.reloader.path, info = self.original_reloader
+        api.reloader.info.clear()
+        api.reloader.info.update(info)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_startup_serves_store_version(self):
+        with TestClient(api.app) as client:
+            version = client.get("/version").json()
+            self.assertEqual(version["active_model"]["sha256"], stream_sha256(MODEL_PATH))
+            self.assertEqual(version["active_model"]["path"], api.artifacts.fetch())
+
+            api.admin_token = "secreto"
+            response = client.post(
+                "/admin/reload", headers={"X-Admin-Token": "secreto"}, json={"version": "no-existe"}
+            )
+            self.assertEqual(response.status_code, 409)
+            response = client.post(
+                "/admin/reload", headers={"X-Admin-Token": "secreto"}, json={"version": "../.."}
+            )
+            self.assertEqual(response.status_code, 409)
+            response = client.post(
+                "/admin/reload", headers={"X-Admin-Token": "secreto"}, json={"version": COMMIT_SHA}
+            )
+            self.assertEqual(response.status_code, 200)
@@ -0,0 +1,52 @@
+import asyncio
+import unittest
+
+from challenge.batching import MicroBatcher
+
+
+class TestMicroBatcher(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.calls = []
+
+        def predict_fn(flights):
+            self.calls.append(len(flights))
+            return [flight["MES"] for flight in flights]
+
+        self.batcher = MicroBatcher(predict_fn, max_batch_size=8, max_wait_us=50_000)
+        await self.batcher.start()
+
+    async def asyncTearDown(self):
+        await self.batcher.stop()
+
+    async def test_concurrent_requests_share_batch(self):
+        requests = [
+            [{"MES": 1}],
+            [{"MES": 2}, {"MES": 3}],
+            [{"MES": 4}],
+        ]
+        results = await asyncio.gather(*(self.batcher.submit(r) for r in requests))
+
+        self.assertEqual(results, [[1], [2, 3], [4]])
+        self.assertEqual(self.calls, [4])
+
+        stats = self.batcher.snapshot()
+        self.assertEqual(stats["batches"], 1)
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["flights"], 4)
+        self.assertEqual(stats["batch_size_histogram"], {"4": 1})
+
+    async def test_batch_size_limit(self):
+        requests = [[{"MES": i}] * 4 for i in range(4)]
+        results = await asyncio.gather(*(self.batcher.submit(r) for r in requests))
+
+        self.assertEqual(results, [[i] * 4 for i in range(4)])
+        self.assertEqual(self.calls, [8, 8])
+
+    async def test_errors_propagate_to_callers(self):
+        def failing(flights):
+            raise ValueError("boom")
+
+        self.batcher.predict_fn = failing
+        with self.assertRaises(ValueError):
+            await self.batcher.submit([{"MES": 1}])
@@ -0,0 +1,90 @@
+import asyncio
+import time
+import unittest
+
+from fastapi.testclient import TestClient
+from challenge import api
+from challenge.executor import InferenceExecutor, ServiceOverloaded
+from tests.conftest import load_test_model
+
+
+class TestInferenceExecutor(unittest.IsolatedAsyncioTestCase):
+
+    FLIGHTS = [
+        {"OPERA": "Grupo LATAM", "TIPOVUELO": "I", "MES": 7},
+        {"OPERA": "Aerolineas Argentinas", "TIPOVUELO": "N", "MES": 3},
+    ]
+
+    def setUp(self):
+        self.model = load_test_model()
+
+    async def test_thread_executor_matches_model(self):
+        executor = InferenceExecutor(kind="thread", max_workers=2, max_in_flight=4)
+        executor.start(self.model)
+        try:
+            async with executor.slot():
+                preds = await executor.run(self.FLIGHTS)
+        finally:
+            executor.shutdown()
+        self.assertEqual(preds, self.model.predict_flights(self.FLIGHTS))
+
+    async def test_process_executor_matches_model(self):
+        executor = InferenceExecutor(kind="process", max_workers=1, max_in_flight=4)
+        executor.start(self.model)
+        try:
+            preds = await executor.run(self.FLIGHTS)
+        finally:
+            executor.shutdown()
+        self.assertEqual(preds, self.model.predict_flights(self.FLIGHTS))
+
+    async def test_shutdown_off_the_event_loop(self):
+        """El lifespan espera las inferencias en curso sin bloquear el event loop"""
+        executor = InferenceExecutor(kind="thread", max_workers=1)
+        executor.start(self.model)
+        executor._executor.submit(time.sleep, 0.3)
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.to_thread(executor.shutdown, True)
+        task.cancel()
+
+        self.assertFalse(executor.running)
+        self.assertGreater(ticks, 5)
+
+    async def test_slot_sheds_load_when_full(self):
+        executor = InferenceExecutor(kind="thread", max_in_flight=1, retry_after=3)
+        async with executor.slot():
+            with self.assertRaises(ServiceOverloaded) as ctx:
+                async with executor.slot():
+                    pass
+        self.assertEqual(ctx.exception.retry_after, 3)
+        self.assertEqual(executor.rejected, 1)
+        self.assertEqual(executor.in_flight, 0)
+
+    def test_invalid_kind(self):
+        with self.assertRaises(ValueError):
+            InferenceExecutor(kind="gpu")
+
+
+class TestLoadShedding(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(api.app)
+        self.max_in_flight = api.inference.max_in_flight
+
+    def tearDown(self):
+        api.inference.max_in_flight = self.max_in_flight
+
+    def test_should_return_503_with_retry_after(self):
+        api.inference.max_in_flight = 0
+        data = {"flights": [{"OPERA": "Aerolineas Argentinas", "TIPOVUELO": "N", "MES": 3}]}
+        response = self.client.post("/predict", json=data)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], str(api.inference.retry_after))
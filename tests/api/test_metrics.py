@@ -0,0 +1,81 @@
+import unittest
+
+from fastapi.testclient import TestClient
+
+from challenge import api
+from challenge.metrics import Counter, Histogram, Metrics
+from tests.conftest import load_test_model
+
+
+class TestMetricsPrimitives(unittest.TestCase):
+
+    def test_histogram_cumulative_buckets(self):
+        histogram = Histogram("demo_seconds", "demo", (0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, stage="parse")
+
+        lines = histogram.render()
+        self.assertIn('demo_seconds_bucket{stage="parse",le="0.1"} 2', lines)
+        self.assertIn('demo_seconds_bucket{stage="parse",le="1.0"} 3', lines)
+        self.assertIn('demo_seconds_bucket{stage="parse",le="+Inf"} 4', lines)
+        self.assertIn('demo_seconds_count{stage="parse"} 4', lines)
+        self.assertEqual(histogram.count(stage="parse"), 4)
+
+    def test_counter_and_label_escaping(self):
+        counter = Counter("demo_total", "demo")
+        counter.inc(type='a"b')
+        counter.inc(type='a"b')
+        self.assertEqual(counter.value(type='a"b'), 2)
+        self.assertIn('demo_total{type="a\\"b"} 2', counter.render())
+
+    def test_disabled_is_noop(self):
+        metrics = Metrics(enabled=False)
+        with metrics.stage("parse"):
+            pass
+        metrics.observe_batch(10, source="request")
+        metrics.error("validation")
+        self.assertEqual(metrics.stage_seconds.count(stage="parse"), 0)
+        self.assertEqual(metrics.batch_size.count(source="request"), 0)
+        self.assertEqual(metrics.errors.value(type="validation"), 0)
+
+    def test_gauges_are_read_on_render(self):
+        metrics = Metrics(enabled=True)
+        depth = [3]
+        metrics.gauge("demo_queue_depth", "demo", lambda: depth[0])
+        self.assertIn("demo_queue_depth 3.0", metrics.render())
+        depth[0] = 5
+        self.assertIn("demo_queue_depth 5.0", metrics.render())
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(api.app)
+        self.original_model = api.model
+        api.model = load_test_model(prediction_table=False)
+
+    def tearDown(self):
+        api.model = self.original_model
+
+    def test_metrics_after_predict(self):
+        stages = api.metrics.stage_seconds
+        before = {stage: stages.count(stage=stage) for stage in ("parse", "encode", "onnx_run", "serialize")}
+        errors_before = api.metrics.errors.value(type="validation")
+
+        flights = [{"OPERA": "Grupo LATAM", "TIPOVUELO": "I", "MES": 7}]
+        self.assertEqual(self.client.post("/predict", json={"flights": flights}).status_code, 200)
+        self.assertEqual(self.client.post("/predict", json={"flights": [{**flights[0], "MES": 13}]}).status_code, 400)
+
+        for stage, count in before.items():
+            self.assertGreater(stages.count(stage=stage), count, stage)
+        self.assertEqual(api.metrics.errors.value(type="validation"), errors_before + 1)
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        body = response.text
+        self.assertIn("# TYPE delay_api_stage_seconds histogram", body)
+        self.assertIn('delay_api_stage_seconds_count{stage="onnx_run"}', body)
+        self.assertIn('delay_api_batch_size_bucket{source="request",le="1.0"}', body)
+        self.assertIn('delay_api_requests_total{path="/predict",status="200"}', body)
+        self.assertIn("delay_api_inference_in_flight 0.0", body)
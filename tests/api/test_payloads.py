@@ -0,0 +1,151 @@
+import importlib.util
+import json
+import unittest
+
+import msgpack
+import numpy as np
+from fastapi.testclient import TestClient
+
+from challenge import api
+from challenge.payloads import ColumnarValidationError, validate_columns
+from tests.conftest import load_test_model
+
+
+FLIGHTS = [
+    {"OPERA": "Grupo LATAM", "TIPOVUELO": "I", "MES": 7},
+    {"OPERA": "Aerolineas Argentinas", "TIPOVUELO": "N", "MES": 3},
+    {"OPERA": "Copa Air", "TIPOVUELO": "I", "MES": 12},
+    {"OPERA": "Operador Nuevo", "TIPOVUELO": "N", "MES": 10},
+]
+
+COLUMNS = {column: [flight[column] for flight in FLIGHTS] for column in ("OPERA", "TIPOVUELO", "MES")}
+
+
+class TestValidateColumns(unittest.TestCase):
+
+    def test_valid_columns(self):
+        columns = validate_columns({**COLUMNS, "MES": ["7", 3.0, 12, 10]})
+        self.assertEqual(columns["MES"].tolist(), [7, 3, 12, 10])
+        self.assertEqual(columns["MES"].dtype, np.int64)
+        self.assertEqual(list(columns["OPERA"]), COLUMNS["OPERA"])
+
+    def test_invalid_values_report_row_errors(self):
+        with self.assertRaises(ColumnarValidationError) as ctx:
+            validate_columns({
+                "OPERA": ["Grupo LATAM", 5, "Copa Air"],
+                "TIPOVUELO": ["I", "O", "N"],
+                "MES": [13, 7, 7.5],
+            })
+        locs = {tuple(error["loc"]) for error in ctx.exception.errors}
+        self.assertEqual(locs, {
+            ("body", "OPERA", 1),
+            ("body", "TIPOVUELO", 1),
+            ("body", "MES", 0),
+            ("body", "MES", 2),
+        })
+
+    def test_structural_errors(self):
+        with self.assertRaises(ColumnarValidationError):
+            validate_columns({"OPERA": ["Grupo LATAM"], "TIPOVUELO": ["I"]})
+        with self.assertRaises(ColumnarValidationError):
+            validate_columns({"OPERA": ["Grupo LATAM"], "TIPOVUELO": ["I", "N"], "MES": [7]})
+        with self.assertRaises(ColumnarValidationError):
+            validate_columns({"OPERA": "Grupo LATAM", "TIPOVUELO": ["I"], "MES": [7]})
+
+
+class TestPayloadFormats(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(api.app)
+        self.original_model = api.model
+        api.model = load_test_model()
+        self.expected = api.model.predict_flights(FLIGHTS)
+
+    def tearDown(self):
+        api.model = self.original_model
+
+    def test_predict_columns_matches_rows(self):
+        columns = validate_columns(COLUMNS)
+        self.assertEqual(api.model.predict_columns(columns), self.expected)
+
+        no_table = load_test_model(prediction_table=False)
+        self.assertEqual(no_table.predict_columns(columns), self.expected)
+
+    def test_columnar_json(self):
+        response = self.client.post("/predict", json=COLUMNS)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"predict": self.expected})
+
+    def test_columnar_json_invalid_is_400(self):
+        response = self.client.post("/predict", json={**COLUMNS, "MES": [7, 3, 12, 13]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"][0]["loc"], ["body", "MES", 3])
+
+    def test_msgpack_rows_and_columns(self):
+        headers = {"Content-Type": "application/msgpack"}
+        for payload in ({"flights": FLIGHTS}, COLUMNS):
+            response = self.client.post("/predict", content=msgpack.packb(payload), headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), {"predict": self.expected})
+
+    def test_row_json_invalid_is_400(self):
+        response = self.client.post("/predict", json={"flights": [{**FLIGHTS[0], "TIPOVUELO": "O"}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"][0]["loc"], ["body", "flights", 0, "TIPOVUELO"])
+
+    def test_malformed_json_is_400(self):
+        response = self.client.post("/predict", content=b"{no json", headers={"Content-Type": "application/json"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unsupported_content_type_is_415(self):
+        response = self.client.post("/predict", content=b"OPERA,MES", headers={"Content-Type": "text/csv"})
+        self.assertEqual(response.status_code, 415)
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "requiere pyarrow")
+    def test_arrow_stream(self):
+        import pyarrow as pa
+
+        table = pa.table(COLUMNS)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+        response = self.client.post(
+            "/predict",
+            content=sink.getvalue().to_pybytes(),
+            headers={"Content-Type": "application/vnd.apache.arrow.stream"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), {"predict": self.expected})
+
+
+class TestPredictProba(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(api.app)
+        self.original_model = api.model
+        api.model = load_test_model()
+
+    def tearDown(self):
+        api.model = self.original_model
+
+    def test_predict_proba_rows_and_columns(self):
+        expected = api.model.predict_flights_proba(FLIGHTS)
+        for payload in ({"flights": FLIGHTS}, COLUMNS):
+            response = self.client.post("/predict_proba", json=payload)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            np.testing.assert_allclose(body["predict_proba"], expected, rtol=1e-6)
+            self.assertEqual(body["predict"], api.model.predict_flights(FLIGHTS))
+            self.assertEqual(body["threshold"], 0.5)
+
+    def test_predict_proba_threshold(self):
+        response = self.client.post("/predict_proba?threshold=0", json={"flights": FLIGHTS})
+        self.assertEqual(response.json()["predict"], [1] * len(FLIGHTS))
+
+        response = self.client.post("/predict_proba?threshold=2", json={"flights": FLIGHTS})
+        self.assertEqual(response.status_code, 400)
+
+    def test_predict_proba_invalid_payload_is_400(self):
+        response = self.client.post("/predict_proba", json={"flights": [{**FLIGHTS[0], "MES": 13}]})
+        self.assertEqual(response.status_code, 400)
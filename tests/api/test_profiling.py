@@ -0,0 +1,146 @@
+import cProfile
+import marshal
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+
+from challenge import api
+from challenge.profiling import (
+    PROFILE_SIGNATURE_HEADER,
+    RequestProfiler,
+    sign_profile_request,
+    to_collapsed,
+    verify_signature
+)
+from tests.conftest import load_test_model
+
+
+FLIGHTS = [
+    {"OPERA": "Grupo LATAM", "TIPOVUELO": "I", "MES": 7},
+    {"OPERA": "Operador Nuevo", "TIPOVUELO": "N", "MES": 3},
+]
+
+
+def _work(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+class TestProfilingHelpers(unittest.TestCase):
+
+    def test_signature(self):
+        value = sign_profile_request("secreto", timestamp=1_000_000)
+        self.assertTrue(verify_signature("secreto", value, now=1_000_100))
+        self.assertFalse(verify_signature("otro", value, now=1_000_100))
+        self.assertFalse(verify_signature("secreto", value, now=1_001_000))
+        self.assertFalse(verify_signature("secreto", value.replace(".", ".0"), now=1_000_100))
+        self.assertFalse(verify_signature("secreto", "basura", now=1_000_100))
+
+    def test_to_collapsed(self):
+        profile = cProfile.Profile()
+        profile.enable()
+        _work(50_000)
+        profile.disable()
+
+        lines = to_collapsed(pstats.Stats(profile)).splitlines()
+        self.assertTrue(lines)
+        stack, _, micros = lines[0].rpartition(" ")
+        self.assertTrue(int(micros) > 0)
+        self.assertTrue(any("_work" in line for line in lines))
+
+
+class TestRequestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.client = TestClient(api.app)
+        self.original = (api.model, api.profiler, api.admin_token)
+        api.model = load_test_model(prediction_table=False)
+        api.admin_token = "secreto"
+
+    def tearDown(self):
+        api.model, api.profiler, api.admin_token = self.original
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_sampled_request_is_profiled(self):
+        api.profiler = RequestProfiler(enabled=True, sample_rate=1.0, output_dir=self.tmp_dir, max_mb=50)
+        response = self.client.post("/predict", json={"flights": FLIGHTS})
+        self.assertEqual(response.status_code, 200)
+
+        files = os.listdir(self.tmp_dir)
+        self.assertTrue(any(f.endswith(".pstats") for f in files))
+        self.assertTrue(any(f.endswith(".collapsed") for f in files))
+        self.assertTrue(any(f.endswith(".json") for f in files))
+
+        report = self.client.get("/admin/profile", headers={"X-Admin-Token": "secreto"}).json()["profile"]
+        self.assertEqual(report["profiled_requests"], 1)
+        self.assertIn("_run_session", report["top_cumulative"])
+        self.assertTrue(report["onnx_nodes"])
+
+        collapsed = self.client.get("/admin/profile?format=collapsed", headers={"X-Admin-Token": "secreto"})
+        self.assertIn("_decode_flights", collapsed.text)
+        # Solo el thread del request: nada del event loop (awaits, otros requests)
+        self.assertNotIn("_run_once", collapsed.text)
+        self.assertNotIn("_run_scoring", collapsed.text)
+        raw = self.client.get("/admin/profile?format=pstats", headers={"X-Admin-Token": "secreto"}).content
+        self.assertTrue(marshal.loads(raw))
+
+    def test_stop_defers_file_io_to_save(self):
+        output_dir = os.path.join(self.tmp_dir, "perfiles")
+        profiler = RequestProfiler(enabled=True, sample_rate=1.0, output_dir=output_dir)
+        profile = profiler.start({})
+        profiler.call(profile, sum, range(1000))
+
+        prefix, stats = profiler.stop(profile)
+        self.assertFalse(os.path.exists(output_dir))
+        self.assertEqual(profiler.profiled, 1)
+        # El flag se libera en stop: el proximo request se puede perfilar aunque save no haya corrido
+        self.assertIsNotNone(profiler.start({}))
+
+        profiler.save(prefix, stats)
+        self.assertTrue(os.path.exists(prefix + ".pstats"))
+        self.assertTrue(os.path.exists(prefix + ".collapsed"))
+
+    def test_onnx_profiling_failure_keeps_response(self):
+        api.profiler = RequestProfiler(enabled=True, sample_rate=1.0, output_dir=self.tmp_dir)
+        api.model.model_path = os.path.join(self.tmp_dir, "reemplazado.onnx")
+
+        response = self.client.post("/predict", json={"flights": FLIGHTS})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["predict"]), 2)
+        self.assertEqual(api.profiler.onnx_errors, 1)
+        self.assertEqual(api.profiler.profiled, 1)
+
+    def test_signed_header_forces_profile(self):
+        api.profiler = RequestProfiler(enabled=False, secret="firma", output_dir=self.tmp_dir)
+        self.client.post("/predict", json={"flights": FLIGHTS})
+        self.client.post("/predict", json={"flights": FLIGHTS}, headers={PROFILE_SIGNATURE_HEADER: "1.x"})
+        self.assertEqual(api.profiler.profiled, 0)
+
+        headers = {PROFILE_SIGNATURE_HEADER: sign_profile_request("firma")}
+        self.assertEqual(self.client.post("/predict", json={"flights": FLIGHTS}, headers=headers).status_code, 200)
+        self.assertEqual(api.profiler.profiled, 1)
+
+    def test_files_rotated_under_cap(self):
+        api.profiler = RequestProfiler(enabled=True, sample_rate=1.0, output_dir=self.tmp_dir, max_mb=0.05)
+        for _ in range(5):
+            self.client.post("/predict", json={"flights": FLIGHTS})
+
+        total = sum(os.path.getsize(os.path.join(self.tmp_dir, f)) for f in os.listdir(self.tmp_dir))
+        self.assertLessEqual(total, 0.05 * 1024 * 1024)
+        self.assertEqual(api.profiler.profiled, 5)
+
+    def test_disabled_profiler_is_inactive(self):
+        profiler = RequestProfiler(enabled=False, secret="")
+        self.assertFalse(profiler.active)
+        api.profiler = profiler
+        self.assertEqual(self.client.post("/predict", json={"flights": FLIGHTS}).status_code, 200)
+        self.assertEqual(profiler.profiled, 0)
+        self.assertEqual(os.listdir(self.tmp_dir), [])
+
+    def test_profile_endpoint_requires_token(self):
+        response = self.client.get("/admin/profile", headers={"X-Admin-Token": "otro"})
+        self.assertEqual(response.status_code, 403)
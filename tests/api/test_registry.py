@@ -0,0 +1,178 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+from fastapi.testclient import TestClient
+from challenge import api
+from challenge.model import DelayModel
+from challenge.registry import ModelRegistry, parse_traffic_split
+from tests.conftest import FEATURES_COLS, MODEL_PATH, flights_csv, load_test_model
+
+
+def make_registry_dir(versions):
+    root = tempfile.mkdtemp()
+    for version in versions:
+        os.makedirs(os.path.join(root, version))
+        shutil.copy(MODEL_PATH, os.path.join(root, version, "delay_model.onnx"))
+    return root
+
+
+class TestModelRegistry(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.root = make_registry_dir(["abc123", "def456", "fed789"])
+        self.template = DelayModel(top_features=FEATURES_COLS)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def registry(self, **kwargs):
+        return ModelRegistry(root_dir=self.root, template=lambda: self.template, **kwargs)
+
+    def test_parse_traffic_split(self):
+        self.assertEqual(parse_traffic_split("abc123:90, def456:10"), {"abc123": 90.0, "def456": 10.0})
+        self.assertEqual(parse_traffic_split(""), {})
+        with self.assertRaises(ValueError):
+            parse_traffic_split("abc123")
+
+    def test_versions_lists_published_models(self):
+        self.assertEqual(self.registry().versions(), ["abc123", "def456", "fed789"])
+
+    def test_resolve_order(self):
+        registry = self.registry(default_version="abc123", traffic_split={})
+        self.assertEqual(registry.resolve("def456"), "def456")
+        self.assertEqual(registry.resolve(None), "abc123")
+
+        registry.traffic_split = {"def456": 1, "abc123": 0}
+        self.assertEqual(registry.resolve(None), "def456")
+
+    async def test_lazy_load_and_lru_eviction(self):
+        registry = self.registry(max_loaded=2, memory_budget_mb=100)
+        self.assertEqual(registry.snapshot()["loaded"], [])
+
+        first = await registry.get("abc123")
+        self.assertIs(await registry.get("abc123"), first)
+        await registry.get("def456")
+        # abc123 pasa a ser la mas reciente; se expulsa def456
+        await registry.get("abc123")
+        await registry.get("fed789")
+
+        self.assertEqual(registry.snapshot()["loaded"], ["abc123", "fed789"])
+        self.assertEqual(registry.loads, 3)
+        self.assertEqual(registry.evictions, 1)
+        self.assertEqual(first.top_features, FEATURES_COLS)
+
+    async def test_memory_budget_evicts(self):
+        # Cada carga hace crecer el RSS 40 MB: con 60 MB de presupuesto entra una sola version
+        rss = iter(range(0, 400 * 1024 * 1024, 40 * 1024 * 1024))
+        registry = self.registry(max_loaded=10, memory_budget_mb=60)
+        with mock.patch("challenge.registry.current_rss_bytes", side_effect=lambda: next(rss)):
+            await registry.get("abc123")
+            self.assertEqual(registry.snapshot()["memory_mb"], 40)
+            await registry.get("def456")
+        self.assertEqual(registry.snapshot()["loaded"], ["def456"])
+        self.assertEqual(registry.evictions, 1)
+
+    async def test_memory_estimate_without_proc(self):
+        registry = self.registry()
+        with mock.patch("challenge.registry.current_rss_bytes", return_value=None):
+            await registry.get("abc123")
+        self.assertEqual(registry._sizes["abc123"], os.path.getsize(MODEL_PATH))
+
+    async def test_unknown_or_invalid_version(self):
+        registry = self.registry()
+        for version in ["missing", "../abc123", ""]:
+            with self.assertRaises(LookupError):
+                await registry.get(version)
+
+        with self.assertRaises(LookupError):
+            await ModelRegistry(root_dir="").get("abc123")
+
+    async def test_locks_do_not_accumulate(self):
+        registry = self.registry()
+        for i in range(50):
+            with self.assertRaises(LookupError):
+                await registry.get(f"inventada-{i}")
+        self.assertEqual(registry._locks, {})
+
+        # Archivo corrupto: la carga falla y el lock tampoco queda
+        with open(registry.path("abc123"), "wb") as f:
+            f.write(b"no es onnx")
+        with self.assertRaises(Exception):
+            await registry.get("abc123")
+        self.assertEqual(registry._locks, {})
+
+
+class TestRegistryRouting(unittest.TestCase):
+
+    FLIGHTS = {"flights": [{"OPERA": "Grupo LATAM", "TIPOVUELO": "I", "MES": 7}]}
+
+    def setUp(self):
+        self.root = make_registry_dir(["abc123"])
+        self.client = TestClient(api.app)
+        self.original_model = api.model
+        self.original_registry = api.registry
+
+        api.model = load_test_model()
+        api.registry = ModelRegistry(root_dir=self.root, template=lambda: api.model, traffic_split={})
+
+    def tearDown(self):
+        api.model = self.original_model
+        api.registry = self.original_registry
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_header_routes_to_version(self):
+        response = self.client.post("/predict", json=self.FLIGHTS, headers={"X-Model-Version": "abc123"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Model-Version"], "abc123")
+        self.assertEqual(response.json(), {"predict": api.model.predict_flights(self.FLIGHTS["flights"])})
+        self.assertEqual(api.registry.snapshot()["loaded"], ["abc123"])
+
+    def test_predict_proba_uses_version_threshold(self):
+        template = DelayModel(top_features=FEATURES_COLS, decision_threshold=0.0)
+        api.registry = ModelRegistry(root_dir=self.root, template=lambda: template, traffic_split={})
+        headers = {"X-Model-Version": "abc123"}
+
+        proba = self.client.post("/predict_proba", json=self.FLIGHTS, headers=headers).json()
+        self.assertEqual(proba["threshold"], 0.0)
+        self.assertEqual(proba["predict"], self.client.post("/predict", json=self.FLIGHTS, headers=headers).json()["predict"])
+        self.assertEqual(proba["predict"], [1])
+        # Sin header responde el modelo global, con su propio umbral
+        self.assertEqual(self.client.post("/predict_proba", json=self.FLIGHTS).json()["threshold"], 0.5)
+
+    def test_query_param_routes_to_version(self):
+        response = self.client.post("/predict?model_version=abc123", json=self.FLIGHTS)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Model-Version"], "abc123")
+
+    def test_default_uses_active_model(self):
+        with mock.patch.object(api.registry, "get") as get:
+            response = self.client.post("/predict", json=self.FLIGHTS)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Model-Version", response.headers)
+        get.assert_not_called()
+
+    def test_unknown_version_returns_404(self):
+        response = self.client.post("/predict", json=self.FLIGHTS, headers={"X-Model-Version": "nope"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_incompatible_version_returns_409(self):
+        """Una version entrenada con otras top_features se rechaza limpio, sin 500"""
+        data = pd.read_csv(flights_csv(), low_memory=False).head(2000)
+        canary = DelayModel(top_features=FEATURES_COLS[:5])
+        canary.fit(*canary.preprocess(data, target_column="delay"))
+        os.makedirs(os.path.join(self.root, "canary"))
+        canary.save_model(os.path.join(self.root, "canary", "delay_model.onnx"))
+
+        response = self.client.post("/predict", json=self.FLIGHTS, headers={"X-Model-Version": "canary"})
+        self.assertEqual(response.status_code, 409)
+        self.assertIn("top_features", response.json()["detail"])
+        self.assertNotIn("canary", api.registry.snapshot()["loaded"])
+
+    def test_models_endpoint(self):
+        response = self.client.get("/models")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["registry"]["available"], ["abc123"])
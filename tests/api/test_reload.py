@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+from challenge import api
+from challenge.reload import ModelReloader, build_model, file_sha256
+from tests.conftest import FEATURES_COLS, MODEL_PATH, load_test_model
+
+
+class TestModelReloader(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.model = load_test_model()
+        self.swapped = []
+        self.reloader = ModelReloader(
+            MODEL_PATH,
+            on_swap=self.swapped.append,
+            current=lambda: self.model,
+            watch_interval=0
+        )
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_build_model_keeps_config(self):
+        new_model = build_model(MODEL_PATH, self.model)
+        self.assertIsNot(new_model, self.model)
+        self.assertEqual(new_model.top_features, FEATURES_COLS)
+        self.assertEqual(new_model.model_path, MODEL_PATH)
+
+    async def test_reload_swaps_model(self):
+        info = await self.reloader.reload()
+
+        self.assertEqual(len(self.swapped), 1)
+        self.assertIsNot(self.swapped[0], self.model)
+        self.assertEqual(info["reloads"], 1)
+        self.assertEqual(info["sha256"], file_sha256(MODEL_PATH))
+        self.assertIsNone(info["last_error"])
+
+    async def test_failed_reload_keeps_model(self):
+        corrupt = os.path.join(self.tmp_dir, "corrupt.onnx")
+        with open(corrupt, "wb") as f:
+            f.write(b"no es un onnx")
+
+        with self.assertRaises(Exception):
+            await self.reloader.reload(corrupt)
+        with self.assertRaises(FileNotFoundError):
+            await self.reloader.reload(os.path.join(self.tmp_dir, "missing.onnx"))
+
+        self.assertEqual(self.swapped, [])
+        self.assertEqual(self.reloader.info["reloads"], 0)
+        self.assertIsNotNone(self.reloader.info["last_error"])
+
+
+class TestAdminReload(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(api.app)
+        self.original_model = api.model
+        self.original_token = api.admin_token
+        self.original_fn = api.batcher.predict_fn
+
+        api.model = load_test_model()
+
+    def tearDown(self):
+        api.model = self.original_model
+        api.admin_token = self.original_token
+        api.batcher.predict_fn = self.original_fn
+
+    def test_reload_disabled_without_token(self):
+        api.admin_token = None
+        response = self.client.post("/admin/reload", headers={"X-Admin-Token": "x"})
+        self.assertEqual(response.status_code, 403)
+
+    def test_reload_requires_matching_token(self):
+        api.admin_token = "secreto"
+        response = self.client.post("/admin/reload", headers={"X-Admin-Token": "otro"})
+        self.assertEqual(response.status_code, 403)
+
+    def test_reload_swaps_served_model(self):
+        api.admin_token = "secreto"
+        previous = api.model
+        response = self.client.post(
+            "/admin/reload",
+            headers={"X-Admin-Token": "secreto"},
+            json={"path": MODEL_PATH}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNot(api.model, previous)
+        self.assertEqual(response.json()["active_model"]["path"], MODEL_PATH)
+
+        version = self.client.get("/version").json()
+        self.assertEqual(version["active_model"]["path"], MODEL_PATH)
+
+    def test_failed_reload_returns_409(self):
+        api.admin_token = "secreto"
+        previous = api.model
+        response = self.client.post(
+            "/admin/reload",
+            headers={"X-Admin-Token": "secreto"},
+            json={"path": "./no_existe.onnx"}
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertIs(api.model, previous)
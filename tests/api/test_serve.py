@@ -0,0 +1,116 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+import unittest
+from unittest import mock
+
+import httpx
+
+from challenge.serve import PreforkServer, configure_threads
+from tests.conftest import FEATURES_COLS, MODEL_PATH
+from tests.stress.bench_suite import free_port, wait_ready
+
+
+class TestServe(unittest.TestCase):
+
+    def test_configure_threads(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(configure_threads(workers=2, cores=8), 4)
+            self.assertEqual(os.environ["ONNX_INTRA_OP_THREADS"], "4")
+            self.assertEqual(os.environ["OMP_NUM_THREADS"], "4")
+
+        with mock.patch.dict(os.environ, {"OMP_NUM_THREADS": "2"}, clear=True):
+            self.assertEqual(configure_threads(workers=8, cores=4), 1)
+            self.assertEqual(os.environ["OMP_NUM_THREADS"], "2")
+            self.assertEqual(os.environ["MKL_NUM_THREADS"], "1")
+
+    def test_stop_handlers_installed_before_spawning(self):
+        server = PreforkServer(sock=None, workers=3, cpus=[0], pin_cpus=False, log_level="warning")
+        handlers = []
+
+        def spawn(index):
+            handlers.append(signal.getsignal(signal.SIGTERM))
+            # SIGTERM durante el arranque: no se forkean mas workers
+            server.stop()
+
+        previous = {signum: signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            with mock.patch.object(server, "spawn", side_effect=spawn):
+                server.run()
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.assertEqual(handlers, [server.stop])
+
+    def test_prefork_survives_preload_failure(self):
+        """Como el lifespan: si el padre no puede cargar el modelo, los workers arrancan igual"""
+        port = free_port()
+        env = {**os.environ, "MODEL_FILE": "/no/existe/delay_model.onnx"}
+        process = subprocess.Popen(
+            [sys.executable, "-m", "challenge.serve", "--host", "127.0.0.1", "--port", str(port),
+             "--workers", "1", "--log_level", "warning"],
+            env=env, stdout=subprocess.PIPE, text=True
+        )
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+                deadline = time.monotonic() + 60
+                status = None
+                while time.monotonic() < deadline and process.poll() is None:
+                    try:
+                        status = client.get("/health").status_code
+                        break
+                    except httpx.TransportError:
+                        time.sleep(0.2)
+                self.assertEqual(status, 200)
+        finally:
+            process.terminate()
+            out, _ = process.communicate(timeout=30)
+        self.assertIn("No se pudo cargar el modelo", out)
+
+    def test_prefork_workers_serve_and_respawn(self):
+        port = free_port()
+        env = {
+            **os.environ,
+            "MODEL_FILE": os.path.abspath(MODEL_PATH),
+            "TOP_FEATURES": ",".join(FEATURES_COLS),
+        }
+        process = subprocess.Popen(
+            [sys.executable, "-m", "challenge.serve", "--host", "127.0.0.1", "--port", str(port),
+             "--workers", "2", "--log_level", "warning"],
+            env=env
+        )
+
+        def workers():
+            out = subprocess.run(["pgrep", "-P", str(process.pid)], capture_output=True, text=True)
+            return out.stdout.split()
+
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+                wait_ready(client, process)
+                payload = {"flights": [{"OPERA": "Grupo LATAM", "TIPOVUELO": "I", "MES": 7}]}
+                self.assertEqual(client.post("/predict", json=payload).status_code, 200)
+
+                first = workers()
+                self.assertEqual(len(first), 2)
+                os.kill(int(first[0]), 9)
+
+                deadline = time.monotonic() + 30
+                while time.monotonic() < deadline and (len(workers()) < 2 or first[0] in workers()):
+                    time.sleep(0.2)
+                self.assertEqual(len(workers()), 2)
+                self.assertEqual(client.post("/predict", json=payload).status_code, 200)
+        finally:
+            process.terminate()
+            try:
+                code = process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                # No dejar servidores huerfanos escuchando si el apagado se cuelga
+                for pid in workers():
+                    os.kill(int(pid), 9)
+                process.kill()
+                process.wait()
+                raise
+        self.assertEqual(code, 0)
+        self.assertEqual(workers(), [])
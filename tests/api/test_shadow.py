@@ -0,0 +1,72 @@
+import unittest
+
+from fastapi.testclient import TestClient
+from challenge import api
+from challenge.shadow import ShadowScorer
+from tests.conftest import MODEL_PATH, load_test_model
+
+
+FLIGHTS = [
+    {"OPERA": "Grupo LATAM", "TIPOVUELO": "I", "MES": 7},
+    {"OPERA": "Aerolineas Argentinas", "TIPOVUELO": "N", "MES": 3},
+    {"OPERA": "Sky Airline", "TIPOVUELO": "N", "MES": 12},
+]
+
+
+class TestShadowScorer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.model = load_test_model()
+        self.shadow = ShadowScorer(model_path=MODEL_PATH, queue_size=2)
+        await self.shadow.start(self.model)
+
+    async def asyncTearDown(self):
+        await self.shadow.stop()
+
+    async def test_disabled_without_path(self):
+        shadow = ShadowScorer(model_path="")
+        await shadow.start(self.model)
+        self.assertFalse(shadow.running)
+        self.assertFalse(shadow.submit(FLIGHTS, [0, 0, 0]))
+
+    async def test_agreement_and_confusion(self):
+        live = self.model.predict_flights(FLIGHTS)
+        self.assertTrue(self.shadow.submit(FLIGHTS, live))
+        # Predicciones live invertidas: todo desacuerdo
+        self.assertTrue(self.shadow.submit(FLIGHTS, [1 - p for p in live]))
+        await self.shadow.drain()
+
+        stats = self.shadow.snapshot()
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["flights"], 6)
+        self.assertEqual(stats["agree"], 3)
+        self.assertEqual(stats["disagree"], 3)
+        self.assertEqual(stats["agreement_rate"], 0.5)
+        confusion = stats["confusion"]
+        self.assertEqual(sum(confusion[a][b] for a in "01" for b in "01"), 6)
+        self.assertEqual(confusion["0"]["1"] + confusion["1"]["0"], 3)
+
+    async def test_drops_when_queue_full(self):
+        # Sin ceder el loop el worker no consume: la cola (2) se llena
+        results = [self.shadow.submit(FLIGHTS, [0, 0, 0]) for _ in range(5)]
+        self.assertEqual(results, [True, True, False, False, False])
+        self.assertEqual(self.shadow.stats["dropped"], 3)
+        await self.shadow.drain()
+        self.assertEqual(self.shadow.stats["requests"], 2)
+
+    async def test_candidate_errors_are_counted(self):
+        self.shadow.submit([{"OPERA": "Grupo LATAM"}], [0])
+        await self.shadow.drain()
+        self.assertEqual(self.shadow.stats["errors"], 1)
+        self.assertEqual(self.shadow.stats["requests"], 0)
+
+
+class TestShadowEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(api.app)
+
+    def test_stats_endpoint(self):
+        response = self.client.get("/stats/shadow")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("agree", response.json()["shadow"])
@@ -0,0 +1,109 @@
+"""
+Fixtures compartidas de los tests.
+
+El dataset real (data/data.csv) no se versiona. Los tests que necesitan
+vuelos leen una muestra sintetica generada una vez por proceso con el mismo
+esquema: solo Fecha-I/Fecha-O, OPERA, TIPOVUELO y MES tienen una
+distribucion con sentido (el atraso depende de operador, tipo de vuelo y
+mes); el resto de las columnas son de relleno. Sirve para probar el
+pipeline, no para medir performance ni calidad del modelo.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+OPERATORS = [
+    "Grupo LATAM", "Sky Airline", "Aerolineas Argentinas", "Copa Air", "Latin American Wings",
+    "Avianca", "JetSmart SPA", "Gol Trans", "American Airlines", "Air Canada", "Iberia",
+    "Delta Air", "Air France", "Aeromexico", "United Airlines", "Oceanair Linhas Aereas",
+    "Alitalia", "K.L.M.", "British Airways", "Qantas Airways", "Lacsa", "Austral",
+    "Plus Ultra Lineas Aereas"
+]
+
+OPERATOR_WEIGHTS = [
+    40, 14, 2, 2, 2, 1.5, 1.5, 1, 1, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.4, 0.4, 0.3, 0.3, 0.3, 0.1, 0.1
+]
+
+
+def synthetic_flights(n_rows: int = 20000, seed: int = 0) -> pd.DataFrame:
+    """Vuelos sinteticos con las columnas de data.csv."""
+    rng = np.random.default_rng(seed)
+    weights = np.asarray(OPERATOR_WEIGHTS) / sum(OPERATOR_WEIGHTS)
+
+    fecha_i = pd.Timestamp("2017-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24 * 60, n_rows), unit="min")
+    opera = rng.choice(OPERATORS, n_rows, p=weights)
+    tipovuelo = rng.choice(["N", "I"], n_rows, p=[0.55, 0.45])
+
+    # Minutos de atraso: menos para LAW/Copa, mas en internacionales y en julio/diciembre
+    base = (
+        np.where(np.isin(opera, ["Latin American Wings", "Copa Air"]), -1.5, 0)
+        + np.where(tipovuelo == "I", 1, 0)
+        + np.where(np.isin(fecha_i.month, [7, 12]), 1, 0)
+    )
+    delay = rng.normal(5 + 8 * base, 15, n_rows).round()
+    fecha_o = fecha_i + pd.to_timedelta(delay, unit="min")
+
+    return pd.DataFrame({
+        "Fecha-I": fecha_i.strftime("%Y-%m-%d %H:%M:%S"),
+        "Vlo-I": rng.integers(1, 999, n_rows).astype(str),
+        "Ori-I": "SCEL",
+        "Des-I": "KMIA",
+        "Emp-I": "AAL",
+        "Fecha-O": fecha_o.strftime("%Y-%m-%d %H:%M:%S"),
+        "Vlo-O": "1",
+        "Ori-O": "SCEL",
+        "Des-O": "KMIA",
+        "Emp-O": "AAL",
+        "DIA": fecha_i.day,
+        "MES": fecha_i.month,
+        "AÑO": fecha_i.year,
+        "DIANOM": fecha_i.day_name(),
+        "TIPOVUELO": tipovuelo,
+        "OPERA": opera,
+        "SIGLAORI": "Santiago",
+        "SIGLADES": "Miami",
+    })
+
+
+@lru_cache(maxsize=None)
+def flights_csv() -> str:
+    """Path a un CSV con synthetic_flights(), escrito una sola vez por proceso."""
+    tmp_dir = tempfile.mkdtemp(prefix="challenge-tests-")
+    atexit.register(shutil.rmtree, tmp_dir, ignore_errors=True)
+
+    path = os.path.join(tmp_dir, "data.csv")
+    synthetic_flights().to_csv(path, index=False)
+    return path
+
+
+# ==================== MODELO DE LOS TESTS ====================
+
+FEATURES_COLS = [
+    "OPERA_Latin American Wings",
+    "MES_7",
+    "MES_10",
+    "OPERA_Grupo LATAM",
+    "MES_12",
+    "TIPOVUELO_I",
+    "MES_4",
+    "MES_11",
+    "OPERA_Sky Airline",
+    "OPERA_Copa Air"
+]
+
+MODEL_PATH = "./challenge/delay_model.onnx"
+
+
+def load_test_model(**kwargs):
+    """DelayModel con FEATURES_COLS y el modelo versionado ya cargado."""
+    from challenge.model import DelayModel
+
+    model = DelayModel(top_features=FEATURES_COLS, **kwargs)
+    model.load_model(MODEL_PATH)
+    return model
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from challenge.batch_score import main
+from challenge.model import DelayModel
+from tests.conftest import FEATURES_COLS, MODEL_PATH, flights_csv, load_test_model
+
+
+class TestBatchScore(unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.data = pd.read_csv(filepath_or_buffer=flights_csv(), low_memory=False).head(5000)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.tmp.name, "flights.csv")
+        self.data.to_csv(self.input_path, index=False)
+
+        model = load_test_model()
+        self.expected = model.predict(model.preprocess(self.data))
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_batch_score_csv_in_input_order(self):
+        output_path = os.path.join(self.tmp.name, "scored.csv")
+        main([
+            "--input_path", self.input_path,
+            "--output_path", output_path,
+            "--model_path", MODEL_PATH,
+            "--top_features", "|".join(FEATURES_COLS),
+            "--chunk_size", "700",
+            "--workers", "2",
+        ])
+
+        scored = pd.read_csv(output_path, low_memory=False)
+        self.assertEqual(list(scored.columns), list(self.data.columns) + ["predict"])
+        pd.testing.assert_frame_equal(scored[self.data.columns], self.data)
+        self.assertEqual(scored["predict"].tolist(), self.expected)
+
+    def test_batch_score_keep_columns(self):
+        output_path = os.path.join(self.tmp.name, "scored.csv")
+        main([
+            "--input_path", self.input_path,
+            "--output_path", output_path,
+            "--model_path", MODEL_PATH,
+            "--top_features", "|".join(FEATURES_COLS),
+            "--keep_columns", "Vlo-I|Fecha-I",
+            "--chunk_size", "700",
+            "--workers", "1",
+        ])
+
+        scored = pd.read_csv(output_path)
+        self.assertEqual(list(scored.columns), ["Vlo-I", "Fecha-I", "predict"])
+        self.assertEqual(scored["Fecha-I"].tolist(), self.data["Fecha-I"].tolist())
+        self.assertEqual(scored["predict"].tolist(), self.expected)
+
+    def test_batch_score_null_values(self):
+        """Filas con OPERA/TIPOVUELO/MES vacios se puntuan como get_dummies (sin activar dummies)"""
+        data = self.data.head(300).copy()
+        data["MES"] = data["MES"].astype("Int8")
+        data.loc[[3, 50], "OPERA"] = None
+        data.loc[[7, 50], "TIPOVUELO"] = None
+        data.loc[[11, 120], "MES"] = None
+        data.to_csv(self.input_path, index=False)
+
+        output_path = os.path.join(self.tmp.name, "scored.csv")
+        main([
+            "--input_path", self.input_path,
+            "--output_path", output_path,
+            "--model_path", MODEL_PATH,
+            "--top_features", "|".join(FEATURES_COLS),
+            "--chunk_size", "100",
+            "--workers", "1",
+        ])
+
+        model = load_test_model(prediction_table=False)
+        dummies = pd.get_dummies(data[["OPERA", "TIPOVUELO", "MES"]].astype(object), columns=["OPERA", "TIPOVUELO", "MES"])
+        expected = model.predict(dummies.reindex(columns=FEATURES_COLS, fill_value=0))
+        self.assertEqual(pd.read_csv(output_path)["predict"].tolist(), expected)
+
+    def test_batch_score_uses_model_top_features(self):
+        """Sin --top_features se puntua con las features guardadas en el ONNX (p.ej. modelo --lean)"""
+        lean_model = DelayModel(top_features=[])
+        features, target = lean_model.preprocess_sparse(self.data, target_column="delay")
+        lean_model.fit(features, target)
+        model_path = os.path.join(self.tmp.name, "full.onnx")
+        lean_model.save_model(model_path)
+
+        output_path = os.path.join(self.tmp.name, "scored.csv")
+        main([
+            "--input_path", self.input_path,
+            "--output_path", output_path,
+            "--model_path", model_path,
+            "--workers", "1",
+        ])
+
+        self.assertEqual(pd.read_csv(output_path)["predict"].tolist(), lean_model._model.predict(features).tolist())
+
+    def test_batch_score_missing_input(self):
+        with self.assertRaises(FileNotFoundError):
+            main([
+                "--input_path", os.path.join(self.tmp.name, "no_existe.csv"),
+                "--output_path", os.path.join(self.tmp.name, "scored.csv"),
+                "--model_path", MODEL_PATH,
+            ])
@@ -0,0 +1,120 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from challenge.model import DelayModel
+from challenge.encoder import FeatureEncoder, factorize_columns, sparse_one_hot, unique_rows
+from tests.conftest import FEATURES_COLS, flights_csv
+
+
+def preprocess_dummies(data: pd.DataFrame, top_features: list) -> pd.DataFrame:
+    """Implementacion original de DelayModel.preprocess (get_dummies + reindex)"""
+    features = pd.concat([
+        pd.get_dummies(data["OPERA"], prefix="OPERA"),
+        pd.get_dummies(data["TIPOVUELO"], prefix="TIPOVUELO"),
+        pd.get_dummies(data["MES"], prefix="MES"),
+    ], axis=1)
+    for col in top_features:
+        if col not in features.columns:
+            features[col] = 0
+    return features[top_features]
+
+
+class TestFeatureEncoder(unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.data = pd.read_csv(filepath_or_buffer=flights_csv(), low_memory=False)
+        self.encoder = FeatureEncoder(FEATURES_COLS)
+
+    def test_encoder_matches_get_dummies(self):
+        expected = preprocess_dummies(self.data, FEATURES_COLS).to_numpy(dtype=np.float32)
+        encoded = self.encoder.transform(self.data)
+
+        self.assertEqual(encoded.dtype, np.float32)
+        self.assertTrue(encoded.flags["C_CONTIGUOUS"])
+        np.testing.assert_array_equal(encoded, expected)
+
+    def test_encoder_matches_get_dummies_unseen_values(self):
+        features = FEATURES_COLS + ["OPERA_Operador Inexistente", "MES_13"]
+        data = pd.DataFrame({
+            "OPERA": ["Grupo LATAM", "Operador Nuevo", "Copa Air"],
+            "TIPOVUELO": ["I", "N", "I"],
+            "MES": [7, 13, 1],
+        })
+        expected = preprocess_dummies(data, features).to_numpy(dtype=np.float32)
+        np.testing.assert_array_equal(FeatureEncoder(features).transform(data), expected)
+
+    def test_encoder_rejects_features_it_cannot_produce(self):
+        """Features de tiempo u otras columnas no se rellenan en silencio con 0"""
+        for feature in ("high_season", "period_day_morning", "day_of_week_6", "COLUMNA_FALSA", "MES"):
+            with self.assertRaises(ValueError):
+                FeatureEncoder(FEATURES_COLS + [feature])
+            with self.assertRaises(ValueError):
+                sparse_one_hot(self.data.head(10), FEATURES_COLS + [feature])
+
+        model = DelayModel(top_features=FEATURES_COLS + ["high_season"])
+        with self.assertRaises(ValueError):
+            model.preprocess(self.data, target_column="delay")
+
+    def test_encoder_string_months(self):
+        data = pd.DataFrame({"OPERA": ["Sky Airline"], "TIPOVUELO": ["N"], "MES": ["12"]})
+        expected = preprocess_dummies(data, FEATURES_COLS).to_numpy(dtype=np.float32)
+        np.testing.assert_array_equal(self.encoder.transform(data), expected)
+
+    def test_encoder_nullable_columns(self):
+        data = pd.DataFrame({
+            "OPERA": pd.array(["Grupo LATAM", None, "Copa Air"], dtype="string"),
+            "TIPOVUELO": pd.array(["I", "N", None], dtype="string"),
+            "MES": pd.array([7, None, 12], dtype="Int8"),
+        })
+        expected = preprocess_dummies(data, FEATURES_COLS).to_numpy(dtype=np.float32)
+        np.testing.assert_array_equal(self.encoder.transform(data), expected)
+
+    def test_encoder_records_and_columns(self):
+        records = self.data[["OPERA", "TIPOVUELO", "MES"]].head(500).to_dict(orient="records")
+        expected = self.encoder.transform(self.data.head(500))
+
+        np.testing.assert_array_equal(self.encoder.transform_records(records), expected)
+        columns = {col: [r[col] for r in records] for col in ["OPERA", "TIPOVUELO", "MES"]}
+        np.testing.assert_array_equal(self.encoder.transform(columns), expected)
+
+    def test_sparse_one_hot_full_set_matches_get_dummies(self):
+        expected = pd.concat([
+            pd.get_dummies(self.data["OPERA"], prefix="OPERA"),
+            pd.get_dummies(self.data["TIPOVUELO"], prefix="TIPOVUELO"),
+            pd.get_dummies(self.data["MES"], prefix="MES"),
+        ], axis=1)
+
+        lean = self.data[["OPERA", "TIPOVUELO", "MES"]].astype({"OPERA": "category", "TIPOVUELO": "category"})
+        matrix, names = sparse_one_hot(lean)
+
+        self.assertEqual(names, list(expected.columns))
+        self.assertEqual(matrix.dtype, np.float32)
+        np.testing.assert_array_equal(matrix.toarray(), expected.to_numpy(dtype=np.float32))
+
+    def test_sparse_one_hot_top_features(self):
+        matrix, names = sparse_one_hot(self.data, FEATURES_COLS)
+        self.assertEqual(names, FEATURES_COLS)
+        np.testing.assert_array_equal(matrix.toarray(), self.encoder.transform(self.data))
+
+    def test_unique_rows_round_trip(self):
+        encoded = self.encoder.transform(self.data)
+        rows, inverse = unique_rows(encoded)
+
+        self.assertLess(len(rows), len(encoded))
+        self.assertEqual(len(np.unique(rows, axis=0)), len(rows))
+        np.testing.assert_array_equal(rows[inverse], encoded)
+
+    def test_unique_rows_skips_unsupported_matrices(self):
+        self.assertIsNone(unique_rows(np.eye(4, dtype=np.float32)))
+        self.assertIsNone(unique_rows(np.full((4, 2), 0.5, dtype=np.float32)))
+        self.assertIsNone(unique_rows(np.zeros((4, 64), dtype=np.float32)))
+
+    def test_factorize_columns_round_trip(self):
+        columns = {col: self.data[col].to_numpy() for col in ["OPERA", "TIPOVUELO", "MES"]}
+        unique, inverse = factorize_columns(columns)
+
+        self.assertEqual(len(unique["MES"]), len(self.data.drop_duplicates(["OPERA", "TIPOVUELO", "MES"])))
+        for col, values in columns.items():
+            np.testing.assert_array_equal(unique[col][inverse], values)
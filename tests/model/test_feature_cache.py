@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from challenge.feature_cache import FeatureCache
+from challenge.model import DelayModel
+from tests.conftest import FEATURES_COLS, flights_csv
+
+
+class TestFeatureCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_path = flights_csv()
+        self.model = DelayModel(top_features=FEATURES_COLS)
+        self.builds = 0
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def build(self):
+        self.builds += 1
+        data = pd.read_csv(self.data_path, low_memory=False)
+        return self.model.preprocess(data, target_column="delay")
+
+    def test_cache_hit_skips_preprocess(self):
+        cache = FeatureCache(self.tmp.name)
+        features, target, hit = cache.get_or_build(self.data_path, FEATURES_COLS, 15, self.build)
+        self.assertFalse(hit)
+
+        cached_features, cached_target, hit = cache.get_or_build(self.data_path, FEATURES_COLS, 15, self.build)
+        self.assertTrue(hit)
+        self.assertEqual(self.builds, 1)
+        base = cached_features.values
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        self.assertIsInstance(base, np.memmap)
+        self.assertEqual(list(cached_features.columns), FEATURES_COLS)
+        np.testing.assert_array_equal(cached_features.values, features.values)
+        np.testing.assert_array_equal(cached_target["delay"].values, target["delay"].values)
+
+    def test_cache_key_depends_on_config(self):
+        base = FeatureCache.key(self.data_path, FEATURES_COLS, 15)
+        self.assertEqual(base, FeatureCache.key(self.data_path, FEATURES_COLS, 15))
+        self.assertNotEqual(base, FeatureCache.key(self.data_path, FEATURES_COLS, 20))
+        self.assertNotEqual(base, FeatureCache.key(self.data_path, FEATURES_COLS[:5], 15))
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = FeatureCache(self.tmp.name, max_entries=2)
+        features = pd.DataFrame(np.eye(3, dtype=np.float32), columns=["a", "b", "c"])
+        target = pd.DataFrame({"delay": [0, 1, 0]})
+
+        for i, key in enumerate(["k1", "k2", "k3"]):
+            cache.store(key, features, target)
+            os.utime(os.path.join(self.tmp.name, key, "meta.json"), (i, i))
+
+        cache.evict()
+        self.assertIsNone(cache.load("k1"))
+        self.assertIsNotNone(cache.load("k3"))
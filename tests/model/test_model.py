@@ -1,9 +1,11 @@
 import unittest
+import numpy as np
 import pandas as pd
 
 from sklearn.metrics import classification_report
 from sklearn.model_selection import train_test_split
 from challenge.model import DelayModel
+from tests.conftest import flights_csv
 
 class TestModel(unittest.TestCase):
 
@@ -28,7 +30,7 @@ class TestModel(unittest.TestCase):
     def setUp(self) -> None:
         super().setUp()
         self.model = DelayModel()
-        self.data = pd.read_csv(filepath_or_buffer="./data/data.csv")
+        self.data = pd.read_csv(filepath_or_buffer=flights_csv())
 
     def test_model_preprocess_for_training(
         self
@@ -121,11 +123,15 @@ class TestModel(unittest.TestCase):
 
     def test_model_preprocess_missing_columns(self):
         """Cubre la rama if col not in features.columns en preprocess"""
-        # Forzamos una feature que no existe en la data original
-        custom_model = DelayModel(top_features=["COLUMNA_FALSA"])
+        # Forzamos una dummy que no existe en la data original
+        custom_model = DelayModel(top_features=["OPERA_COLUMNA_FALSA"])
         features = custom_model.preprocess(self.data)
-        self.assertIn("COLUMNA_FALSA", features.columns)
-        self.assertEqual(features["COLUMNA_FALSA"].sum(), 0)
+        self.assertIn("OPERA_COLUMNA_FALSA", features.columns)
+        self.assertEqual(features["OPERA_COLUMNA_FALSA"].sum(), 0)
+
+        # Una feature que el encoder no puede generar se rechaza en vez de quedar en 0
+        with self.assertRaises(ValueError):
+            DelayModel(top_features=["COLUMNA_FALSA"]).preprocess(self.data)
 
     def test_model_save_and_load_onnx(self):
         """Cubre save_model, load_model y la predicción nativa con ONNX"""
@@ -193,4 +199,346 @@ class TestModel(unittest.TestCase):
         """Cubre el FileNotFoundError en load_model explícito"""
         empty_model = DelayModel()
         with self.assertRaises(FileNotFoundError):
-            empty_model.load_model("archivo_que_no_existe.onnx")
\ No newline at end of file
+            empty_model.load_model("archivo_que_no_existe.onnx")
+
+    def test_model_prediction_table(self):
+        """La tabla precalculada coincide con el pipeline completo y hace fallback para operadores no vistos"""
+        table_model = DelayModel(top_features=self.FEATURES_COLS, prediction_table=True)
+        table_model.load_model("./challenge/delay_model.onnx")
+        self.assertIsNotNone(table_model._prediction_table)
+        # 4 operadores de top_features + la fila "otro operador"
+        self.assertEqual(table_model._prediction_table.shape, (5, 2, 12))
+
+        flights = [
+            {"OPERA": opera, "TIPOVUELO": tipo, "MES": mes}
+            for opera in ["Grupo LATAM", "Copa Air", "Aerolineas Argentinas"]
+            for tipo in ["I", "N"]
+            for mes in range(1, 13)
+        ]
+        expected = table_model.predict(table_model.preprocess(pd.DataFrame(flights)))
+        self.assertEqual(table_model.predict_flights(flights), expected)
+
+    def test_model_prediction_table_covers_other_operators(self):
+        """Operadores fuera de top_features salen de la tabla, sin pasar por ONNX"""
+        from unittest import mock
+
+        table_model = DelayModel(top_features=self.FEATURES_COLS, prediction_table=True)
+        table_model.load_model("./challenge/delay_model.onnx")
+        flights = [
+            {"OPERA": opera, "TIPOVUELO": tipo, "MES": mes}
+            for opera in ["Aerolineas Argentinas", "Operador Nuevo", "Grupo LATAM"]
+            for tipo in ["I", "N"]
+            for mes in range(1, 13)
+        ]
+        columns = {col: np.array([f[col] for f in flights]) for col in ["OPERA", "TIPOVUELO", "MES"]}
+        expected = table_model.predict(table_model.preprocess(pd.DataFrame(flights)))
+
+        with mock.patch.object(table_model, "predict", side_effect=AssertionError("fallback a ONNX")):
+            self.assertEqual(table_model.predict_flights(flights), expected)
+            self.assertEqual(table_model.predict_columns(columns), expected)
+
+    def test_model_prediction_table_without_operators(self):
+        """top_features sin OPERA_*: la tabla tiene solo la fila "otro operador" y el lookup no falla"""
+        import os
+        import tempfile
+
+        features_cols = ["MES_7", "TIPOVUELO_I", "MES_12"]
+        trained = DelayModel(top_features=features_cols, prediction_table=False)
+        features, target = trained.preprocess(self.data, target_column="delay")
+        trained.fit(features, target)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sin_opera.onnx")
+            trained.save_model(path)
+            table_model = DelayModel(top_features=features_cols, prediction_table=True)
+            table_model.load_model(path)
+
+        self.assertEqual(table_model._prediction_table.shape, (1, 2, 12))
+        columns = {"OPERA": np.array(["Grupo LATAM", "Copa Air"]), "TIPOVUELO": np.array(["I", "N"]), "MES": np.array([7, 3])}
+        expected = table_model.predict(table_model.preprocess(pd.DataFrame(columns)))
+        self.assertEqual(table_model.predict_columns(columns), expected)
+
+    def test_model_prediction_table_disabled(self):
+        """Sin tabla, predict_flights usa el pipeline completo"""
+        plain_model = DelayModel(top_features=self.FEATURES_COLS, prediction_table=False)
+        plain_model.load_model("./challenge/delay_model.onnx")
+        self.assertIsNone(plain_model._prediction_table)
+        preds = plain_model.predict_flights([{"OPERA": "Grupo LATAM", "TIPOVUELO": "I", "MES": 7}])
+        self.assertEqual(len(preds), 1)
+
+    def test_model_deduplicated_batches_match(self):
+        """Puntuar solo las filas unicas y repartir da exactamente la misma salida"""
+        flights = self.data[["OPERA", "TIPOVUELO", "MES"]].to_dict(orient="records")
+        columns = {col: self.data[col].to_numpy() for col in ["OPERA", "TIPOVUELO", "MES"]}
+
+        outputs = []
+        for deduplicate in (False, True):
+            model = DelayModel(top_features=self.FEATURES_COLS, prediction_table=False, deduplicate=deduplicate)
+            model.load_model("./challenge/delay_model.onnx")
+            features = model.preprocess(self.data)
+            outputs.append((
+                model.predict(features),
+                model.predict_proba(features),
+                model.predict_flights(flights),
+                model.predict_flights_proba(columns),
+            ))
+        self.assertEqual(outputs[0], outputs[1])
+
+    def test_model_session_config_and_pool(self):
+        """Opciones de sesion ONNX, pool de sesiones y cache del grafo optimizado"""
+        import os
+        import tempfile
+        from challenge.session import SessionConfig
+
+        features = DelayModel(top_features=self.FEATURES_COLS).preprocess(self.data)
+        base_model = DelayModel(top_features=self.FEATURES_COLS, prediction_table=False)
+        base_model.load_model("./challenge/delay_model.onnx")
+        expected = base_model.predict(features)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = os.path.join(tmp, "optimized.onnx")
+            pooled = DelayModel(top_features=self.FEATURES_COLS, prediction_table=False)
+            pooled.load_model(
+                "./challenge/delay_model.onnx",
+                intra_op_threads=1,
+                execution_mode="parallel",
+                graph_optimization_level="basic",
+                optimized_model_path=cache,
+                pool_size=2
+            )
+            self.assertTrue(os.path.exists(pooled.session_config.cache_path("./challenge/delay_model.onnx")))
+            self.assertEqual(len(pooled._session_pool), 2)
+            self.assertEqual(pooled.session_config.execution_mode, "parallel")
+            self.assertEqual(pooled.predict(features), expected)
+
+            # Segundo load: reutiliza el grafo optimizado cacheado
+            cached = DelayModel(top_features=self.FEATURES_COLS, prediction_table=False)
+            cached.load_model("./challenge/delay_model.onnx", optimized_model_path=cache)
+            self.assertEqual(cached.predict(features), expected)
+
+        with self.assertRaises(ValueError):
+            SessionConfig(execution_mode="turbo")
+
+    def test_model_optimized_cache_per_source_model(self):
+        """Dos modelos distintos con la misma SessionConfig no comparten el grafo optimizado"""
+        import os
+        import tempfile
+        from challenge.session import SessionConfig
+
+        with tempfile.TemporaryDirectory() as tmp:
+            config = SessionConfig(optimized_model_path=os.path.join(tmp, "optimized.onnx"))
+
+            first = DelayModel(top_features=self.FEATURES_COLS, prediction_table=False)
+            first.load_model("./challenge/delay_model.onnx", session_config=config)
+
+            # Segundo modelo: mismas features, otro estado de entrenamiento
+            trained = DelayModel(top_features=self.FEATURES_COLS, prediction_table=False)
+            features, target = trained.preprocess(self.data, target_column="delay")
+            trained.fit(features, target, class_weight=None)
+            other_path = os.path.join(tmp, "other.onnx")
+            trained.save_model(other_path)
+            # Mas viejo que el cache del primero: con el chequeo por mtime se reusaba ese grafo
+            os.utime(other_path, (0, 0))
+
+            second = DelayModel(top_features=self.FEATURES_COLS, prediction_table=False)
+            second.load_model(other_path, session_config=config)
+            plain = DelayModel(top_features=self.FEATURES_COLS, prediction_table=False)
+            plain.load_model(other_path)
+
+            self.assertNotEqual(config.cache_path("./challenge/delay_model.onnx"), config.cache_path(other_path))
+            self.assertEqual(second.predict_proba(features), plain.predict_proba(features))
+            self.assertNotEqual(second.predict_proba(features), first.predict_proba(features))
+
+    def test_model_numpy_backend_parity(self):
+        """El backend NumPy coincide con la sesion ONNX sobre todo el espacio de entrada"""
+        from itertools import product
+
+        operators = list(self.data["OPERA"].unique()) + ["Operador Nuevo"]
+        grid = pd.DataFrame(
+            list(product(operators, ["I", "N"], range(1, 13))),
+            columns=["OPERA", "TIPOVUELO", "MES"]
+        )
+
+        onnx_model = DelayModel(top_features=self.FEATURES_COLS, inference_backend="onnx")
+        onnx_model.load_model("./challenge/delay_model.onnx")
+        numpy_model = DelayModel(top_features=self.FEATURES_COLS, inference_backend="numpy")
+        numpy_model.load_model("./challenge/delay_model.onnx")
+
+        self.assertIsNone(numpy_model._onnx_session)
+        features = onnx_model.preprocess(grid)
+        self.assertEqual(numpy_model.predict(features), onnx_model.predict(features))
+        self.assertEqual(numpy_model.model_metadata(), onnx_model.model_metadata())
+
+        with self.assertRaises(ValueError):
+            DelayModel(inference_backend="tpu")
+
+    def test_model_numpy_backend_from_sklearn(self):
+        """El backend NumPy construido desde sklearn reproduce LogisticRegression.predict"""
+        from challenge.backends import NumpyLinearBackend
+
+        features, target = self.model.preprocess(data=self.data, target_column="delay")
+        self.model.fit(features, target)
+
+        backend = NumpyLinearBackend.from_sklearn(self.model._model)
+        matrix = features.to_numpy(dtype="float32")
+        self.assertEqual(backend.run(matrix).tolist(), self.model._model.predict(features).tolist())
+
+    def test_model_partial_fit_and_warm_start(self):
+        """Entrenamiento incremental por chunks, export al mismo ONNX y warm start desde el export"""
+        import os
+        import tempfile
+        import numpy as np
+
+        model = DelayModel(top_features=self.FEATURES_COLS)
+        for start in range(0, len(self.data), 5000):
+            chunk = self.data.iloc[start:start + 5000].copy()
+            features, target = model.preprocess(chunk, target_column="delay")
+            model.partial_fit(features, target)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "incremental.onnx")
+            model.save_model(path)
+
+            loaded = DelayModel(top_features=self.FEATURES_COLS, inference_backend="numpy")
+            loaded.load_model(path)
+            features = model.preprocess(self.data)
+            self.assertEqual(loaded.predict(features), model._model.predict(features).tolist())
+
+            warm = DelayModel(top_features=self.FEATURES_COLS)
+            warm.warm_start(path)
+            np.testing.assert_allclose(warm._model.coef_, model._model.coef_, rtol=1e-5)
+            np.testing.assert_allclose(warm._model.intercept_, model._model.intercept_, rtol=1e-5)
+
+            features, target = warm.preprocess(self.data.head(1000).copy(), target_column="delay")
+            warm.partial_fit(features, target)
+            self.assertEqual(warm._model.coef_.shape, (1, len(self.FEATURES_COLS)))
+
+    def test_model_preprocess_sparse_full_feature_set(self):
+        """Ingesta lean: matriz sparse con todas las dummies, fit y export ONNX con ese set"""
+        import os
+        import tempfile
+
+        lean_model = DelayModel(top_features=[])
+        features, target = lean_model.preprocess_sparse(self.data, target_column="delay")
+
+        self.assertEqual(features.shape, (len(self.data), len(lean_model.top_features)))
+        self.assertGreater(len(lean_model.top_features), len(self.FEATURES_COLS))
+        self.assertEqual(list(target.columns), self.TARGET_COL)
+
+        lean_model.fit(features, target)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "full.onnx")
+            lean_model.save_model(path)
+
+            serving = DelayModel(top_features=lean_model.top_features)
+            serving.load_model(path)
+            dense = serving.preprocess(self.data)
+            self.assertEqual(serving.predict(dense), lean_model._model.predict(features).tolist())
+            self.assertEqual(
+                serving.model_metadata()["custom_metadata"]["top_features"],
+                ",".join(lean_model.top_features)
+            )
+
+    def test_model_load_top_features_from_metadata(self):
+        """Sin top_features por argumento, load_model usa las que save_model guardo en el ONNX"""
+        import os
+        import tempfile
+        from unittest import mock
+
+        lean_model = DelayModel(top_features=[])
+        features, target = lean_model.preprocess_sparse(self.data, target_column="delay")
+        lean_model.fit(features, target)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "full.onnx")
+            lean_model.save_model(path)
+
+            with mock.patch.dict(os.environ, {"TOP_FEATURES": ",".join(self.FEATURES_COLS)}):
+                serving = DelayModel()
+            serving.load_model(path)
+            self.assertEqual(serving.top_features, lean_model.top_features)
+            self.assertEqual(
+                serving.predict(serving.preprocess(self.data)),
+                lean_model._model.predict(features).tolist()
+            )
+
+            # Por argumento deben coincidir con las del artefacto
+            with self.assertRaises(ValueError):
+                DelayModel(top_features=self.FEATURES_COLS).load_model(path)
+
+    def test_model_load_rejects_input_width_mismatch(self):
+        with self.assertRaises(ValueError):
+            DelayModel(top_features=self.FEATURES_COLS[:5]).load_model("./challenge/delay_model.onnx")
+        with self.assertRaises(ValueError):
+            DelayModel(top_features=self.FEATURES_COLS[:5], inference_backend="numpy").load_model(
+                "./challenge/delay_model.onnx"
+            )
+
+    def test_model_export_without_zipmap_and_predict_proba(self):
+        """El export emite probabilidades como tensor y predict_proba coincide con sklearn"""
+        import os
+        import tempfile
+        import numpy as np
+        import onnx
+
+        model = DelayModel(top_features=self.FEATURES_COLS)
+        features, target = model.preprocess(self.data, target_column="delay")
+        model.fit(features, target)
+        expected = model._model.predict_proba(features)[:, 1]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "proba.onnx")
+            model.save_model(path)
+            self.assertNotIn("ZipMap", [node.op_type for node in onnx.load(path).graph.node])
+
+            for backend in ("onnx", "numpy"):
+                loaded = DelayModel(top_features=self.FEATURES_COLS, inference_backend=backend)
+                loaded.load_model(path)
+                np.testing.assert_allclose(loaded.predict_proba(features), expected, atol=1e-5)
+
+                flights = self.data[["OPERA", "TIPOVUELO", "MES"]].head(500).to_dict("records")
+                flights.append({"OPERA": "Operador Nuevo", "TIPOVUELO": "N", "MES": 5})
+                np.testing.assert_allclose(
+                    loaded.predict_flights_proba(flights),
+                    loaded.predict_proba(loaded.preprocess(pd.DataFrame(flights))),
+                    atol=1e-7
+                )
+
+    def test_model_predict_proba_legacy_zipmap_artifact(self):
+        """Los ONNX con ZipMap siguen sirviendo probabilidades"""
+        import numpy as np
+
+        onnx_model = DelayModel(top_features=self.FEATURES_COLS, prediction_table=False)
+        onnx_model.load_model("./challenge/delay_model.onnx")
+        numpy_model = DelayModel(top_features=self.FEATURES_COLS, inference_backend="numpy")
+        numpy_model.load_model("./challenge/delay_model.onnx")
+
+        features = onnx_model.preprocess(self.data.head(2000))
+        probas = onnx_model.predict_proba(features)
+        np.testing.assert_allclose(probas, numpy_model.predict_proba(features), atol=1e-6)
+        self.assertEqual(onnx_model.predict(features), [int(p > 0.5) for p in probas])
+
+    def test_model_decision_threshold(self):
+        """DECISION_THRESHOLD define las etiquetas, tambien en la tabla precalculada"""
+        flights = [
+            {"OPERA": "Grupo LATAM", "TIPOVUELO": "I", "MES": 7},
+            {"OPERA": "Operador Nuevo", "TIPOVUELO": "N", "MES": 3},
+        ]
+        for threshold, label in ((0.0, 1), (1.0, 0)):
+            model = DelayModel(top_features=self.FEATURES_COLS, decision_threshold=threshold)
+            model.load_model("./challenge/delay_model.onnx")
+            self.assertEqual(model.predict_flights(flights), [label, label])
+
+        with self.assertRaises(ValueError):
+            DelayModel(decision_threshold=1.5)
+
+    def test_model_serving_import_skips_training_dependencies(self):
+        import subprocess
+        import sys
+
+        code = (
+            "import sys, challenge.api\n"
+            "print(','.join(m for m in ('sklearn', 'skl2onnx', 'scipy') if m in sys.modules))"
+        )
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "")
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import f1_score
+
+from challenge.model import DelayModel
+from challenge.feature_cache import FeatureCache
+from challenge.reload import build_model
+from challenge.search import DECISION_THRESHOLDS, HyperparameterSearch, best_f1, load_search, parse_grid
+from tests.conftest import FEATURES_COLS, MODEL_PATH, flights_csv
+
+
+class TestHyperparameterSearch(unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.data = pd.read_csv(filepath_or_buffer=flights_csv(), low_memory=False).head(8000)
+        self.model = DelayModel(top_features=FEATURES_COLS)
+
+    def test_parse_grid(self):
+        self.assertEqual(parse_grid("0.1, 1,10"), [0.1, 1.0, 10.0])
+        self.assertEqual(parse_grid("balanced,none", str), ["balanced", None])
+        self.assertEqual(parse_grid("", int), [])
+
+    def test_best_f1_matches_sklearn(self):
+        rng = np.random.default_rng(0)
+        target = rng.integers(0, 2, 500)
+        proba = np.clip(target * 0.3 + rng.random(500) * 0.7, 0, 1)
+
+        score, threshold = best_f1(target, proba)
+        expected = max(f1_score(target, proba >= t) for t in DECISION_THRESHOLDS)
+        self.assertAlmostEqual(score, expected)
+        self.assertAlmostEqual(f1_score(target, proba >= threshold), expected)
+
+    def test_targets_match_preprocess(self):
+        search = HyperparameterSearch(self.model, self.data)
+        for delay_threshold in (10, 15, 30):
+            _, target = DelayModel(
+                top_features=FEATURES_COLS, delay_threshold=delay_threshold
+            ).preprocess(self.data, target_column="delay")
+            np.testing.assert_array_equal(search.target(delay_threshold), target["delay"].to_numpy())
+
+    def test_load_search_uses_feature_cache(self):
+        def no_read(path):
+            raise AssertionError("con HIT no se lee el CSV")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "data.csv")
+            self.data.to_csv(data_path, index=False)
+            cache = FeatureCache(os.path.join(tmp, "cache"))
+
+            built = load_search(self.model, data_path, [15, 20], cache)
+            cached = load_search(self.model, data_path, [15, 20], cache, read_data=no_read)
+
+            np.testing.assert_array_equal(cached.features, built.features)
+            self.assertEqual(cached.columns, FEATURES_COLS)
+            for delay_threshold in (15, 20):
+                np.testing.assert_array_equal(cached.target(delay_threshold), built.target(delay_threshold))
+            with self.assertRaises(KeyError):
+                cached.target(30)
+
+            # Un umbral nuevo fuerza el preprocess, pero solo una vez
+            reads = []
+            load_search(self.model, data_path, [15, 30], cache, read_data=lambda p: reads.append(p) or pd.read_csv(p))
+            self.assertEqual(len(reads), 1)
+            load_search(self.model, data_path, [15, 30], cache, read_data=no_read)
+
+    def test_run_and_export_best(self):
+        search = HyperparameterSearch(self.model, self.data)
+        results = search.run(
+            C=[0.1, 1.0],
+            class_weight=["balanced", None],
+            delay_threshold=[15, 20],
+            folds=2,
+            workers=2
+        )
+
+        self.assertEqual(len(results), 8)
+        scores = [r["score"] for r in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(r["seconds"] > 0 for r in results))
+
+        best = results[0]
+        search.fit_best(best)
+        self.assertEqual(self.model.delay_threshold, best["delay_threshold"])
+        self.assertEqual(self.model._model.C, best["C"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "search.onnx")
+            self.model.save_model(path)
+            loaded = DelayModel(top_features=FEATURES_COLS)
+            loaded.load_model(path)
+
+            # Un umbral configurado tiene prioridad sobre el de la busqueda
+            configured = DelayModel(top_features=FEATURES_COLS, decision_threshold=0.5)
+            configured.load_model(path)
+
+        meta = loaded.model_metadata()["custom_metadata"]
+        self.assertEqual(meta["search_C"], str(best["C"]))
+        self.assertEqual(meta["search_class_weight"], str(best["class_weight"]))
+        self.assertEqual(meta["delay_threshold_minutes"], str(best["delay_threshold"]))
+        self.assertEqual(loaded.decision_threshold, float(best["decision_threshold"]))
+        self.assertEqual(configured.decision_threshold, 0.5)
+
+        # Otra version cargada con este modelo como template no hereda su umbral de busqueda
+        other = build_model(MODEL_PATH, loaded)
+        self.assertIsNone(other.decision_threshold)
+
+        with self.assertRaises(ValueError):
+            search.run(C=[1.0], class_weight=[None], delay_threshold=[15], metric="accuracy")
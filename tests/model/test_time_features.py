@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from challenge.model import DelayModel
+from challenge.time_features import compute_time_features, parse_epoch_seconds, time_feature_candidates
+from tests.conftest import flights_csv
+
+
+class TestTimeFeatures(unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.data = pd.read_csv(filepath_or_buffer=flights_csv(), low_memory=False)
+
+    def test_matches_pandas_implementation(self):
+        original = self.data.copy()
+        features = compute_time_features(self.data, delay_threshold=15)
+
+        fecha_o = pd.to_datetime(original["Fecha-O"])
+        fecha_i = pd.to_datetime(original["Fecha-I"])
+        min_diff = (fecha_o - fecha_i).dt.total_seconds() / 60
+
+        np.testing.assert_array_equal(features["min_diff"], min_diff.to_numpy())
+        np.testing.assert_array_equal(features["delay"], np.where(min_diff > 15, 1, 0))
+        np.testing.assert_array_equal(features["day_of_week"], fecha_i.dt.dayofweek.to_numpy())
+
+        # No modifica el DataFrame de entrada
+        pd.testing.assert_frame_equal(self.data, original)
+
+    def test_preprocess_does_not_mutate_input(self):
+        original = self.data.copy()
+        model = DelayModel()
+        _, target = model.preprocess(self.data, target_column="delay")
+
+        pd.testing.assert_frame_equal(self.data, original)
+        self.assertEqual(list(target.columns), ["delay"])
+
+    def test_high_season_and_period_day(self):
+        data = pd.DataFrame({
+            "Fecha-I": [
+                "2017-12-15 04:59:00",
+                "2017-03-03 05:00:00",
+                "2017-03-04 11:59:00",
+                "2017-07-15 12:00:00",
+                "2017-09-30 18:59:00",
+                "2017-10-01 19:00:00",
+            ],
+        })
+        data["Fecha-O"] = data["Fecha-I"]
+        features = compute_time_features(data, delay_threshold=15)
+
+        self.assertEqual(features["high_season"].tolist(), [1, 1, 0, 1, 1, 0])
+        self.assertEqual(features["period_day"].tolist(), [2, 0, 0, 1, 1, 2])
+
+        candidates = time_feature_candidates(features)
+        self.assertIn("period_day_morning", candidates.columns)
+        self.assertIn("day_of_week_6", candidates.columns)
+        self.assertEqual(candidates["period_day_night"].tolist(), [1, 0, 0, 0, 0, 1])
+
+    def test_parse_with_nulls_and_custom_format(self):
+        epoch = parse_epoch_seconds(np.array(["2017-01-01 00:00:01", None], dtype=object))
+        self.assertEqual(epoch[0], 1483228801)
+
+        custom = parse_epoch_seconds(np.array(["01/01/2017 00:00"], dtype=object), fmt="%d/%m/%Y %H:%M")
+        self.assertEqual(custom[0], 1483228800)
+
+        data = pd.DataFrame({"Fecha-I": ["2017-01-01 00:00:00", None], "Fecha-O": ["2017-01-01 00:30:00", "2017-01-01 00:30:00"]})
+        features = compute_time_features(data, delay_threshold=15)
+        self.assertEqual(features["delay"].tolist(), [1, 0])
+        self.assertTrue(np.isnan(features["min_diff"][1]))
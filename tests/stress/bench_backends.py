@@ -0,0 +1,80 @@
+"""
+Comparacion de backends de inferencia de DelayModel (onnxruntime vs NumPy):
+cold start (import + load_model en un proceso nuevo) y latencia de predict.
+
+Uso:
+    python -m tests.stress.bench_backends --model ./challenge/delay_model.onnx
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from challenge.model import DelayModel
+
+
+COLD_START = """
+import time
+start = time.perf_counter()
+from challenge.model import DelayModel
+model = DelayModel(inference_backend="{backend}", prediction_table=False)
+model.load_model("{model}")
+model.predict([[0.0] * {n_features}])
+print(time.perf_counter() - start)
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de backends de inferencia")
+    parser.add_argument('--model', type=str, default="./challenge/delay_model.onnx")
+    parser.add_argument('--batch_sizes', type=str, default="1,32,1024,100000")
+    parser.add_argument('--repeats', type=int, default=200)
+    parser.add_argument('--cold_starts', type=int, default=3)
+    return parser.parse_args()
+
+
+def cold_start(backend: str, model: str, n_features: int) -> float:
+    code = COLD_START.format(backend=backend, model=model, n_features=n_features)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def latency_us(model: DelayModel, batch: np.ndarray, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(batch)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1e6
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(0)
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+
+    models = {}
+    for backend in ("onnx", "numpy"):
+        models[backend] = DelayModel(inference_backend=backend, prediction_table=False)
+        models[backend].load_model(args.model)
+    n_features = models["numpy"]._linear_backend.n_features
+
+    print(f"{'backend':<10}{'cold start (s)':>16}")
+    for backend in models:
+        runs = [cold_start(backend, args.model, n_features) for _ in range(args.cold_starts)]
+        print(f"{backend:<10}{min(runs):>16.3f}")
+
+    print()
+    print(f"{'backend':<10}{'batch':>10}{'p50 (us)':>12}{'rows/s':>16}")
+    for size in batch_sizes:
+        batch = (rng.random((size, n_features)) < 0.2).astype(np.float32)
+        repeats = max(3, args.repeats if size <= 1024 else args.repeats // 20)
+        for backend, model in models.items():
+            us = latency_us(model, batch, repeats)
+            print(f"{backend:<10}{size:>10}{us:>12.1f}{size / us * 1e6:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark de cold start del serving: cada corrida es un proceso nuevo que mide
+ - import_s: tiempo de `import challenge.api`
+ - first_predict_s: desde el inicio del proceso hasta el primer /predict exitoso
+   (incluye lifespan: carga del ONNX, tabla de predicciones, warmup)
+ - peak_rss_mb: peak RSS del proceso
+y lista los modulos de entrenamiento que quedaron importados (deben ser ninguno).
+
+Con --max_import_s / --max_first_predict_s / --max_rss_mb termina con codigo 1
+si la mediana supera el limite (para CI).
+
+Uso:
+    TOP_FEATURES="..." python -m tests.stress.bench_cold_start --model ./challenge/delay_model.onnx
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+TRAINING_MODULES = ("sklearn", "skl2onnx", "scipy", "google.cloud.storage")
+
+COLD_START = """
+import json, resource, sys, time
+start = time.perf_counter()
+import challenge.api as api
+import_s = time.perf_counter() - start
+
+from fastapi.testclient import TestClient
+api.model_file = {model!r}
+payload = {{"flights": [{{"OPERA": "Grupo LATAM", "TIPOVUELO": "I", "MES": 7}}]}}
+with TestClient(api.app) as client:
+    response = client.post("/predict", json=payload)
+    assert response.status_code == 200, response.text
+    first_predict_s = time.perf_counter() - start
+
+print(json.dumps({{
+    "import_s": import_s,
+    "first_predict_s": first_predict_s,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "training_modules": [m for m in {training!r} if m in sys.modules],
+}}))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de cold start de la API")
+    parser.add_argument('--model', type=str, default="./challenge/delay_model.onnx")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max_import_s', type=float, required=False, default=None)
+    parser.add_argument('--max_first_predict_s', type=float, required=False, default=None)
+    parser.add_argument('--max_rss_mb', type=float, required=False, default=None)
+    parser.add_argument('--json', action='store_true', help="Imprime el resumen como JSON")
+    return parser.parse_args()
+
+
+def cold_start(model: str) -> dict:
+    code = COLD_START.format(model=model, training=TRAINING_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    args = parse_args()
+    runs = [cold_start(args.model) for _ in range(args.runs)]
+
+    summary = {
+        metric: statistics.median(run[metric] for run in runs)
+        for metric in ("import_s", "first_predict_s", "peak_rss_mb")
+    }
+    summary["training_modules"] = sorted({m for run in runs for m in run["training_modules"]})
+
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        print(f"Cold start (mediana de {args.runs} procesos)")
+        print(f"  import challenge.api : {summary['import_s'] * 1000:8.1f} ms")
+        print(f"  primer /predict      : {summary['first_predict_s'] * 1000:8.1f} ms")
+        print(f"  peak RSS             : {summary['peak_rss_mb']:8.1f} MB")
+        print(f"  modulos de training  : {summary['training_modules'] or 'ninguno'}")
+
+    limits = {
+        "import_s": args.max_import_s,
+        "first_predict_s": args.max_first_predict_s,
+        "peak_rss_mb": args.max_rss_mb,
+    }
+    exceeded = [
+        f"{metric}={summary[metric]:.3f} > {limit}"
+        for metric, limit in limits.items()
+        if limit is not None and summary[metric] > limit
+    ]
+    if exceeded:
+        print("Regresion de cold start: " + ", ".join(exceeded))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Peak RSS de la ingesta de entrenamiento: pd.read_csv completo + preprocess
+denso vs ingesta lean (columnas minimas, categoricas, matriz sparse), sobre
+el dataset del repo replicado a distintos tamaños.
+
+Uso:
+    python -m tests.stress.bench_ingest --data_path ./data/data.csv --factors 1,10,50
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+
+RUN = """
+import resource, time
+from challenge.model import DelayModel
+from challenge.model_train import read_training_data
+
+start = time.perf_counter()
+model = DelayModel(top_features={top_features!r})
+if {lean}:
+    data = read_training_data({path!r}, lean=True)
+    features, target = model.preprocess_sparse(data, target_column="delay")
+else:
+    data = read_training_data({path!r})
+    features, target = model.preprocess(data, target_column="delay")
+print(features.shape[1], time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de memoria de la ingesta de entrenamiento")
+    parser.add_argument('--data_path', type=str, default="./data/data.csv")
+    parser.add_argument('--factors', type=str, default="1,10,50")
+    return parser.parse_args()
+
+
+def measure(path: str, lean: bool, top_features: list) -> tuple:
+    code = RUN.format(path=path, lean=lean, top_features=top_features)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    n_features, seconds, rss = out.stdout.strip().splitlines()[-1].split()
+    return int(n_features), float(seconds), float(rss)
+
+
+def main():
+    args = parse_args()
+    data = pd.read_csv(args.data_path, low_memory=False)
+
+    print(f"{'rows':>10}{'mode':>16}{'features':>10}{'seconds':>10}{'peak RSS (MB)':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for factor in [int(f) for f in args.factors.split(",")]:
+            path = os.path.join(tmp, f"data_x{factor}.csv")
+            pd.concat([data] * factor, ignore_index=True).to_csv(path, index=False)
+
+            runs = [
+                ("dense top", False, None),
+                ("lean top", True, None),
+                ("lean full", True, []),
+            ]
+            for mode, lean, top_features in runs:
+                n_features, seconds, rss = measure(path, lean, top_features)
+                print(f"{len(data) * factor:>10}{mode:>16}{n_features:>10}{seconds:>10.2f}{rss:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
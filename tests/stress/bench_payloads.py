@@ -0,0 +1,60 @@
+"""
+Costo de /predict por formato de request (JSON por fila, JSON columnar, msgpack)
+para batches grandes, medido in-process con TestClient.
+
+Uso:
+    TOP_FEATURES="..." python -m tests.stress.bench_payloads --rows 10000
+"""
+import argparse
+import json
+import random
+import time
+
+import msgpack
+from fastapi.testclient import TestClient
+
+from challenge import api
+
+
+OPERATORS = ["Grupo LATAM", "Sky Airline", "Aerolineas Argentinas", "Copa Air", "Latin American Wings"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de formatos de request de /predict")
+    parser.add_argument('--model', type=str, default="./challenge/delay_model.onnx")
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeats', type=int, default=5)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    api.model.load_model(args.model)
+    client = TestClient(api.app)
+
+    rng = random.Random(0)
+    flights = [
+        {"OPERA": rng.choice(OPERATORS), "TIPOVUELO": rng.choice("IN"), "MES": rng.randint(1, 12)}
+        for _ in range(args.rows)
+    ]
+    columns = {column: [f[column] for f in flights] for column in ("OPERA", "TIPOVUELO", "MES")}
+
+    bodies = {
+        "json filas": (json.dumps({"flights": flights}).encode(), "application/json"),
+        "json columnar": (json.dumps(columns).encode(), "application/json"),
+        "msgpack columnar": (msgpack.packb(columns), "application/msgpack"),
+    }
+
+    print(f"/predict con {args.rows} vuelos (mejor de {args.repeats})")
+    for name, (body, content_type) in bodies.items():
+        best = float("inf")
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            response = client.post("/predict", content=body, headers={"Content-Type": content_type})
+            best = min(best, time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+        print(f"  {name:18s}: {best * 1000:8.1f} ms  ({len(body) / 1024:,.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
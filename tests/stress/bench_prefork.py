@@ -0,0 +1,110 @@
+"""
+Memoria y throughput del serving multi-proceso: compara
+ - uvicorn: un solo proceso (el CMD historico del Dockerfile)
+ - uvicorn-workers: `uvicorn --workers N`, cada worker reimporta y carga su modelo
+ - prefork: `python -m challenge.serve --workers N`, modelo cargado en el padre
+
+Para cada modo levanta el server, lo carga con un perfil de bench_suite y
+reporta RSS y PSS (RSS con las paginas compartidas prorrateadas, leido de
+/proc/<pid>/smaps_rollup) del arbol de procesos, y requests/s por core.
+
+Uso:
+    TOP_FEATURES="..." python -m tests.stress.bench_prefork --workers 1,2,4
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+from typing import List
+
+import httpx
+
+from tests.stress.bench_suite import LOAD_PROFILES, drive, free_port, wait_ready
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de serving multi-proceso")
+    parser.add_argument('--model', type=str, default="./challenge/delay_model.onnx")
+    parser.add_argument('--workers', type=str, default="1,2,4")
+    parser.add_argument('--profile', type=str, default="interactive")
+    parser.add_argument('--duration', type=float, default=10.0)
+    return parser.parse_args()
+
+
+def command(mode: str, workers: int, port: int) -> List[str]:
+    if mode == "uvicorn":
+        return [sys.executable, "-m", "uvicorn", "challenge.api:app", "--port", str(port), "--log-level", "warning"]
+    if mode == "uvicorn-workers":
+        return [sys.executable, "-m", "uvicorn", "challenge.api:app", "--port", str(port),
+                "--workers", str(workers), "--log-level", "warning"]
+    return [sys.executable, "-m", "challenge.serve", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log_level", "warning"]
+
+
+def process_tree(pid: int) -> List[int]:
+    children = subprocess.run(["pgrep", "-P", str(pid)], capture_output=True, text=True).stdout.split()
+    return [pid] + [p for child in children for p in process_tree(int(child))]
+
+
+def memory_kb(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key.lower()] = int(rest.split()[0])
+    return values
+
+
+def run_mode(mode: str, workers: int, args) -> dict:
+    port = free_port()
+    env = {**os.environ, "MODEL_FILE": os.path.abspath(args.model)}
+    process = subprocess.Popen(command(mode, workers, port), env=env)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        with httpx.Client(base_url=base_url) as client:
+            wait_ready(client, process)
+            # Con varios workers, calentamos todos antes de medir
+            for _ in range(20 * workers):
+                client.get("/version")
+        load = asyncio.run(drive(base_url, LOAD_PROFILES[args.profile], args.duration))
+
+        pids = process_tree(process.pid)
+        memory = [memory_kb(pid) for pid in pids]
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    cores = min(workers, os.cpu_count() or 1)
+    return {
+        "mode": mode,
+        "workers": workers,
+        "processes": len(pids),
+        "rss_mb": sum(m["rss"] for m in memory) / 1024,
+        "pss_mb": sum(m["pss"] for m in memory) / 1024,
+        "pss_per_worker_mb": sum(m["pss"] for m in memory) / 1024 / workers,
+        "requests_per_s": load["requests_per_s"],
+        "requests_per_s_per_core": load["requests_per_s"] / cores,
+        "p99_ms": load["p99_ms"],
+    }
+
+
+def main():
+    args = parse_args()
+    rows = [run_mode("uvicorn", 1, args)]
+    for workers in [int(w) for w in args.workers.split(",")]:
+        rows.append(run_mode("uvicorn-workers", workers, args))
+        rows.append(run_mode("prefork", workers, args))
+
+    print(f"\nperfil {args.profile}, {args.duration:.0f}s por modo, {os.cpu_count()} CPU(s)")
+    print(f"{'modo':<16}{'workers':>8}{'procs':>6}{'RSS MB':>9}{'PSS MB':>9}{'PSS/worker':>11}"
+          f"{'req/s':>9}{'req/s/core':>11}{'p99 ms':>9}")
+    for r in rows:
+        print(f"{r['mode']:<16}{r['workers']:>8}{r['processes']:>6}{r['rss_mb']:>9.0f}{r['pss_mb']:>9.0f}"
+              f"{r['pss_per_worker_mb']:>11.0f}{r['requests_per_s']:>9.0f}{r['requests_per_s_per_core']:>11.0f}"
+              f"{r['p99_ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
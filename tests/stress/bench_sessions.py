@@ -0,0 +1,71 @@
+"""
+Benchmark de throughput de DelayModel.predict para distintas configuraciones
+de sesion onnxruntime (threads intra/inter-op, modo de ejecucion, pool).
+
+Uso:
+    python -m tests.stress.bench_sessions --model ./challenge/delay_model.onnx --threads 4
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from challenge.model import DelayModel
+from challenge.session import SessionConfig
+
+
+CONFIGS = {
+    "ort-default": dict(intra_op_threads=0, inter_op_threads=0, execution_mode="sequential"),
+    "intra-1": dict(intra_op_threads=1, inter_op_threads=1, execution_mode="sequential"),
+    "intra-1-parallel": dict(intra_op_threads=1, inter_op_threads=2, execution_mode="parallel"),
+    "intra-1-no-opt": dict(intra_op_threads=1, inter_op_threads=1, graph_optimization_level="disable"),
+    "intra-1-pool-4": dict(intra_op_threads=1, inter_op_threads=1, pool_size=4),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de configuraciones de sesion ONNX")
+    parser.add_argument('--model', type=str, default="./challenge/delay_model.onnx")
+    parser.add_argument('--batch_sizes', type=str, default="1,32,1024")
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=2.0)
+    return parser.parse_args()
+
+
+def run(model: DelayModel, batch: np.ndarray, threads: int, seconds: float) -> float:
+    """Llamadas a predict por segundo desde `threads` threads concurrentes."""
+    deadline = time.perf_counter() + seconds
+
+    def worker() -> int:
+        calls = 0
+        while time.perf_counter() < deadline:
+            model.predict(batch)
+            calls += 1
+        return calls
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        calls = sum(pool.map(lambda _: worker(), range(threads)))
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(0)
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+
+    print(f"{'config':<20}{'batch':>8}{'calls/s':>14}{'rows/s':>16}")
+    for name, params in CONFIGS.items():
+        model = DelayModel(prediction_table=False)
+        model.load_model(args.model, session_config=SessionConfig(**params))
+        n_features = model._onnx_session.get_inputs()[0].shape[1]
+
+        for size in batch_sizes:
+            batch = (rng.random((size, n_features)) < 0.2).astype(np.float32)
+            calls = run(model, batch, args.threads, args.seconds)
+            print(f"{name:<20}{size:>8}{calls:>14,.0f}{calls * size:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
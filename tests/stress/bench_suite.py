@@ -0,0 +1,317 @@
+"""
+Suite de benchmarks local con gate de regresion contra un baseline JSON.
+
+ - micro: DelayModel.preprocess y predict por tamaño de batch (1 .. 1M vuelos)
+   y save_model / load_model del ONNX, in-process.
+ - load: levanta `uvicorn challenge.api:app` en un puerto local y lo carga con
+   mezclas de tamaños de batch (perfiles de LOAD_PROFILES) durante --duration s.
+
+Los resultados se guardan como JSON (--output). Con --baseline termina con
+codigo 1 si algun caso pierde mas de --max_throughput_drop de throughput o su
+p99 crece mas de --max_p99_increase (+ --p99_slack_ms, para absorber el ruido
+de los casos de microsegundos). --update_baseline sobrescribe el baseline.
+
+Uso:
+    TOP_FEATURES="..." python -m tests.stress.bench_suite --baseline tests/stress/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from challenge.model import DelayModel
+
+
+OPERATORS = ["Grupo LATAM", "Sky Airline", "Aerolineas Argentinas", "Copa Air", "Latin American Wings"]
+
+# Mezclas de tamaños de batch: {vuelos por request: peso}; desde 1000 vuelos el body va columnar
+LOAD_PROFILES = {
+    "interactive": {"concurrency": 16, "mix": {1: 0.8, 10: 0.2}},
+    "mixed": {"concurrency": 16, "mix": {1: 0.6, 10: 0.25, 100: 0.1, 1000: 0.05}},
+    "bulk": {"concurrency": 4, "mix": {1000: 0.5, 10000: 0.5}},
+}
+COLUMNAR_MIN_SIZE = 1000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks locales con gate de regresion")
+    parser.add_argument('--model', type=str, default="./challenge/delay_model.onnx")
+    parser.add_argument('--batch_sizes', type=str, default="1,100,10000,1000000")
+    parser.add_argument('--repeats', type=int, default=50)
+    parser.add_argument('--profiles', type=str, default=",".join(LOAD_PROFILES))
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--skip_micro', action='store_true')
+    parser.add_argument('--skip_load', action='store_true')
+    parser.add_argument('--output', type=str, default="./reports/bench.json")
+    parser.add_argument('--baseline', type=str, required=False, default=None)
+    parser.add_argument('--update_baseline', action='store_true')
+    parser.add_argument('--max_throughput_drop', type=float, default=0.35)
+    parser.add_argument('--max_p99_increase', type=float, default=0.50)
+    parser.add_argument('--p99_slack_ms', type=float, default=0.5)
+    return parser.parse_args()
+
+
+def random_flights(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "OPERA": rng.choice(OPERATORS, n),
+        "TIPOVUELO": rng.choice(["I", "N"], n),
+        "MES": rng.integers(1, 13, n),
+    })
+
+
+def summarize(timings: List[float], rows: int) -> dict:
+    timings = np.asarray(timings)
+    p50 = float(np.percentile(timings, 50))
+    return {
+        "p50_ms": p50 * 1e3,
+        "p99_ms": float(np.percentile(timings, 99)) * 1e3,
+        "throughput": rows / p50,
+        "runs": len(timings),
+    }
+
+
+def measure(fn, repeats: int, max_seconds: float = 5.0) -> List[float]:
+    """Corre fn hasta `repeats` veces (minimo 3) o hasta agotar max_seconds."""
+    fn()  # warmup: imports perezosos y caches fuera de la medicion
+    timings: List[float] = []
+    deadline = time.perf_counter() + max_seconds
+    while len(timings) < repeats and (len(timings) < 3 or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+# ==========================
+# Microbenchmarks in-process
+# ==========================
+def run_micro(model_path: str, batch_sizes: List[int], repeats: int) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+    model = DelayModel(prediction_table=False)
+    model.load_model(model_path)
+
+    for size in batch_sizes:
+        data = random_flights(size)
+        features = model.preprocess(data)
+        results[f"micro/preprocess/{size}"] = summarize(measure(lambda: model.preprocess(data), repeats), size)
+        results[f"micro/predict/{size}"] = summarize(measure(lambda: model.predict(features), repeats), size)
+
+    # save_model exporta el clasificador sklearn: entrenamos uno con data sintetica
+    trained = DelayModel()
+    data = random_flights(10_000, seed=1)
+    target = pd.DataFrame({"delay": np.random.default_rng(1).integers(0, 2, len(data))})
+    trained.fit(trained.preprocess(data), target)
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        path = os.path.join(tmp, "bench.onnx")
+        results["micro/save_model"] = summarize(measure(lambda: trained.save_model(path), repeats), 1)
+        results["micro/load_model"] = summarize(
+            measure(lambda: DelayModel().load_model(path), repeats), 1
+        )
+
+    return results
+
+
+# ==========================
+# Carga contra uvicorn local
+# ==========================
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(model_path: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, "MODEL_FILE": os.path.abspath(model_path)}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "challenge.api:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env
+    )
+
+
+def wait_ready(client, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn termino con codigo {process.returncode}")
+        try:
+            # /version responde 200 recien cuando el ONNX esta cargado
+            if client.get("/version").status_code == 200:
+                return
+        except Exception:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError("uvicorn no quedo listo a tiempo")
+
+
+def build_bodies(sizes) -> Dict[int, bytes]:
+    bodies = {}
+    for size in sizes:
+        flights = random_flights(size, seed=size)
+        if size >= COLUMNAR_MIN_SIZE:
+            payload = {column: flights[column].tolist() for column in flights.columns}
+        else:
+            payload = {"flights": flights.to_dict(orient="records")}
+        bodies[size] = json.dumps(payload).encode()
+    return bodies
+
+
+async def drive(base_url: str, profile: dict, duration: float) -> dict:
+    import httpx
+
+    mix = profile["mix"]
+    sizes, weights = list(mix), list(mix.values())
+    bodies = build_bodies(sizes)
+    latencies: List[float] = []
+    counts = {"requests": 0, "flights": 0, "errors": 0}
+    headers = {"Content-Type": "application/json"}
+
+    async def worker(client, rng: random.Random, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            size = rng.choices(sizes, weights)[0]
+            start = time.perf_counter()
+            response = await client.post("/predict", content=bodies[size], headers=headers)
+            latencies.append(time.perf_counter() - start)
+            counts["requests"] += 1
+            if response.status_code == 200:
+                counts["flights"] += size
+            else:
+                counts["errors"] += 1
+
+    limits = httpx.Limits(max_connections=profile["concurrency"])
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(
+            worker(client, random.Random(i), deadline) for i in range(profile["concurrency"])
+        ))
+        elapsed = time.perf_counter() - start
+
+    latencies_arr = np.asarray(latencies)
+    return {
+        "p50_ms": float(np.percentile(latencies_arr, 50)) * 1e3,
+        "p99_ms": float(np.percentile(latencies_arr, 99)) * 1e3,
+        "throughput": counts["flights"] / elapsed,
+        "requests_per_s": counts["requests"] / elapsed,
+        "errors": counts["errors"],
+        "runs": counts["requests"],
+    }
+
+
+def run_load(model_path: str, profiles: List[str], duration: float) -> Dict[str, dict]:
+    import httpx
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = start_server(model_path, port)
+    results: Dict[str, dict] = {}
+    try:
+        with httpx.Client(base_url=base_url) as client:
+            wait_ready(client, process)
+        for name in profiles:
+            results[f"load/{name}"] = asyncio.run(drive(base_url, LOAD_PROFILES[name], duration))
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return results
+
+
+# ==========================
+# Gate de regresion
+# ==========================
+def compare(
+    results: Dict[str, dict],
+    baseline: Dict[str, dict],
+    max_throughput_drop: float,
+    max_p99_increase: float,
+    p99_slack_ms: float
+) -> List[str]:
+    """Devuelve una linea por regresion; los casos sin baseline se ignoran."""
+    regressions = []
+    for case, current in sorted(results.items()):
+        base = baseline.get(case)
+        if base is None:
+            continue
+        min_throughput = base["throughput"] * (1 - max_throughput_drop)
+        if current["throughput"] < min_throughput:
+            regressions.append(
+                f"{case}: throughput {current['throughput']:,.0f}/s < {min_throughput:,.0f}/s "
+                f"(baseline {base['throughput']:,.0f}/s)"
+            )
+        max_p99 = base["p99_ms"] * (1 + max_p99_increase) + p99_slack_ms
+        if current["p99_ms"] > max_p99:
+            regressions.append(
+                f"{case}: p99 {current['p99_ms']:.3f} ms > {max_p99:.3f} ms "
+                f"(baseline {base['p99_ms']:.3f} ms)"
+            )
+        if current.get("errors"):
+            regressions.append(f"{case}: {current['errors']} requests con error")
+    return regressions
+
+
+def format_results(results: Dict[str, dict]) -> str:
+    lines = [f"{'caso':<28}{'p50 (ms)':>12}{'p99 (ms)':>12}{'vuelos/s':>16}{'runs':>8}"]
+    for case, r in results.items():
+        lines.append(f"{case:<28}{r['p50_ms']:>12.3f}{r['p99_ms']:>12.3f}{r['throughput']:>16,.0f}{r['runs']:>8}")
+    return "\n".join(lines)
+
+
+def main():
+    args = parse_args()
+    results: Dict[str, dict] = {}
+
+    if not args.skip_micro:
+        batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+        results.update(run_micro(args.model, batch_sizes, args.repeats))
+    if not args.skip_load:
+        profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+        results.update(run_load(args.model, profiles, args.duration))
+
+    print(format_results(results))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResultados en {args.output}")
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline actualizado: {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(
+            results, baseline, args.max_throughput_drop, args.max_p99_increase, args.p99_slack_ms
+        )
+        if regressions:
+            print("\nREGRESIONES:")
+            print("\n".join(f"  {line}" for line in regressions))
+            sys.exit(1)
+        print("\nSin regresiones contra el baseline")
+
+
+if __name__ == "__main__":
+    main()